@@ -0,0 +1,30 @@
+"""Compare two benchmark runs: python -m benchmarks.compare old.json new.json"""
+
+
+import json
+import sys
+
+THRESHOLD = 1.1  # slower than this ratio is reported as a regression
+
+
+def main(old_filename: str, new_filename: str) -> int:
+    with open(old_filename) as file:
+        old = json.load(file)['results']
+    with open(new_filename) as file:
+        new = json.load(file)['results']
+
+    regressions = 0
+    for size in sorted(set(old) & set(new), key=int):
+        print(f"{size} customers")
+        for name in sorted(set(old[size]) & set(new[size])):
+            ratio = new[size][name] / old[size][name] if old[size][name] else 1.0
+            marker = '  <-- slower' if ratio > THRESHOLD else ''
+            regressions += ratio > THRESHOLD
+            print(f"  {name:28} {old[size][name]:12.6f} {new[size][name]:12.6f} {ratio:6.2f}x{marker}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+    sys.exit(main(sys.argv[1], sys.argv[2]))
@@ -0,0 +1,39 @@
+"""Rows per second loaded from CSV, trusted, validated and into a service: python -m benchmarks.load [count]"""
+
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import generate_customers
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.service.customers_service import CustomerService
+from src.modules.storage import Storage
+
+COUNT = 100000
+REPEAT = 3
+
+
+def rows_per_second(storage: Storage, service: bool = False) -> float:
+    """Best of REPEAT loads, with `service` the whole CustomerService startup including its indexes"""
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        count = len(CustomerService(storage) if service else storage.load())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count / best
+
+
+def main(count: int = COUNT) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'customers.csv')
+        Storage(CustomerDTO, filename).save(generate_customers(count))
+        print(f"trusted:   {rows_per_second(Storage(CustomerDTO, filename)):10.0f} rows/s")
+        print(f"validated: {rows_per_second(Storage(CustomerDTO, filename, trusted=False)):10.0f} rows/s")
+        print(f"service:   {rows_per_second(Storage(CustomerDTO, filename), service=True):10.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else COUNT)
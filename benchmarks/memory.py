@@ -0,0 +1,65 @@
+"""Memory used per customer: python -m benchmarks.memory [count]"""
+
+
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from benchmarks.synthetic import generate_customers
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.mapped_storage import MappedStorage
+from src.modules.models.customer_model import Customer
+from src.modules.service.customers_service import CustomerService
+from src.modules.storage import Storage
+
+COUNT = 20000
+
+
+def hydrate(customer: Customer) -> None:
+    """Read every field so each one is built"""
+    customer.name, customer.birthday, customer.notes
+    customer._id, customer._phones, customer._address, customer._email
+
+
+def bytes_per_customer(storage: Storage, count: int, read_fields: bool) -> float:
+    gc.collect()
+    tracemalloc.start()
+    customers = [Customer(dto) for dto in storage.load()]
+    if read_fields:
+        for customer in customers:
+            hydrate(customer)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / count
+
+
+def service_bytes_per_customer(storage: Storage, count: int) -> float:
+    """Memory held by a loaded service: records, positions and indexes"""
+    gc.collect()
+    tracemalloc.start()
+    service = CustomerService(storage)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del service
+    return size / count
+
+
+def main(count: int = COUNT) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        storage = Storage(CustomerDTO, os.path.join(directory, 'customers.csv'))
+        storage.save(generate_customers(count))
+        print(f"loaded:   {bytes_per_customer(storage, count, False):8.0f} bytes per customer")
+        print(f"hydrated: {bytes_per_customer(storage, count, True):8.0f} bytes per customer")
+        print(f"service:  {service_bytes_per_customer(storage, count):8.0f} bytes per customer in a service")
+        # a tiny cache leaves what stays resident whatever the cache size: ids and index keys
+        mapped = MappedStorage(CustomerDTO, os.path.join(directory, 'customers.bin'), cache_size=100)
+        mapped.save(storage.load())
+        print(f"mapped:   {service_bytes_per_customer(mapped, count):8.0f} bytes per customer in a service")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else COUNT)
@@ -0,0 +1,130 @@
+"""Benchmark suite over synthetic books.
+
+    python -m benchmarks.suite --sizes 10000 100000 --output bench_output.json
+
+Every result is the time of one call in seconds. Queries are run for a
+sample of keys taken from the book and the mean is reported. The output is
+JSON, compare two runs with `python -m benchmarks.compare old.json new.json`.
+"""
+
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.synthetic import SEED, generate_book
+from src.modules.dto.booking_dto import BookingDTO
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.service.bookings_service import BookingsService
+from src.modules.service.customers_service import CustomerService
+from src.modules.storage import Storage
+
+SIZES = [10000, 100000, 1000000]
+SAMPLE = 200  # keys per query benchmark
+REPEAT = 3  # runs of the whole-book operations, the best one counts
+
+
+def best_of(func: Callable[[], object], repeat: int = REPEAT) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def mean_of(func: Callable[[object], object], keys: List) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        func(key)
+    return (time.perf_counter() - start) / len(keys)
+
+
+def run(size: int, directory: str, seed: int = SEED) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    rand = random.Random(seed)
+    customer_dtos, booking_dtos = generate_book(size, seed)
+
+    customer_storage = Storage(CustomerDTO, os.path.join(directory, f"customers_{size}.csv"))
+    booking_storage = Storage(BookingDTO, os.path.join(directory, f"bookings_{size}.csv"))
+    results['storage.save'] = best_of(lambda: customer_storage.save(customer_dtos))
+    booking_storage.save(booking_dtos)
+    results['storage.load'] = best_of(customer_storage.load)
+    parallel_storage = Storage(CustomerDTO, customer_storage.filename, workers=os.cpu_count() or 1)
+    results['storage.load_parallel'] = best_of(parallel_storage.load)
+
+    start = time.perf_counter()
+    customers = CustomerService(customer_storage)
+    results['customer_service.init'] = time.perf_counter() - start
+    start = time.perf_counter()
+    bookings = BookingsService(booking_storage)
+    results['bookings_service.init'] = time.perf_counter() - start
+
+    sample = rand.sample(customer_dtos, min(SAMPLE, len(customer_dtos)))
+    with_notes = [dto for dto in sample if dto.notes] or sample
+    with_tags = [tags[0] for dto in sample for tags in dto.note_tags if tags] or ['none']
+    results['find'] = mean_of(customers.find, [dto.id for dto in sample])
+    results['find_by_name'] = mean_of(customers.find_by_name, [dto.name for dto in sample])
+    results['find_by_phone'] = mean_of(customers.find_by_phone, [dto.phones[0] for dto in sample])
+    results['find_by_email'] = mean_of(customers.find_by_email, [dto.email for dto in sample])
+    results['find_by_birthday'] = mean_of(customers.find_by_birthday, [dto.birthday for dto in sample])
+    results['find_by_note'] = mean_of(customers.find_by_note, [dto.notes[0][:12] for dto in with_notes if dto.notes]
+                                      or ['none'])
+    results['find_by_tag'] = mean_of(customers.find_by_tag, with_tags)
+    results['search'] = mean_of(customers.search, [dto.name.split()[1] for dto in sample[:20]])
+    results['customer_birthdays'] = best_of(lambda: customers.customer_birthdays(7, today=date(2024, 6, 1)))
+    results['sort_by_tags'] = best_of(customers.sort_by_tags, repeat=1)
+    results['bookings.find_by_date'] = mean_of(bookings.find_by_date,
+                                               [dto.date for dto in rand.sample(booking_dtos, min(SAMPLE, len(booking_dtos)))])
+    results['customer_service.save'] = best_of(lambda: customers.storage.save([record.dto() for record in customers]),
+                                               repeat=1)
+    results['delete'] = mean_of(customers.delete, [dto.id for dto in sample])
+    return results
+
+
+def environment() -> Dict[str, Optional[str]]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Time Chef's Book operations on synthetic books")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="numbers of customers")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--output', help="JSON file for the results, printed when omitted")
+    args = parser.parse_args(argv)
+
+    report = {'environment': environment(), 'seed': args.seed, 'results': {}}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            print(f"{size} customers...", file=sys.stderr)
+            report['results'][str(size)] = run(size, directory, args.seed)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, mode='w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
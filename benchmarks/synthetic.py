@@ -0,0 +1,89 @@
+"""Deterministic synthetic data for the benchmarks.
+
+Write a book as CSV files: python -m benchmarks.synthetic 100000 [directory]
+"""
+
+
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from src.modules.dto.booking_dto import BookingDTO
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.models.fields.datetime_field import DatetimeField
+from src.modules.service import bookings_service, customers_service
+from src.modules.storage import Storage
+
+SEED = 555
+BOOKINGS_PER_CUSTOMER = 0.5
+FIRST_BOOKING_DAY = datetime(2024, 1, 1)
+BOOKING_DAYS = 365
+
+FIRST_NAMES = ['Olena', 'Andrii', 'Natalia', 'Roman', 'Yosyp', 'Iryna', 'Taras', 'Oksana', 'Dmytro', 'Sofia']
+LAST_NAMES = ['Shevchenko', 'Kovalenko', 'Bondarenko', 'Tkachenko', 'Kravchenko', 'Melnyk', 'Boiko', 'Moroz']
+CITIES = ['Kyiv', 'Lviv', 'Odesa', 'Kharkiv', 'Dnipro', 'Poltava', 'Chernihiv', 'Uzhhorod']
+STREETS = ['Khreshchatyk', 'Shevchenka', 'Franka', 'Lesi Ukrainky', 'Sadova', 'Soborna']
+TAGS = ['vegan', 'vegetarian', 'gluten-free', 'nuts', 'wine', 'terrace', 'window', 'vip', 'kids', 'quiet',
+        'birthday', 'spicy', 'lactose', 'regular']
+NOTES = ['Prefers a table by the window', 'Allergic to nuts', 'Always orders the tasting menu',
+         'Likes dry white wine', 'Celebrates anniversaries with us', 'Comes with small children',
+         'Asks for extra spicy dishes', 'No dairy please', 'Regular on Friday evenings']
+
+
+def generate_customers(count: int, seed: int = SEED) -> List[CustomerDTO]:
+    """The same `count` customers for the same seed, with phones, notes, tags and birthdays."""
+    rand = random.Random(seed)
+    customers = []
+    for number in range(count):
+        name = f"{rand.choice(FIRST_NAMES)} {rand.choice(LAST_NAMES)} {number}"
+        notes = rand.sample(NOTES, rand.randint(0, 3))
+        customers.append(CustomerDTO.from_trusted({
+            'id': str(uuid.UUID(int=rand.getrandbits(128), version=4)),
+            'name': name,
+            'birthday': f"{rand.randint(1, 28):02d}.{rand.randint(1, 12):02d}.{rand.randint(1950, 2005)}",
+            'address': f"{rand.choice(STREETS)} {rand.randint(1, 200)}, {rand.choice(CITIES)}, Ukraine",
+            'email': f"customer{number}@example.com",
+            'phones': [f"0{rand.randint(100000000, 999999999)}" for _ in range(rand.randint(1, 2))],
+            'notes': notes,
+            'note_tags': [rand.sample(TAGS, rand.randint(0, 3)) for _ in notes],
+        }))
+    return customers
+
+
+def generate_bookings(customers: List[CustomerDTO], count: int, seed: int = SEED) -> List[BookingDTO]:
+    """`count` bookings of random customers over a year, on half-hour slots between 12:00 and 21:00."""
+    rand = random.Random(seed + 1)
+    bookings = []
+    for _ in range(count):
+        starts_at = FIRST_BOOKING_DAY + timedelta(days=rand.randrange(BOOKING_DAYS),
+                                                  hours=12, minutes=30 * rand.randrange(19))
+        bookings.append(BookingDTO.from_trusted({
+            'id': str(uuid.UUID(int=rand.getrandbits(128), version=4)),
+            'customer_id': rand.choice(customers).id,
+            'date': starts_at.strftime(DatetimeField.FORMAT),
+            'covers': rand.randint(1, 8),
+            'duration': rand.choice([90, 120, 150]),
+        }))
+    return bookings
+
+
+def generate_book(count: int, seed: int = SEED) -> Tuple[List[CustomerDTO], List[BookingDTO]]:
+    """A book of `count` customers and their bookings"""
+    customers = generate_customers(count, seed)
+    return customers, generate_bookings(customers, int(count * BOOKINGS_PER_CUSTOMER), seed)
+
+
+def write_book(count: int, directory: str = '.', seed: int = SEED) -> None:
+    """Save a synthetic book where the CLI looks for its files"""
+    customers, bookings = generate_book(count, seed)
+    Storage(CustomerDTO, os.path.join(directory, customers_service.FILENAME)).save(customers)
+    Storage(BookingDTO, os.path.join(directory, bookings_service.FILENAME)).save(bookings)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (2, 3):
+        sys.exit(__doc__)
+    write_book(int(sys.argv[1]), *sys.argv[2:])
@@ -1,5 +1,106 @@
+import argparse
+import json
+import os
+import sys
+from typing import List, Optional, Union
+
+from src.modules.dto.booking_dto import BookingDTO
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.journal_storage import JournalStorage
+from src.modules.mapped_storage import MappedStorage
+from src.modules.metrics import metrics
+from src.modules.service import bookings_service, customers_service
+from src.modules.server import SOCKET, serve
+from src.modules.service.bookings_service import BookingsService
+from src.modules.service.customer_import import import_customers
+from src.modules.service.customers_service import CustomerService
+from src.modules.ui.batch import BatchRunner
+from src.modules.ui.client import RemoteCLI
 from src.modules.ui.customer_management_cli import CustomerManagementCLI
 
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='chefs-book', description="A personal assistant for restaurants")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="run the commands of a script ('-' reads stdin) and print JSON lines results")
+    parser.add_argument('--save-every', type=int, default=0, metavar='N',
+                        help="in batch mode, save after every N changing commands instead of once at the end")
+    parser.add_argument('--import', dest='import_file', metavar='FILE',
+                        help="add the customers of a CSV or JSON lines file, printing rejected rows as JSON lines")
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help="processes validating an import, one per CPU by default")
+    parser.add_argument('--serve', nargs='?', const=SOCKET, metavar='SOCKET',
+                        help=f"own the book and serve it to clients on a Unix socket ({SOCKET} by default)")
+    parser.add_argument('--connect', nargs='?', const=SOCKET, metavar='SOCKET',
+                        help="work on the book of a running server instead of loading the files")
+    parser.add_argument('--storage', choices=['journal', 'mapped'], default='journal',
+                        help="keep the book in CSV files with a journal (default) or in memory-mapped record "
+                             "files for books larger than memory, the first mapped run copies the CSV book")
+    args = parser.parse_args(argv)
+
+    if args.connect is not None:
+        RemoteCLI(args.connect).run()
+        return 0
+    if args.import_file is not None:
+        return import_file(args.import_file, args.workers, args.storage)
+    if args.serve is None and args.batch is None:
+        # the interactive session collects metrics, the load is the first one
+        metrics.enable()
+
+    customers = CustomerService(_storage(CustomerDTO, customers_service.FILENAME, args.storage))
+    bookings = BookingsService(_storage(BookingDTO, bookings_service.FILENAME, args.storage))
+    try:
+        if args.serve is not None:
+            serve(customers, bookings, args.serve)
+            return 0
+        if args.batch is None:
+            bot = CustomerManagementCLI(customers, bookings)
+            bot.run()
+            return 0
+
+        runner = BatchRunner(customers, bookings, sys.stdout, save_every=args.save_every)
+        if args.batch == '-':
+            summary = runner.run(sys.stdin)
+        else:
+            with open(args.batch, encoding='utf-8') as file:
+                summary = runner.run(file)
+        return 1 if summary['errors'] else 0
+    finally:
+        _close(customers, bookings)
+
+
+def import_file(filename: str, workers: Optional[int] = None, storage: str = 'journal') -> int:
+    service = CustomerService(_storage(CustomerDTO, customers_service.FILENAME, storage))
+    try:
+        result = import_customers(service, filename, workers=workers)
+    finally:
+        _close(service)
+    for row in result.rejected:
+        print(json.dumps({'line': row.line, 'errors': row.errors}, ensure_ascii=False))
+    print(json.dumps({'summary': {'accepted': len(result.accepted), 'rejected': len(result.rejected)}}))
+    return 1 if result.rejected else 0
+
+
+def _storage(dto_cls, filename: str, kind: str = 'journal') -> Union[JournalStorage, MappedStorage]:
+    # large books are parsed on every core
+    journal = JournalStorage(dto_cls, filename, workers=os.cpu_count() or 1)
+    if kind == 'journal':
+        return journal
+    mapped_filename = f"{os.path.splitext(filename)[0]}.records"
+    seed = not os.path.exists(mapped_filename)
+    storage = MappedStorage(dto_cls, mapped_filename)
+    if seed:
+        # the first mapped run starts from the CSV book, later runs leave it alone
+        storage.save(journal.load())
+    return storage
+
+
+def _close(*services) -> None:
+    # the mapped storage saves its index on close, the next start doesn't rescan the file
+    for service in services:
+        if isinstance(service.storage, MappedStorage):
+            service.storage.close()
+
+
 if __name__ == "__main__":
-    bot = CustomerManagementCLI()
-    bot.run()
+    sys.exit(main())
@@ -7,21 +7,27 @@ class BookingDTO(BaseDTO):
     id: Optional[str] = None
     customer_id: Optional[str] = None
     date: Optional[str] = None
+    covers: Optional[int] = None
+    duration: Optional[int] = None
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
     @classmethod
-    def from_dict(cls, data: dict) -> 'BookingDTO':
-        return cls(
-            id=data.get('id'),
-            customer_id=data.get('customer_id'),
-            date=data.get('date')
-        )
+    def decode(cls, data: dict) -> dict:
+        return {
+            'id': data.get('id'),
+            'customer_id': data.get('customer_id'),
+            'date': data.get('date'),
+            'covers': int(data['covers']) if data.get('covers') else None,
+            'duration': int(data['duration']) if data.get('duration') else None
+        }
 
     def to_dict(self) -> dict:
         return {
             'id': self.id,
             'customer_id': self.customer_id or '',
-            'date': self.date or ''
+            'date': self.date or '',
+            'covers': self.covers or '',
+            'duration': self.duration or ''
         }
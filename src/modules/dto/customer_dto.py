@@ -1,3 +1,4 @@
+import sys
 from typing import List, Optional
 
 from src.modules.dto.base_dto import BaseDTO
@@ -11,24 +12,26 @@ class CustomerDTO(BaseDTO):
     email: Optional[str] = None
     phones: List[str] = []
     notes: List[str] = []
+    note_tags: List[List[str]] = []
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
     @classmethod
-    def from_dict(cls, data: dict) -> 'CustomerDTO':
-        def empty_string_to_none(value):
-            return value if value != '' else None
-
-        return cls(
-            id=empty_string_to_none(data.get('id')),
-            name=empty_string_to_none(data.get('name')),
-            phones=[phone for phone in data.get('phones', '').split(';') if phone] if data.get('phones') else [],
-            notes=[note for note in data.get('notes', '').split(';') if note] if data.get('notes') else [],
-            birthday=empty_string_to_none(data.get('birthday')),
-            address=empty_string_to_none(data.get('address')),
-            email=empty_string_to_none(data.get('email'))
-        )
+    def decode(cls, data: dict) -> dict:
+        # runs once per stored row, keep it to plain lookups and splits
+        phones, notes, note_tags = data.get('phones'), data.get('notes'), data.get('note_tags')
+        return {
+            'id': data.get('id') or None,
+            'name': data.get('name') or None,
+            'birthday': data.get('birthday') or None,
+            'address': data.get('address') or None,
+            'email': data.get('email') or None,
+            'phones': [phone for phone in phones.split(';') if phone] if phones else [],
+            'notes': [note for note in notes.split(';') if note] if notes else [],
+            'note_tags': [[sys.intern(tag) for tag in tags.split(',') if tag] for tags in note_tags.split(';')]
+            if note_tags else []
+        }
 
     def to_dict(self) -> dict:
         return {
@@ -38,5 +41,6 @@ class CustomerDTO(BaseDTO):
             'notes': ';'.join(self.notes) if self.notes else '',
             'birthday': self.birthday or '',
             'address': self.address or '',
-            'email': self.email or ''
+            'email': self.email or '',
+            'note_tags': ';'.join(','.join(tags) for tags in self.note_tags) if any(self.note_tags) else ''
         }
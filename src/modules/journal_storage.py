@@ -0,0 +1,166 @@
+"""Module for storing records as a CSV snapshot plus an append-only journal of changes"""
+
+
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Type
+
+from src.modules.metrics import instrumented
+from src.modules.storage import Storage, D
+
+COMPACT_THRESHOLD = 1024 * 1024  # bytes
+
+
+class JournalStorage(Storage[D]):
+    """Storage that appends changes to a journal instead of rewriting the whole file.
+
+    The CSV file is a snapshot, every `append` writes one JSON line per added,
+    updated or deleted record to the journal. Loading replays the journal over
+    the snapshot. Once the journal grows past `compact_threshold` bytes it is
+    folded into a fresh snapshot in a background thread.
+    """
+
+    def __init__(self, dto_cls: Type[D], filename: str, compact_threshold: int = COMPACT_THRESHOLD,
+                 workers: int = 1):
+        super().__init__(dto_cls, filename, workers=workers)
+        self.journal_filename = f"{filename}.journal"
+        self.compacting_filename = f"{filename}.journal.compacting"
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()  # compact folds a leftover file while holding it
+        self._compaction: Optional[threading.Thread] = None
+
+    @instrumented
+    def append(self, upserts: Iterable[D], deleted_ids: Iterable[str]) -> None:
+        """Write added/updated DTOs and deleted ids to the journal."""
+        lines = [json.dumps({'op': 'upsert', 'record': dto.to_dict()}) for dto in upserts]
+        lines += [json.dumps({'op': 'delete', 'id': record_id}) for record_id in deleted_ids]
+        if not lines:
+            return
+
+        text = '\n'.join(lines) + '\n'
+        with self._lock:
+            with open(self.journal_filename, mode='a') as file:
+                file.write(text)
+            journal_size = os.path.getsize(self.journal_filename)
+        self._count_io('written', len(lines), len(text.encode('utf-8')))
+
+        if journal_size >= self.compact_threshold:
+            self.compact(wait=False)
+
+    def save_changes(self, upserts: List[D], deleted_ids: List[str], snapshot: Callable[[], List[D]]) -> None:
+        """Journal only the change set, the snapshot is never built."""
+        self.append(upserts, deleted_ids)
+
+    @instrumented
+    def save(self, dtos: List[D]) -> None:
+        """Write a full snapshot and drop the journals it supersedes."""
+        self.wait()
+        with self._lock:
+            self._write_snapshot(dtos)
+            self._remove(self.journal_filename)
+            self._remove(self.compacting_filename)
+
+    def iter_load(self) -> Iterator[D]:
+        """Yield the snapshot records with the journal applied on top of them."""
+        self.wait()
+        changes = self._read_journal()
+        # an updated record keeps its place in the snapshot, new ones follow in journal order
+        for dto in super().iter_load():
+            if dto.id in changes:
+                dto = changes.pop(dto.id)
+            if dto is not None:
+                yield dto
+        for dto in changes.values():
+            if dto is not None:
+                yield dto
+
+    @instrumented
+    def compact(self, wait: bool = True) -> None:
+        """Fold the journal into a new snapshot, in the background unless `wait` is set."""
+        with self._lock:
+            if self._compaction and self._compaction.is_alive():
+                return
+            if os.path.exists(self.compacting_filename):
+                # left behind by a compaction that crashed, fold it in first or
+                # renaming the journal below would overwrite its changes
+                self._compact()
+            if not os.path.exists(self.journal_filename):
+                return
+            # new appends go to a fresh journal while the old one is being compacted
+            os.replace(self.journal_filename, self.compacting_filename)
+            self._compaction = threading.Thread(target=self._compact, name=f"compact-{self.filename}")
+            self._compaction.start()
+
+        if wait:
+            self.wait()
+
+    def wait(self) -> None:
+        """Block until a running compaction has finished."""
+        compaction = self._compaction
+        if compaction and compaction.is_alive() and compaction is not threading.current_thread():
+            compaction.join()
+
+    def clear(self) -> None:
+        """Delete the snapshot and the journal."""
+        self.wait()
+        super().clear()
+        self._remove(self.journal_filename)
+        self._remove(self.compacting_filename)
+
+    def _compact(self) -> None:
+        changes = self._read_journal([self.compacting_filename])
+        dtos = [changes.pop(dto.id) if dto.id in changes else dto for dto in super().iter_load()]
+        dtos += changes.values()
+        dtos = [dto for dto in dtos if dto is not None]
+        self._write_snapshot(dtos)
+        self._remove(self.compacting_filename)
+
+    def _write_snapshot(self, dtos: List[D]) -> None:
+        temp_filename = f"{self.filename}.tmp"
+        Storage(self.dto_cls, temp_filename).save(dtos)
+        if os.path.exists(temp_filename):
+            os.replace(temp_filename, self.filename)
+        else:
+            self._remove(self.filename)
+
+    def _read_journal(self, filenames: Optional[List[str]] = None) -> Dict[str, Optional[D]]:
+        """Latest journaled state per record id, None for deleted records.
+
+        A last line without its newline was torn by a crash in the middle of
+        `append`, it is cut off so the next append starts on a fresh line.
+        """
+        changes: Dict[str, Optional[D]] = {}
+        for filename in filenames or [self.compacting_filename, self.journal_filename]:
+            if not os.path.exists(filename):
+                continue
+            rows = 0
+            with open(filename, mode='rb') as file:
+                for line in file:
+                    if not line.endswith(b'\n'):
+                        self._truncate(filename, file.tell() - len(line))
+                        break
+                    rows += 1
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if entry['op'] == 'upsert':
+                        dto = self._from_row(entry['record'])
+                        # an update keeps the place of the first write
+                        changes[dto.id] = dto
+                    elif entry['op'] == 'delete':
+                        changes[entry['id']] = None
+                self._count_io('read', rows, file.tell())
+        return changes
+
+    def _truncate(self, filename: str, size: int) -> None:
+        with self._lock:
+            with open(filename, mode='r+b') as file:
+                file.truncate(size)
+
+    @staticmethod
+    def _remove(filename: str) -> None:
+        try:
+            os.remove(filename)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,287 @@
+"""Module for serving records from a memory-mapped file for books larger than memory"""
+
+
+import json
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from collections.abc import MutableSequence
+from typing import Callable, Dict, Generic, Iterator, List, Optional, Type, TypeVar
+
+from src.modules.metrics import instrumented
+from src.modules.storage import Storage, D
+
+M = TypeVar('M')
+
+MAGIC = b'CBM2'
+GENERATION_SIZE = 16  # random bytes after MAGIC, new for every rewrite of the file
+HEADER_SIZE = len(MAGIC) + GENERATION_SIZE
+UPSERT, DELETE = 1, 2
+CACHE_SIZE = 10000  # hydrated records kept in memory
+
+_RECORD_HEADER = struct.Struct('<BI')
+
+
+class MappedStorage(Storage[D]):
+    """Append-only record file read through mmap.
+
+    Every record is a small header (operation, payload length) followed by
+    its row as JSON, so it can be read on its own from its byte offset. The
+    id -> offset index is kept in memory and saved next to the data file
+    when the file is rewritten and on `close`, a save only appends to the
+    data file. On startup only the part of the file written after the saved
+    index is scanned. The index names the generation of the file it was
+    written for, one left behind by a crash during a rewrite is ignored and
+    the whole file is scanned. Services using this storage hydrate records on demand and keep
+    at most `cache_size` of them, but `cache_size` doesn't cap the resident
+    memory: the ids, their positions and the keys of the name, phone, email,
+    birthday and tag indexes stay in memory, about 2 KB per customer
+    (`python -m benchmarks.memory`). The trigram search indexes are skipped,
+    search scans the records instead.
+    """
+
+    def __init__(self, dto_cls: Type[D], filename: str, cache_size: int = CACHE_SIZE):
+        super().__init__(dto_cls, filename)
+        self.index_filename = f"{filename}.idx"
+        self.cache_size = cache_size
+        self.offsets: Dict[str, int] = {}
+        self._map: Optional[mmap.mmap] = None
+        self._load_offsets()
+
+    @instrumented
+    def read(self, record_id: str) -> D:
+        """Read a single DTO by id straight from the mapped file."""
+        offset = self.offsets[record_id]
+        data = self._mapped()
+        _, length = _RECORD_HEADER.unpack_from(data, offset)
+        start = offset + _RECORD_HEADER.size
+        self._count_io('read', 1, _RECORD_HEADER.size + length)
+        row = json.loads(data[start:start + length])
+        # share the id string with the offsets, every index keeps a reference to it
+        row['id'] = record_id
+        return self._from_row(row)
+
+    def ids(self) -> List[str]:
+        return list(self.offsets)
+
+    def iter_load(self) -> Iterator[D]:
+        for record_id in self.ids():
+            yield self.read(record_id)
+
+    def records(self, model_cls: Type[M], on_hydrate: Callable[[M], None]) -> 'MappedRecords[M]':
+        """A list-like view of the stored records that hydrates models lazily."""
+        return MappedRecords(self, model_cls, on_hydrate)
+
+    @instrumented
+    def save(self, dtos: List[D]) -> None:
+        """Write a compacted file holding just the given DTOs."""
+        self._unmap()
+        temp_filename = f"{self.filename}.tmp"
+        with open(temp_filename, mode='wb') as file:
+            file.write(MAGIC + os.urandom(GENERATION_SIZE))
+            offsets = self._write(file, dtos, [], HEADER_SIZE)
+        os.replace(temp_filename, self.filename)
+        self.offsets = offsets
+        self.write_index()
+
+    @instrumented
+    def save_changes(self, upserts: List[D], deleted_ids: List[str], snapshot: Callable[[], List[D]]) -> None:
+        """Append the changed records, the previous versions stay in the file until `compact`."""
+        self._unmap()
+        if not os.path.exists(self.filename):
+            with open(self.filename, mode='wb') as file:
+                file.write(MAGIC + os.urandom(GENERATION_SIZE))
+        with open(self.filename, mode='ab') as file:
+            changes = self._write(file, upserts, deleted_ids, file.tell())
+        for record_id, offset in changes.items():
+            if offset is None:
+                self.offsets.pop(record_id, None)
+            else:
+                self.offsets[record_id] = offset
+
+    @instrumented
+    def compact(self) -> None:
+        """Rewrite the file without superseded and deleted records."""
+        self.save(list(self.iter_load()))
+
+    def write_index(self) -> None:
+        """Save the id -> offset index so the next start doesn't scan the whole file."""
+        with open(self.filename, mode='rb') as file:
+            generation = file.read(HEADER_SIZE)[len(MAGIC):].hex()
+            size = os.fstat(file.fileno()).st_size
+        temp_filename = f"{self.index_filename}.tmp"
+        with open(temp_filename, mode='w') as file:
+            json.dump({'generation': generation, 'size': size, 'offsets': self.offsets}, file)
+        os.replace(temp_filename, self.index_filename)
+
+    def clear(self) -> None:
+        self._unmap()
+        self.offsets = {}
+        super().clear()
+        try:
+            os.remove(self.index_filename)
+        except FileNotFoundError:
+            pass
+
+    def close(self) -> None:
+        if os.path.exists(self.filename):
+            self.write_index()
+        self._unmap()
+
+    def _write(self, file, upserts: List[D], deleted_ids: List[str], offset: int) -> Dict[str, Optional[int]]:
+        changes: Dict[str, Optional[int]] = {}
+        start = offset
+        for dto in upserts:
+            payload = json.dumps(dto.to_dict()).encode('utf-8')
+            file.write(_RECORD_HEADER.pack(UPSERT, len(payload)))
+            file.write(payload)
+            changes[dto.id] = offset
+            offset += _RECORD_HEADER.size + len(payload)
+        for record_id in deleted_ids:
+            payload = record_id.encode('utf-8')
+            file.write(_RECORD_HEADER.pack(DELETE, len(payload)))
+            file.write(payload)
+            changes[record_id] = None
+            offset += _RECORD_HEADER.size + len(payload)
+        self._count_io('written', len(changes), offset - start)
+        return changes
+
+    def _load_offsets(self) -> None:
+        if not os.path.exists(self.filename):
+            return
+
+        data = self._mapped()
+        if data[:len(MAGIC)] != MAGIC or len(data) < HEADER_SIZE:
+            raise ValueError(f"{self.filename} is not a Chef's Book record file")
+        offset = HEADER_SIZE
+        if os.path.exists(self.index_filename):
+            with open(self.index_filename, mode='r') as file:
+                index = json.load(file)
+            if index.get('generation') == data[len(MAGIC):HEADER_SIZE].hex() and index['size'] <= len(data):
+                self.offsets = index['offsets']
+                offset = max(offset, index['size'])
+
+        while offset < len(data):
+            start = offset + _RECORD_HEADER.size
+            if start > len(data):
+                break
+            operation, length = _RECORD_HEADER.unpack_from(data, offset)
+            if start + length > len(data):
+                break
+            if operation == UPSERT:
+                self.offsets[json.loads(data[start:start + length])['id']] = offset
+            else:
+                self.offsets.pop(data[start:start + length].decode('utf-8'), None)
+            offset = start + length
+        if offset < len(data):
+            # a record torn by a crash in the middle of an append, cut it off
+            # so the next append doesn't land behind it
+            self._unmap()
+            with open(self.filename, mode='r+b') as file:
+                file.truncate(offset)
+
+    def _mapped(self) -> mmap.mmap:
+        if self._map is None:
+            with open(self.filename, mode='rb') as file:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _unmap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+class MappedRecords(MutableSequence, Generic[M]):
+    """List of records backed by a MappedStorage.
+
+    Slots only hold record ids. Models are hydrated when accessed and kept
+    in an LRU cache of `storage.cache_size` entries. Records that are new or
+    changed since the last save are pinned in memory until they are saved.
+    """
+
+    def __init__(self, storage: MappedStorage, model_cls: Type[M], on_hydrate: Callable[[M], None]):
+        self.storage = storage
+        self.model_cls = model_cls
+        self.on_hydrate = on_hydrate
+        self._ids: List[str] = storage.ids()
+        self._cache: 'OrderedDict[str, M]' = OrderedDict()
+        self._pinned: Dict[str, M] = {}
+        # concurrent readers of a service all hydrate through the same cache
+        self._lock = threading.Lock()
+
+    def ids(self) -> List[str]:
+        return list(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, position: int) -> M:
+        return self._get(self._ids[position])
+
+    def __setitem__(self, position: int, record: M) -> None:
+        self._ids[position] = record.id
+        self._keep(record)
+
+    def __delitem__(self, position: int) -> None:
+        # pinned changes are kept, the record may just be moving to another slot
+        del self._ids[position]
+
+    def insert(self, position: int, record: M) -> None:
+        self._ids.insert(position, record.id)
+        self._keep(record)
+
+    def clear(self) -> None:
+        self._ids.clear()
+        self._cache.clear()
+        self._pinned.clear()
+
+    def pin(self, record: M) -> None:
+        """Keep a changed record in memory until the next save."""
+        self._pinned[record.id] = record
+        self._cache.pop(record.id, None)
+
+    def unpin_all(self) -> None:
+        """Saved records can be evicted again."""
+        pinned, self._pinned = self._pinned, {}
+        for record in pinned.values():
+            self._cache_record(record)
+
+    def _get(self, record_id: str) -> M:
+        record = self._pinned.get(record_id)
+        if record is not None:
+            return record
+
+        with self._lock:
+            record = self._cache.get(record_id)
+            if record is not None:
+                self._cache.move_to_end(record_id)
+                return record
+
+            record = self.model_cls(self.storage.read(record_id))
+            record.subscribe(self._on_record_changed)
+            self.on_hydrate(record)
+            self._cache_record(record)
+            return record
+
+    def _keep(self, record: M) -> None:
+        record.subscribe(self._on_record_changed)
+        record_id = record.id
+        if record_id in self._pinned or record_id in self._cache:
+            return
+        if record_id in self.storage.offsets:
+            self._cache_record(record)
+        else:
+            # never saved, the storage can't hydrate it again
+            self.pin(record)
+
+    def _cache_record(self, record: M) -> None:
+        self._cache[record.id] = record
+        self._cache.move_to_end(record.id)
+        while len(self._cache) > self.storage.cache_size:
+            self._cache.popitem(last=False)
+
+    def _on_record_changed(self, record: M, field: str) -> None:
+        self.pin(record)
@@ -0,0 +1,121 @@
+"""Call counts, latencies and I/O counters of services and storages.
+
+Collection is off by default, an instrumented call then costs one flag
+check. Turn it on with `metrics.enable()` and read the numbers with
+`metrics.snapshot()`.
+"""
+
+
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# upper bounds of the latency histogram buckets, in seconds
+BUCKETS = [1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0]
+BUCKET_LABELS = ['1us', '10us', '100us', '1ms', '10ms', '100ms', '1s', '10s', 'inf']
+
+
+class OperationStats:
+    """Latencies of one operation"""
+
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def snapshot(self) -> dict:
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'min': self.min,
+            'max': self.max,
+            'histogram': dict(zip(BUCKET_LABELS, self.buckets)),
+        }
+
+
+class Metrics:
+    """Registry of operation latencies and counters"""
+
+    def __init__(self):
+        self.enabled = False
+        self.operations: Dict[str, OperationStats] = {}
+        self.counters: Dict[str, int] = {}
+        # services may be called from several threads
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.operations = {}
+            self.counters = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stats = self.operations.get(name)
+            if stats is None:
+                stats = self.operations[name] = OperationStats()
+            stats.observe(seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self) -> dict:
+        """Plain dict of every number collected so far, e.g. to dump as JSON"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'operations': {name: stats.snapshot() for name, stats in sorted(self.operations.items())},
+                'counters': dict(sorted(self.counters.items())),
+            }
+
+
+metrics = Metrics()
+
+
+def instrumented(method: Callable) -> Callable:
+    """Record the latency of a method as `<class name>.<method name>`"""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not metrics.enabled:
+            return method(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            metrics.observe(f"{type(self).__name__}.{name}", time.perf_counter() - start)
+
+    return wrapper
+
+
+def format_snapshot(snapshot: dict) -> List[str]:
+    """Human readable lines of a snapshot, used by the `stats` command"""
+    lines = []
+    for name, stats in snapshot['operations'].items():
+        lines.append(f"{name}: {stats['count']} calls, mean {stats['mean'] * 1000:.3f} ms, "
+                     f"max {stats['max'] * 1000:.3f} ms")
+    for name, value in snapshot['counters'].items():
+        lines.append(f"{name}: {value}")
+    return lines
@@ -0,0 +1,88 @@
+import functools
+from typing import Callable, Dict, List
+
+
+def changing(method: Callable) -> Callable:
+    """Run a model method changing fields under the write lock of the service holding the record"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        lock = self._lock
+        if lock is None:
+            return method(self, *args, **kwargs)
+        lock.acquire_write()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            lock.release_write()
+
+    return wrapper
+
+
+class Model:
+    """Base model class that notifies subscribers about changed fields.
+
+    The model keeps the DTO's values in `_raw`, not the DTO object itself.
+    Fields listed in `_lazy_fields` are built from them the first time they
+    are read, so loading a record doesn't parse every value. Subclasses
+    write a changed field back to `_raw` in `_store`, getters of plain
+    values read `_raw` directly.
+
+    Methods changing fields are decorated with `changing`: a record held by
+    a service changes the field and the service updates its indexes under
+    the same write lock, so readers never see one without the other.
+    """
+
+    __slots__ = ('_raw', '_listeners', '_lock')
+
+    # attribute name -> function building the field from the raw values
+    _lazy_fields: Dict[str, Callable[['Model'], object]] = {}
+
+    def __init__(self, dto):
+        # a copy, changes of the model must not leak into the caller's DTO
+        self._raw: Dict[str, object] = dict(vars(dto))
+        self._listeners: List[Callable[['Model', str], None]] = []
+        self._lock = None  # write lock of the service holding the record, see `guard`
+
+    def __getattr__(self, name: str):
+        factory = type(self)._lazy_fields.get(name)
+        if factory is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        value = factory(self)
+        setattr(self, name, value)
+        return value
+
+    def subscribe(self, listener: Callable[['Model', str], None]) -> None:
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[['Model', str], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def guard(self, lock) -> None:
+        """Make changes take the given ReadWriteLock, None once the record leaves the service"""
+        self._lock = lock
+
+    def raw(self, field: str) -> object:
+        """Stored value of a field, read without building the field object"""
+        return self._raw[field]
+
+    def _is_loaded(self, name: str) -> bool:
+        """Whether a lazy field has been built or assigned already"""
+        try:
+            object.__getattribute__(self, name)
+        except AttributeError:
+            return False
+        return True
+
+    def _store(self, field: str) -> None:
+        """Write the new value of a changed field to `_raw`"""
+        pass
+
+    @changing
+    def _changed(self, field: str) -> None:
+        """Tell every subscriber that the given field has been modified"""
+        self._store(field)
+        for listener in self._listeners:
+            listener(self, field)
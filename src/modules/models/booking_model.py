@@ -1,47 +1,99 @@
+from datetime import datetime, timedelta
 from typing import Optional
 
 from src.modules.dto.booking_dto import BookingDTO
+from src.modules.models.base_model import Model, changing
+from src.modules.models.fields.covers_field import CoversField
 from src.modules.models.fields.datetime_field import DatetimeField
+from src.modules.models.fields.duration_field import DurationField
 from src.modules.models.fields.id_field import IDField
 
 
-class Booking:
+class Booking(Model):
     """Customer booking model"""
 
-    def __init__(self, dto: BookingDTO = None):
-        if not dto:
-            dto = BookingDTO()
+    __slots__ = ('_id', '_customer_id', '_date', '_covers', '_duration')
+
+    _lazy_fields = {
+        '_id': lambda self: IDField(self._raw['id']),
+        '_customer_id': lambda self: IDField(self._raw['customer_id']) if self._raw['customer_id'] else None,
+        '_date': lambda self: DatetimeField(self._raw['date'], validate=False),
+        '_covers': lambda self: CoversField(self._raw['covers'], validate=False),
+        '_duration': lambda self: DurationField(self._raw['duration'], validate=False),
+    }
 
-        self._id = IDField(dto.id)
-        self._customer_id: Optional[IDField] = IDField(dto.customer_id) if dto.customer_id else None
-        self._date: Optional[DatetimeField] = DatetimeField(dto.date, validate=False)
+    def __init__(self, dto: BookingDTO = None):
+        super().__init__(dto or BookingDTO())
+        if not self._raw['id']:
+            self._id = IDField()
+            self._raw['id'] = str(self._id)
 
     @property
     def id(self) -> str:
-        return str(self._id)
+        return self._raw['id']
 
     @property
     def customer_id(self) -> Optional[str]:
-        return str(self._customer_id) if self._customer_id else None
+        return self._raw['customer_id']
 
     @customer_id.setter
+    @changing
     def customer_id(self, new_customer_id: str) -> None:
         self._customer_id = IDField(new_customer_id)
+        self._changed('customer_id')
 
     @property
     def date(self) -> Optional[str]:
-        return str(self._date) if self._date.value else None
+        return self._raw['date']
 
     @date.setter
+    @changing
     def date(self, new_date: str) -> None:
         self._date = DatetimeField(new_date)
+        self._changed('date')
+
+    @property
+    def starts_at(self) -> Optional[datetime]:
+        return self._date.value
+
+    @property
+    def covers(self) -> Optional[int]:
+        return self._raw['covers']
+
+    @covers.setter
+    @changing
+    def covers(self, covers: int) -> None:
+        self._covers = CoversField(covers)
+        self._changed('covers')
+
+    @property
+    def duration(self) -> Optional[timedelta]:
+        return self._duration.value
+
+    @duration.setter
+    @changing
+    def duration(self, minutes: int) -> None:
+        self._duration = DurationField(minutes)
+        self._changed('duration')
 
     def dto(self) -> BookingDTO:
         return BookingDTO(
-            id=str(self._id.value),
-            customer_id=str(self._customer_id.value),
-            date=str(self._date) if self._date.value else None
+            id=self.id,
+            customer_id=self.customer_id,
+            date=self.date,
+            covers=self.covers,
+            duration=self._raw['duration']
         )
 
+    def _store(self, field: str) -> None:
+        if field == 'customer_id':
+            self._raw['customer_id'] = str(self._customer_id)
+        elif field == 'date':
+            self._raw['date'] = str(self._date) if self._date.value else None
+        elif field == 'covers':
+            self._raw['covers'] = self._covers.value
+        elif field == 'duration':
+            self._raw['duration'] = int(str(self._duration)) if self._duration.value else None
+
     def __str__(self) -> str:
         return f": Booking for customer {self.customer_id} on {self.date}"
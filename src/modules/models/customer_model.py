@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import List, Tuple, Optional
 
 from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.models.base_model import Model, changing
 from src.modules.models.fields.address_field import AddressField
 from src.modules.models.fields.date_field import DateField
 from src.modules.models.fields.email_field import EmailField
@@ -11,120 +12,154 @@ from src.modules.models.fields.phone_field import PhoneField
 from src.modules.models.fields.note_field import NoteField
 
 
-class Customer:
+class Customer(Model):
     """Class for storing customer info"""
 
-    def __init__(self, dto: CustomerDTO = None):
-        if not dto:
-            dto = CustomerDTO()
+    __slots__ = ('_id', '_name', '_birthday', '_address', '_email', '_phones', '_notes')
+
+    _lazy_fields = {
+        '_id': lambda self: IDField(self._raw['id']),
+        '_name': lambda self: NameField(self._raw['name'], validate=False),
+        '_birthday': lambda self: DateField(self._raw['birthday'], validate=False),
+        '_address': lambda self: AddressField(self._raw['address'], validate=False),
+        '_email': lambda self: EmailField(self._raw['email'], validate=False),
+        '_phones': lambda self: [PhoneField(phone, validate=False) for phone in self._raw['phones']],
+        '_notes': lambda self: [self._attach_note(NoteField(note, list(tags), validate=False))
+                                for note, tags in zip(self._raw['notes'], self._raw_note_tags())],
+    }
 
-        self._id = IDField(dto.id)
-        self._name = NameField(dto.name, validate=False)
-        self._birthday = DateField(dto.birthday, validate=False)
-        self._address = AddressField(dto.address, validate=False)
-        self._email = EmailField(dto.email, validate=False)
-        self._phones = [PhoneField(phone, validate=False) for phone in dto.phones]
-        self._notes = [NoteField(note, validate=False) for note in dto.notes]
+    def __init__(self, dto: CustomerDTO = None):
+        super().__init__(dto or CustomerDTO())
+        if not self._raw['id']:
+            self._id = IDField()
+            self._raw['id'] = str(self._id)
 
     @property
     def id(self) -> str:
-        return str(self._id)
+        return self._raw['id']
 
     @property
     def name(self) -> str:
         return self._name
 
     @name.setter
+    @changing
     def name(self, name: str) -> None:
         self._name = NameField(name)
+        self._changed('name')
 
     @property
     def phones(self) -> List[str]:
-        return [phone.value for phone in self._phones]
+        return list(self._raw['phones'])
 
     @phones.setter
+    @changing
     def phones(self, phones: List[str]) -> None:
         self._phones = [PhoneField(phone) for phone in phones]
+        self._changed('phones')
 
     @property
     def birthday(self) -> Optional[datetime.date]:
         return self._birthday.value if self._birthday else None
 
     @birthday.setter
+    @changing
     def birthday(self, birthday: str) -> None:
         self._birthday = DateField(birthday)
+        self._changed('birthday')
 
     @property
     def address(self) -> Optional[str]:
-        return str(self._address)
+        return self._raw['address']
 
     @address.setter
+    @changing
     def address(self, address: str) -> None:
         self._address = AddressField(address)
+        self._changed('address')
 
     @property
     def email(self) -> Optional[str]:
-        return str(self._email)
+        return self._raw['email']
 
     @email.setter
+    @changing
     def email(self, email: str) -> None:
         self._email = EmailField(email)
+        self._changed('email')
 
     @property
     def notes(self) -> List[NoteField]:
         return self._notes
 
+    @property
+    def note_texts(self) -> List[str]:
+        return list(self._raw['notes'])
+
+    @property
+    def note_tags(self) -> List[List[str]]:
+        return [list(tags) for tags in self._raw_note_tags()]
+
     @notes.setter
+    @changing
     def notes(self, notes: List[Tuple[str, List[str]]]) -> None:
-        self._notes = [NoteField(note, tags) for note, tags in notes]
+        self._notes = [self._attach_note(NoteField(note, tags)) for note, tags in notes]
+        self._changed('notes')
 
+    @changing
     def add_phone(self, phone_number: str) -> None:
         self._phones.append(PhoneField(phone_number))
+        self._changed('phones')
 
+    @changing
     def edit_phone(self, old_phone_number: str, new_phone_number: str) -> None:
         self.remove_phone(old_phone_number)
         self.add_phone(new_phone_number)
 
+    @changing
     def remove_phone(self, phone_number: str) -> None:
         for index, p in enumerate(self._phones):
             if p.value == phone_number:
                 del self._phones[index]
+                self._changed('phones')
                 return
 
     def has_phone(self, phone_number: str) -> bool:
-        for phone in self._phones:
-            if phone.value == phone_number:
-                return True
-        return False
+        return phone_number in self.phones
 
+    @changing
     def add_note(self, note: str, tags: List[str] = None) -> None:
         new_note = NoteField(note)
         if tags:
             for tag in tags:
                 new_note.add_tag(tag)
-        self._notes.append(new_note)
+        self._notes.append(self._attach_note(new_note))
+        self._changed('notes')
 
+    @changing
     def edit_note(self, index_to_change: int, new_note: str, new_tags: List[str] = None) -> None:
         if 0 <= index_to_change < len(self._notes):
             updated_note = NoteField(new_note)
             if new_tags:
                 for tag in new_tags:
                     updated_note.add_tag(tag)
-            self._notes[index_to_change] = updated_note
+            self._notes[index_to_change] = self._attach_note(updated_note)
+            self._changed('notes')
 
+    @changing
     def remove_note(self, index_to_remove: int) -> None:
         del self._notes[index_to_remove - 1]
+        self._changed('notes')
 
     def has_note(self, note_to_search: str) -> bool:
-        for note in self._notes:
-            if note_to_search in note.value:
-                return True
-        return False
+        return any(note_to_search in note for note in self.note_texts)
 
+    @changing
     def add_tag_to_note(self, index: int, tag: str) -> None:
         if 0 <= index < len(self._notes):
             self._notes[index].add_tag(tag)
 
+    @changing
     def remove_tag_from_note(self, index: int, tag: str) -> None:
         if 0 <= index < len(self._notes):
             self._notes[index].remove_tag(tag)
@@ -136,15 +171,43 @@ class Customer:
         return sorted([(i, note.value, note.tags) for i, note in enumerate(self._notes)],
                       key=lambda x: len(x[2]), reverse=True)
 
+    def _raw_note_tags(self) -> List[List[str]]:
+        """Tags of the DTO notes, padded to one list per note"""
+        note_tags = self._raw['note_tags']
+        return note_tags + [[]] * (len(self._raw['notes']) - len(note_tags))
+
+    def _attach_note(self, note: NoteField) -> NoteField:
+        note.on_change = self._on_note_changed
+        return note
+
+    def _on_note_changed(self) -> None:
+        self._changed('notes')
+
+    def _store(self, field: str) -> None:
+        if field == 'name':
+            self._raw['name'] = self._name.value
+        elif field == 'phones':
+            self._raw['phones'] = [phone.value for phone in self._phones]
+        elif field == 'birthday':
+            self._raw['birthday'] = str(self._birthday) if self._birthday.value else None
+        elif field == 'address':
+            self._raw['address'] = self._address.value
+        elif field == 'email':
+            self._raw['email'] = self._email.value
+        elif field == 'notes':
+            self._raw['notes'] = [note.value for note in self._notes]
+            self._raw['note_tags'] = [list(note.tags) for note in self._notes]
+
     def dto(self) -> CustomerDTO:
         return CustomerDTO(
-            id=str(self._id) if self._id.value else None,
-            name=self._name.value,
-            phones=[str(phone) for phone in self._phones],
-            birthday=str(self._birthday) if self._birthday.value else None,
-            address=self._address.value,
-            email=self._email.value,
-            notes=[str(note) for note in self._notes],
+            id=self.id,
+            name=self._raw['name'],
+            phones=self.phones,
+            birthday=self._raw['birthday'],
+            address=self.address,
+            email=self.email,
+            notes=self.note_texts,
+            note_tags=self.note_tags,
         )
 
     def __str__(self) -> str:
@@ -2,6 +2,7 @@ from src.modules.models.fields.base_field import Field
 
 
 class AddressField(Field):
+    __slots__ = ()
     MIN_LENGTH = 3
     MAX_LENGTH = 255
 
@@ -9,6 +10,8 @@ class AddressField(Field):
         super().__init__(value, validate)
 
     def _validate(self, value):
+        if value is None:
+            return
         if not AddressField.MIN_LENGTH <= len(value) <= AddressField.MAX_LENGTH:
             raise ValueError(
                 f"The address '{value}' was not added. "
@@ -1,7 +1,11 @@
 class Field():
     """Base field class"""
 
+    # a book holds millions of fields, keep them free of a per-instance __dict__
+    __slots__ = ('value',)
+
     def __init__(self, value=None, validate=True):
+        # optional fields accept None in their own _validate, it clears them
         if validate:
             self._validate(value)
         if not (value is None):
@@ -0,0 +1,18 @@
+from src.modules.models.fields.base_field import Field
+
+
+class CoversField(Field):
+    __slots__ = ()
+    MIN_COVERS = 1
+    MAX_COVERS = 50
+
+    def __init__(self, value=None, validate=True):
+        super().__init__(value, validate)
+
+    def _validate(self, value):
+        if not CoversField.MIN_COVERS <= int(value) <= CoversField.MAX_COVERS:
+            raise ValueError(f"The number of covers must be between "
+                             f"{CoversField.MIN_COVERS} and {CoversField.MAX_COVERS}.")
+
+    def _parse(self, value):
+        return int(value)
@@ -1,9 +1,14 @@
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterable, List, Optional
 
 from src.modules.models.fields.base_field import Field
 
+CACHE_SIZE = 65536  # distinct strings remembered by parse_date, every day of a century fits
+
 
 class DateField(Field):
+    __slots__ = ()
     FORMAT = "%d.%m.%Y"
 
     def __init__(self, value=None, validate=True):
@@ -12,11 +17,31 @@ class DateField(Field):
     def __str__(self):
         return self.value.strftime(DateField.FORMAT)
 
-    def _validate(self, value):
+    def _parse(self, value):
+        # parsing is the validation, an invalid value can't be parsed
         try:
-            self._parse(value)
+            return parse_date(value)
         except ValueError:
             raise ValueError(f"Invalid date format. Use {DateField.FORMAT}")
 
-    def _parse(self, value):
-        return datetime.strptime(value, DateField.FORMAT).date()
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_date(value: str) -> date:
+    """Parse a "dd.mm.yyyy" string.
+
+    The fixed layout is sliced directly, anything else (e.g. "1.1.2000") goes
+    through strptime, so the accepted values don't change. Birthdays repeat a
+    lot, recent results are memoized.
+    """
+    if len(value) == 10 and value[2] == '.' and value[5] == '.':
+        digits = value[:2] + value[3:5] + value[6:]
+        if digits.isascii() and digits.isdigit():
+            return date(int(value[6:]), int(value[3:5]), int(value[:2]))
+    return datetime.strptime(value, DateField.FORMAT).date()
+
+
+def parse_dates(values: Iterable[Optional[str]]) -> List[Optional[date]]:
+    """Parse many date strings at once, each distinct string only once. Empty values stay None."""
+    parsed = {}
+    return [parsed[value] if value in parsed else parsed.setdefault(value, parse_date(value) if value else None)
+            for value in values]
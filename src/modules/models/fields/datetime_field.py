@@ -1,9 +1,14 @@
 from datetime import datetime
+from functools import lru_cache
+from typing import Iterable, List, Optional
 
 from src.modules.models.fields.base_field import Field
 
+CACHE_SIZE = 4096  # distinct strings remembered by parse_datetime
+
 
 class DatetimeField(Field):
+    __slots__ = ()
     FORMAT = "%d.%m.%Y %H:%M"
 
     def __init__(self, value=None, validate=True):
@@ -12,11 +17,31 @@ class DatetimeField(Field):
     def __str__(self):
         return self.value.strftime(DatetimeField.FORMAT)
 
-    def _validate(self, value):
+    def _parse(self, value):
+        # parsing is the validation, an invalid value can't be parsed
         try:
-            self._parse(value)
+            return parse_datetime(value)
         except ValueError:
             raise ValueError(f"Invalid date format. Use {DatetimeField.FORMAT}")
 
-    def _parse(self, value):
-        return datetime.strptime(value, DatetimeField.FORMAT).date()
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_datetime(value: str) -> datetime:
+    """Parse a "dd.mm.yyyy HH:MM" string.
+
+    Like parse_date, the fixed layout is sliced directly and other spellings
+    fall back to strptime. Bookings share a handful of slots, so results are
+    memoized as well.
+    """
+    if len(value) == 16 and value[2] == '.' and value[5] == '.' and value[10] == ' ' and value[13] == ':':
+        digits = value[:2] + value[3:5] + value[6:10] + value[11:13] + value[14:]
+        if digits.isascii() and digits.isdigit():
+            return datetime(int(value[6:10]), int(value[3:5]), int(value[:2]), int(value[11:13]), int(value[14:]))
+    return datetime.strptime(value, DatetimeField.FORMAT)
+
+
+def parse_datetimes(values: Iterable[Optional[str]]) -> List[Optional[datetime]]:
+    """Parse many datetime strings at once, each distinct string only once. Empty values stay None."""
+    parsed = {}
+    return [parsed[value] if value in parsed else parsed.setdefault(value, parse_datetime(value) if value else None)
+            for value in values]
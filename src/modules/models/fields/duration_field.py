@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from src.modules.models.fields.base_field import Field
+
+
+class DurationField(Field):
+    """Seating duration, stored in minutes"""
+    __slots__ = ()
+    MIN_MINUTES = 15
+    MAX_MINUTES = 600
+
+    def __init__(self, value=None, validate=True):
+        super().__init__(value, validate)
+
+    def __str__(self):
+        return str(int(self.value.total_seconds() // 60))
+
+    def _validate(self, value):
+        if not DurationField.MIN_MINUTES <= int(value) <= DurationField.MAX_MINUTES:
+            raise ValueError(f"The seating duration must be between "
+                             f"{DurationField.MIN_MINUTES} and {DurationField.MAX_MINUTES} minutes.")
+
+    def _parse(self, value):
+        return timedelta(minutes=int(value))
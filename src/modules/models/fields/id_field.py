@@ -4,6 +4,8 @@ from src.modules.models.fields.base_field import Field
 
 
 class IDField(Field):
+    __slots__ = ()
+
     def __init__(self, value=None):
         if value is None:
             value = uuid.uuid4()
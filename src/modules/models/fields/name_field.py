@@ -2,6 +2,7 @@ from src.modules.models.fields.base_field import Field
 
 
 class NameField(Field):
+    __slots__ = ()
     MIN_LENGTH = 3
     MAX_LENGTH = 40
 
@@ -9,6 +10,8 @@ class NameField(Field):
         super().__init__(value, validate)
 
     def _validate(self, value):
+        if value is None:
+            raise ValueError("The name is required.")
         if not NameField.MIN_LENGTH <= len(value) <= NameField.MAX_LENGTH:
             raise ValueError(f"The name '{value}' was not added. "
                              f"The name must be between {NameField.MIN_LENGTH} and {NameField.MAX_LENGTH} characters long.")
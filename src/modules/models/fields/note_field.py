@@ -1,13 +1,20 @@
+import sys
+from typing import Callable, Optional
+
 from src.modules.models.fields.base_field import Field
 
 
 class NoteField(Field):
+    __slots__ = ('tags', 'on_change')
     MIN_LENGTH = 3
     MAX_LENGTH = 255
 
     def __init__(self, value=None, tags=None, validate=True):
         super().__init__(value, validate)
-        self.tags = tags or []
+        # the same few tags repeat across all notes, share one string per tag
+        self.tags = [sys.intern(tag) for tag in tags] if tags else []
+        # called after the tags change, set by the customer owning the note
+        self.on_change: Optional[Callable[[], None]] = None
 
     def _validate(self, value):
         if not NoteField.MIN_LENGTH <= len(value) <= NoteField.MAX_LENGTH:
@@ -17,8 +24,14 @@ class NoteField(Field):
 
     def add_tag(self, tag):
         if tag not in self.tags:
-            self.tags.append(tag)
+            self.tags.append(sys.intern(tag))
+            self._notify()
 
     def remove_tag(self, tag):
         if tag in self.tags:
             self.tags.remove(tag)
+            self._notify()
+
+    def _notify(self):
+        if self.on_change:
+            self.on_change()
@@ -2,6 +2,7 @@ from src.modules.models.fields.base_field import Field
 
 
 class PhoneField(Field):
+    __slots__ = ()
     LENGTH = 10
 
     def __init__(self, value=None, validate=True):
@@ -0,0 +1,156 @@
+"""Server owning the book, so several terminals share one copy of the data.
+
+Clients connect to a Unix socket and send one command line per request, in
+the batch mode syntax (`add-tag "John Doe" 0 vip`). Every request gets one
+JSON line back: `{"ok": true, "result": ...}` or `{"ok": false, "error": ...}`.
+
+Commands run in worker threads under the locks of the services: reads hold
+both read locks and run concurrently, a changing command holds both write
+locks, so it runs alone and is saved before they are released. A line
+longer than LINE_LIMIT bytes is answered with an error.
+
+Concurrent reads are safe although a read may hydrate the lazy fields of a
+record: `_raw` only changes under the write lock, so readers racing to build
+the same field each build an identical value from it and the last assignment
+wins, the value a reader already holds stays valid. The other caches filled
+by reads (lazy indexes, the hydration cache of the mapped storage) take a
+lock of their own.
+"""
+
+
+import asyncio
+import json
+import os
+import shlex
+import signal
+from typing import Dict, Optional
+
+from src.modules.error_handler import ChefBookError
+from src.modules.service.bookings_service import BookingsService
+from src.modules.service.customers_service import CustomerService
+from src.modules.ui.batch import CHANGING_COMMANDS, CommandRunner
+from src.modules.ui.commands import Command
+
+SOCKET = ".chefs-book.sock"
+LINE_LIMIT = 64 * 1024  # bytes, the default buffer limit of asyncio streams
+
+
+class BookServer:
+    """Serves command lines from socket clients against one pair of services"""
+
+    def __init__(self, customer_service: CustomerService, bookings_service: BookingsService, path: str = SOCKET):
+        self.runner = CommandRunner(customer_service, bookings_service)
+        self.path = path
+        self._server: Optional[asyncio.AbstractServer] = None
+        # connection of every client -> the task serving it
+        self._clients: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            # left behind by a server that didn't shut down cleanly
+            os.remove(self.path)
+        self._server = await asyncio.start_unix_server(self._serve_client, path=self.path, limit=LINE_LIMIT)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop accepting clients, wait for the running command and save"""
+        if self._server is not None:
+            self._server.close()
+            clients = list(self._clients.items())
+            for writer, _ in clients:
+                writer.close()
+            await asyncio.gather(*[task for _, task in clients], return_exceptions=True)
+            await self._server.wait_closed()
+        await asyncio.get_running_loop().run_in_executor(None, self.runner.save)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    async def handle(self, line: str) -> dict:
+        """Run one command line, returns the response"""
+        try:
+            words = shlex.split(line)
+            if not words:
+                raise ChefBookError("Empty command.")
+            command = self.runner.command(words[0])
+            run = self._write if command in CHANGING_COMMANDS else self._read
+            result = await asyncio.get_running_loop().run_in_executor(None, run, command, words[1:])
+        except (ChefBookError, ValueError) as e:
+            return {'ok': False, 'error': str(e)}
+        return {'ok': True, 'result': result}
+
+    def _read(self, command: Command, args):
+        # always customers first, then bookings, so two commands can't wait on each other;
+        # reads run concurrently, hydrating a field is safe under the read lock, see the module docstring
+        with self.runner.customer_service.lock.reading(), self.runner.bookings_service.lock.reading():
+            return self.runner.execute(command, args)
+
+    def _write(self, command: Command, args):
+        with self.runner.customer_service.lock.writing(), self.runner.bookings_service.lock.writing():
+            try:
+                return self.runner.execute(command, args)
+            finally:
+                # a command may fail after changing a record
+                self.runner.save()
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients[writer] = asyncio.current_task()
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b'\n')
+                except asyncio.IncompleteReadError as e:
+                    line = e.partial  # the last line may come without a newline
+                except asyncio.LimitOverrunError as e:
+                    await _skip_line(reader, e.consumed)
+                    line = None
+                if line is None:
+                    response = {'ok': False, 'error': f"Command line is longer than {LINE_LIMIT} bytes."}
+                elif not line:
+                    break
+                else:
+                    line = line.decode('utf-8', errors='replace').strip()
+                    if line.lower() in (Command.EXIT.value, Command.CLOSE.value):
+                        break
+                    response = await self.handle(line)
+                writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+
+
+async def _skip_line(reader: asyncio.StreamReader, consumed: int) -> None:
+    """Drop the rest of a line over the limit, `consumed` bytes are known to come before its end"""
+    while True:
+        await reader.readexactly(consumed)
+        try:
+            await reader.readuntil(b'\n')
+            return
+        except asyncio.LimitOverrunError as e:
+            consumed = e.consumed
+
+
+def serve(customer_service: CustomerService, bookings_service: BookingsService, path: str = SOCKET) -> None:
+    """Run a server until interrupted, saving the book on the way out"""
+    server = BookServer(customer_service, bookings_service, path)
+
+    async def main():
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        await server.start()
+        print(f"Serving Chef's Book on {path}", flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
@@ -1,36 +1,254 @@
+import threading
+import time
 from collections import UserList
-from typing import Type, TypeVar, Generic, List, Optional
+from typing import Callable, Type, TypeVar, Generic, Iterable, Iterator, List, Optional, Dict, Union
 
+from src.modules.error_handler import DuplicateRecordError
+from src.modules.mapped_storage import MappedRecords, MappedStorage
+from src.modules.metrics import instrumented, metrics
+from src.modules.service.indexes import HashIndex, NGramIndex, SortedIndex, StorageIndex
+from src.modules.service.locks import ReadWriteLock, reading, writing
 from src.modules.storage import Storage
 
 D = TypeVar('D')
 M = TypeVar('M')
+Index = Union[HashIndex, SortedIndex, StorageIndex]
 
 
 class BaseService(UserList, Generic[D, M]):
-    """Base class to manage model instances"""
+    """Base class to manage model instances.
 
-    def __init__(self, dto_cls: Type[D], model_cls: Type[M], data_file: str):
+    Services can be shared between threads: queries run in parallel under
+    the read side of `lock`, changes take the write side. A record held by
+    the service changes its field and the indexes are updated under one
+    write lock, hold `lock.writing()` around several edits that readers
+    must only see together.
+    """
+
+    def __init__(self, dto_cls: Type[D], model_cls: Type[M], data_file: str, storage: Optional[Storage[D]] = None):
         super().__init__()
+        self.lock = ReadWriteLock()
+        # taken by readers building an index on first use, see _lazy_index
+        self._lazy_index_lock = threading.Lock()
+
+        self.storage = storage or Storage(dto_cls, data_file)
+        start = time.perf_counter()
+        if isinstance(self.storage, MappedStorage):
+            # larger than memory mode: records are hydrated on access
+            self.data: Union[List[M], MappedRecords[M]] = self.storage.records(model_cls, self._subscribe)
+            record_ids = self.data.ids()
+        else:
+            self.data = [model_cls(dto) for dto in self.storage.iter_load()]
+            record_ids = [record.id for record in self.data]
+            for record in self.data:
+                self._subscribe(record)
 
-        self.storage = Storage(dto_cls, data_file)
-        self.data: List[M] = [model_cls(dto) for dto in self.storage.load()]
+        # ids of records created, changed or deleted since the last save, as
+        # insertion ordered dicts: new records are saved in the order they were added
+        self._created: Dict[str, None] = {}
+        self._updated: Dict[str, None] = {}
+        self._deleted: Dict[str, None] = {}
 
+        # id -> position of the record in self.data
+        self._positions: Dict[str, int] = {record_id: i for i, record_id in enumerate(record_ids)}
+        self._indexes: List[Index] = []
+        self._create_indexes()
+        if metrics.enabled:
+            metrics.observe(f"{type(self).__name__}.load", time.perf_counter() - start)
+
+    @instrumented
+    @writing
     def add(self, record: M) -> None:
+        if record.id in self._positions:
+            raise DuplicateRecordError(f"Record with id '{record.id}' already exists")
+        self._positions[record.id] = len(self.data)
         self.data.append(record)
+        self._mark_created(record.id)
+
+        self._subscribe(record)
+        for index in self._indexes:
+            index.add(record)
 
+    @instrumented
+    @writing
+    def add_many(self, records: Iterable[M]) -> None:
+        """Add a batch of records, filling the indexes in one pass"""
+        records = list(records)
+        new_ids = set()
+        for record in records:
+            if record.id in self._positions or record.id in new_ids:
+                raise DuplicateRecordError(f"Record with id '{record.id}' already exists")
+            new_ids.add(record.id)
+
+        for record in records:
+            self._positions[record.id] = len(self.data)
+            self.data.append(record)
+            self._mark_created(record.id)
+            self._subscribe(record)
+        for index in self._indexes:
+            index.build(records)
+
+    @instrumented
+    @writing
     def delete(self, record_id: str) -> None:
-        self.data = [record for record in self.data if record.id != record_id]
+        position = self._positions.pop(record_id, None)
+        if position is None:
+            return
+
+        record = self.data[position]
+        self._unsubscribe(record)
+        self._mark_deleted(record_id)
+        for index in self._indexes:
+            index.remove(record_id)
 
+        # move the last record into the freed slot so removal stays O(1),
+        # _positions keeps the ids in the order the records were added
+        last = self.data.pop()
+        if position < len(self.data):
+            self.data[position] = last
+            self._positions[last.id] = position
+
+    @instrumented
+    @reading
     def find(self, record_id: str) -> Optional[M]:
-        for record in self.data:
-            if record.id == record_id:
-                return record
-        return None
+        position = self._positions.get(record_id)
+        return self.data[position] if position is not None else None
+
+    @instrumented
+    @reading
+    def find_many(self, record_ids: Iterable[str]) -> List[M]:
+        """Resolve ids, e.g. from an index or a storage query, to records"""
+        data = self.data
+        return [data[position] if position is not None else None
+                for position in map(self._positions.get, record_ids)]
+
+    def __iter__(self) -> Iterator[M]:
+        """Iterate over a snapshot of the records, other threads may change them meanwhile"""
+        with self.lock.reading():
+            if not isinstance(self.data, MappedRecords):
+                return iter(list(self._in_order()))
+            record_ids = list(self._positions)
+        # hydrate one by one, deleted records are skipped
+        return (record for record in map(self.find, record_ids) if record is not None)
 
+    @property
+    def is_dirty(self) -> bool:
+        return bool(self._created or self._updated or self._deleted)
+
+    @instrumented
+    @writing
     def save(self) -> None:
-        self.storage.save([record.dto() for record in self.data])
+        """Persist the records changed since the last save, skipping I/O when nothing changed"""
+        if not self.is_dirty:
+            return
+
+        upserts = [self.find(record_id).dto() for record_id in (*self._created, *self._updated)]
+        self.storage.save_changes(upserts, list(self._deleted),
+                                  lambda: [record.dto() for record in self._in_order()])
+        self._reset_changes()
+        for index in self._indexes:
+            if isinstance(index, StorageIndex):
+                index.saved()
+        if isinstance(self.data, MappedRecords):
+            self.data.unpin_all()
 
+    @instrumented
+    @writing
     def clear(self) -> None:
+        if not isinstance(self.data, MappedRecords):
+            for record in self.data:
+                self._unsubscribe(record)
         self.data.clear()
+        self._positions.clear()
+        self._reset_changes()
+        for index in self._indexes:
+            index.clear()
         self.storage.clear()
+
+    def _create_indexes(self) -> None:
+        """Register the secondary indexes of the service, building them is part of the load"""
+        pass
+
+    @writing
+    def _add_index(self, index: Index) -> Index:
+        """Register a secondary index and fill it with the current records"""
+        if not isinstance(index, StorageIndex):
+            # the storage answers a storage index from the saved records
+            index.build(self.data)
+        self._indexes.append(index)
+        return index
+
+    def _lazy_index(self, attribute: str, factory: Callable[[], Index]) -> Index:
+        """The index kept in `attribute`, created by `factory` and registered on first use.
+
+        Callers hold the read lock, no writer can change the records while
+        the index is built, and readers racing to build it wait on
+        `_lazy_index_lock`.
+        """
+        index = getattr(self, attribute)
+        if index is None:
+            with self._lazy_index_lock:
+                index = getattr(self, attribute)
+                if index is None:
+                    index = factory()
+                    index.build(self._in_order())
+                    self._indexes.append(index)
+                    setattr(self, attribute, index)
+        return index
+
+    def _add_hash_index(self, key_func: Callable[[M], Iterable], fields: Iterable[str], query: str) -> Index:
+        """Register a HashIndex, or a StorageIndex when the storage answers `query` from an index of its own"""
+        storage_query = getattr(self.storage, query, None)
+        if storage_query is not None:
+            return self._add_index(StorageIndex(storage_query, key_func, fields))
+        return self._add_index(HashIndex(key_func, fields))
+
+    def _find_indexed(self, index: Index, key) -> List[M]:
+        return self.find_many(index.find(key))
+
+    def _find_candidates(self, index: Optional[NGramIndex], query: str) -> Iterable[M]:
+        """Records that may contain the query, all of them without an index or if it can't narrow it"""
+        candidates = index.candidates(query) if index is not None else None
+        if candidates is None:
+            return self._in_order()
+        return self.find_many(candidates)
+
+    def _in_order(self) -> Iterator[M]:
+        """The records in the order they were added, which delete doesn't keep in self.data"""
+        return map(self.data.__getitem__, self._positions.values())
+
+    def _subscribe(self, record: M) -> None:
+        record.subscribe(self._on_record_changed)
+        record.guard(self.lock)
+
+    def _unsubscribe(self, record: M) -> None:
+        record.unsubscribe(self._on_record_changed)
+        record.guard(None)
+
+    def _mark_created(self, record_id: str) -> None:
+        if record_id in self._deleted:
+            # re-added after a delete: the stored row has to be overwritten, not created
+            self._deleted.pop(record_id)
+            self._updated[record_id] = None
+        else:
+            self._created[record_id] = None
+
+    def _mark_deleted(self, record_id: str) -> None:
+        self._updated.pop(record_id, None)
+        if record_id in self._created:
+            self._created.pop(record_id)
+        else:
+            self._deleted[record_id] = None
+
+    def _reset_changes(self) -> None:
+        self._created.clear()
+        self._updated.clear()
+        self._deleted.clear()
+
+    @writing
+    def _on_record_changed(self, record: M, field: str) -> None:
+        if record.id not in self._created:
+            self._updated[record.id] = None
+        for index in self._indexes:
+            if field in index.fields:
+                index.update(record)
@@ -1,22 +1,147 @@
-from typing import List
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Tuple, Union
 
 from src.modules.dto.booking_dto import BookingDTO
+from src.modules.metrics import instrumented
 from src.modules.models.booking_model import Booking
+from src.modules.models.fields.datetime_field import DatetimeField, parse_datetime
 from src.modules.service.base_service import BaseService
+from src.modules.service.indexes import HashIndex, SortedIndex, StorageSortedIndex
+from src.modules.service.locks import reading
+from src.modules.storage import Storage
 
 FILENAME = ".bookings.csv"
 
+CAPACITY = 40
+SEATING_DURATION = timedelta(hours=2)
+SLOT_STEP = timedelta(minutes=30)
+OPENING_TIME = time(12, 0)
+CLOSING_TIME = time(23, 0)
+
 
 class BookingsService(BaseService[BookingDTO, Booking]):
     """Storing and managing customers"""
 
-    def __init__(self):
-        super().__init__(BookingDTO, Booking, FILENAME)
+    def __init__(self, storage: Optional[Storage[BookingDTO]] = None,
+                 capacity: int = CAPACITY, seating_duration: timedelta = SEATING_DURATION):
+        super().__init__(BookingDTO, Booking, FILENAME, storage)
+
+        self.capacity = capacity
+        self.seating_duration = seating_duration
 
+    def _create_indexes(self) -> None:
+        self._customer_index = self._add_hash_index(
+            lambda booking: [booking.customer_id], ['customer_id'], 'find_ids_by_customer_id')
+        # keys come from the stored values, building the indexes doesn't hydrate the fields
+        if hasattr(self.storage, 'find_dates_between'):
+            # date range queries run on the index of the database
+            self._date_index = self._add_index(StorageSortedIndex(
+                self.storage.find_ids_by_date, self.storage.find_dates_between, self.storage.find_dates_from,
+                _starts_at, ['date']))
+        else:
+            self._date_index = self._add_index(SortedIndex(_starts_at, ['date']))
+        # distinct per-booking durations in minutes, to bound how far back an overlapping booking can start
+        self._duration_index = self._add_index(HashIndex(lambda booking: [booking.raw('duration')], ['duration']))
+
+    @instrumented
+    @reading
     def find_by_customer_id(self, customer_id: str) -> List[Booking]:
         """Find bookings by customer id"""
-        return [booking for booking in self if booking.customer_id == customer_id]
+        return self._find_indexed(self._customer_index, customer_id)
+
+    @instrumented
+    @reading
+    def find_by_date(self, date: Union[str, datetime]) -> List[Booking]:
+        """Find bookings starting exactly at the given date and time"""
+        if isinstance(date, str):
+            date = DatetimeField(date).value
+        return self._find_indexed(self._date_index, date)
+
+    @instrumented
+    @reading
+    def find_between(self, start: datetime, end: datetime) -> List[Booking]:
+        """Find bookings with start <= date < end, ordered by date"""
+        return self.find_many(self._date_index.range(start, end))
+
+    @instrumented
+    @reading
+    def find_on_day(self, day: date) -> List[Booking]:
+        """Find all bookings of the given day, ordered by time"""
+        start = datetime.combine(day, time.min)
+        return self.find_between(start, start + timedelta(days=1))
+
+    @instrumented
+    @reading
+    def next_bookings(self, count: int, now: Optional[datetime] = None) -> List[Booking]:
+        """Find the next `count` bookings starting from now"""
+        return self.find_many(self._date_index.first(now or datetime.now(), count))
+
+    @instrumented
+    @reading
+    def find_overlapping(self, start: datetime, duration: Optional[timedelta] = None,
+                         exclude_id: Optional[str] = None) -> List[Booking]:
+        """Find bookings whose seating overlaps [start, start + duration)"""
+        end = start + (duration or self.seating_duration)
+        earliest_start = start - self._longest_duration()
+        return [booking for booking in self.find_between(earliest_start, end)
+                if booking.id != exclude_id and self._ends_at(booking) > start]
+
+    @instrumented
+    @reading
+    def find_overlapping_booking(self, booking: Booking) -> List[Booking]:
+        """Find other bookings seated at the same time as the given one"""
+        return self.find_overlapping(booking.starts_at, booking.duration, exclude_id=booking.id)
+
+    @instrumented
+    @reading
+    def is_available(self, start: datetime, covers: int, duration: Optional[timedelta] = None) -> bool:
+        """Check that `covers` more guests fit in for the whole seating starting at `start`"""
+        end = start + (duration or self.seating_duration)
+        return self._peak_covers(self.find_overlapping(start, duration), start, end) + covers <= self.capacity
+
+    @instrumented
+    @reading
+    def free_slots(self, covers: int, start: Optional[datetime] = None, days: int = 7,
+                   duration: Optional[timedelta] = None) -> List[datetime]:
+        """List seating times in the next `days` days that have room for `covers` guests"""
+        start = start or datetime.now()
+        duration = duration or self.seating_duration
+        slots = []
+        for day_offset in range(days):
+            day = start.date() + timedelta(days=day_offset)
+            slot = datetime.combine(day, OPENING_TIME)
+            last_seating = datetime.combine(day, CLOSING_TIME) - duration
+            while slot <= last_seating:
+                if slot >= start and self.is_available(slot, covers, duration):
+                    slots.append(slot)
+                slot += SLOT_STEP
+        return slots
+
+    def _ends_at(self, booking: Booking) -> datetime:
+        return booking.starts_at + (booking.duration or self.seating_duration)
+
+    def _longest_duration(self) -> timedelta:
+        minutes = self._duration_index.keys()
+        return max([self.seating_duration, *(timedelta(minutes=int(value)) for value in minutes)])
+
+    def _peak_covers(self, bookings: List[Booking], start: datetime, end: datetime) -> int:
+        """Highest number of seated covers at any moment of [start, end)"""
+        events: List[Tuple[datetime, int]] = []
+        for booking in bookings:
+            covers = booking.covers or 1
+            events.append((max(booking.starts_at, start), covers))
+            events.append((min(self._ends_at(booking), end), -covers))
+
+        # guests leaving free their seats before new ones sit down at the same time
+        events.sort(key=lambda event: (event[0], event[1]))
+        peak = seated = 0
+        for _, change in events:
+            seated += change
+            peak = max(peak, seated)
+        return peak
+
 
-    def find_by_date(self, date: str) -> List[Booking]:
-        """Find bookings by date"""
-        return [booking for booking in self if booking.date == date]
+def _starts_at(booking: Booking) -> Optional[datetime]:
+    starts_at = booking.raw('date')
+    # parse_datetime remembers the slots it has seen, so no DatetimeField is built per booking
+    return parse_datetime(starts_at) if starts_at else None
@@ -0,0 +1,200 @@
+"""Bulk import of customers from CSV or JSON-lines files, e.g. exports of a reservation platform.
+
+The file is read in chunks and every row is validated in a process pool with
+the same field validators the CLI uses. Rows that fail are reported with their
+line number and every reason, the accepted ones are added to the service in
+one batch and saved once.
+
+CSV files have a header with the storage columns (`name`, `phones`, `birthday`,
+`address`, `email`, `notes`, `note_tags`), lists are joined with ';' like in
+the storage file. JSON lines hold one object per customer with the same keys,
+lists may also be given as JSON arrays. The storage file joins notes with ';'
+and tags with ',', a note holding ';' or a tag holding either separator is
+rejected. Ids in the file are ignored, imported customers get new ones.
+"""
+
+
+import csv
+import itertools
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Iterator, List, NamedTuple, Optional, Tuple
+
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.models.customer_model import Customer
+from src.modules.models.fields.address_field import AddressField
+from src.modules.models.fields.date_field import DateField
+from src.modules.models.fields.email_field import EmailField
+from src.modules.models.fields.name_field import NameField
+from src.modules.models.fields.note_field import NoteField
+from src.modules.models.fields.phone_field import PhoneField
+from src.modules.service.customers_service import CustomerService
+
+CHUNK_SIZE = 2000  # rows sent to a worker at once
+
+# (line number, row) as read from the file
+Row = Tuple[int, dict]
+
+
+class RejectedRow(NamedTuple):
+    line: int
+    errors: List[str]
+
+
+class ImportResult(NamedTuple):
+    accepted: List[Customer]
+    rejected: List[RejectedRow]
+
+
+def import_customers(service: CustomerService, filename: str, chunk_size: int = CHUNK_SIZE,
+                     workers: Optional[int] = None) -> ImportResult:
+    """Validate and add the customers of a file, saving the service once.
+
+    `workers` is the size of the process pool, os.cpu_count() by default.
+    With a single worker, or a file of a single chunk, the rows are validated
+    in this process, a pool would cost more than it saves.
+    """
+    workers = os.cpu_count() if workers is None else workers
+
+    accepted: List[Customer] = []
+    rejected: List[RejectedRow] = []
+    names = set()
+    for line, values, errors in _validate(read_chunks(filename, chunk_size), workers):
+        if not errors:
+            name = values['name'].casefold()
+            if name in names or service.find_by_name(values['name']):
+                errors = [f"Customer with name '{values['name']}' already exists."]
+            names.add(name)
+        if errors:
+            rejected.append(RejectedRow(line, errors))
+        else:
+            accepted.append(Customer(CustomerDTO.from_trusted(values)))
+
+    if accepted:
+        service.add_many(accepted)
+        service.save()
+    return ImportResult(accepted, rejected)
+
+
+def read_chunks(filename: str, chunk_size: int = CHUNK_SIZE) -> Iterator[List[Row]]:
+    """Read the rows of a CSV or JSON-lines file, `chunk_size` rows at a time"""
+    rows = _read_jsonl(filename) if filename.endswith(('.jsonl', '.ndjson')) else _read_csv(filename)
+    chunk: List[Row] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_chunk(chunk: List[Row]) -> List[Tuple[int, Optional[dict], List[str]]]:
+    """Validate rows in a worker process, see `validate_row`"""
+    return [(line, *validate_row(row)) for line, row in chunk]
+
+
+def validate_row(row: dict) -> Tuple[Optional[dict], List[str]]:
+    """Check every field of a row, returns CustomerDTO values, or None and the reasons"""
+    if '_error' in row:
+        return None, [row['_error']]
+    try:
+        values = _row_values(row)
+    except (TypeError, AttributeError):
+        return None, ["Phones, notes and tags must be text or lists of text."]
+    errors = []
+    if not values['name']:
+        errors.append("The name is missing.")
+    else:
+        _check(NameField, values['name'], errors)
+    for phone in values['phones']:
+        _check(PhoneField, phone, errors)
+    for note in values['notes']:
+        if ';' in note:
+            errors.append(f"The note '{note}' can't contain ';'.")
+        else:
+            _check(NoteField, note, errors)
+    for tag in {tag for tags in values['note_tags'] for tag in tags}:
+        if ',' in tag or ';' in tag:
+            errors.append(f"The tag '{tag}' can't contain ',' or ';'.")
+    for field_cls, name in ((AddressField, 'address'), (EmailField, 'email')):
+        if values[name]:
+            _check(field_cls, values[name], errors)
+    if values['birthday']:
+        birthday = _check(DateField, values['birthday'], errors)
+        if birthday:
+            # store the canonical dd.mm.yyyy form, e.g. for "1.2.1990"
+            values['birthday'] = str(birthday)
+    if len(values['note_tags']) > len(values['notes']):
+        errors.append("There are more tag lists than notes.")
+    return (None, errors) if errors else (values, errors)
+
+
+def _validate(chunks: Iterator[List[Row]], workers: int) -> Iterator[Tuple[int, Optional[dict], List[str]]]:
+    head = list(itertools.islice(chunks, 2))
+    chunks = itertools.chain(head, chunks)
+    if workers <= 1 or len(head) < 2:
+        for chunk in chunks:
+            yield from validate_chunk(chunk)
+        return
+
+    # a few chunks in flight per worker, the file is never read ahead in full
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(validate_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _check(field_cls, value, errors: List[str]):
+    try:
+        return field_cls(value)
+    except ValueError as e:
+        errors.append(str(e))
+    except (TypeError, AttributeError):
+        errors.append(f"Invalid value {value!r} for {field_cls.__name__}.")
+    return None
+
+
+def _row_values(row: dict) -> dict:
+    """CustomerDTO values of a CSV row or JSON object, lists may already be split"""
+    # JSON arrays are taken as they are, joining and re-splitting them would
+    # break a note or tag holding a separator apart
+    values = CustomerDTO.decode({key: value for key, value in row.items() if not isinstance(value, list)})
+    for key in ('phones', 'notes'):
+        if isinstance(row.get(key), list):
+            values[key] = [_text(item) for item in row[key] if item]
+    if isinstance(row.get('note_tags'), list):
+        values['note_tags'] = [[_text(tag) for tag in tags if tag] if isinstance(tags, list)
+                               else [tag for tag in _text(tags).split(',') if tag] for tags in row['note_tags']]
+    values['id'] = None
+    return values
+
+
+def _text(value) -> str:
+    if not isinstance(value, str):
+        raise TypeError(f"Expected text, got {value!r}")
+    return value
+
+
+def _read_csv(filename: str) -> Iterator[Row]:
+    with open(filename, newline='', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def _read_jsonl(filename: str) -> Iterator[Row]:
+    with open(filename, encoding='utf-8') as file:
+        for line, text in enumerate(file, start=1):
+            if text.strip():
+                try:
+                    row = json.loads(text)
+                except ValueError as e:
+                    row = {'_error': f"Invalid JSON: {e}"}
+                yield line, row if isinstance(row, dict) else {'_error': "Expected a JSON object."}
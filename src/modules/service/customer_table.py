@@ -0,0 +1,267 @@
+"""Columnar view of the customers for reports over the whole book.
+
+Needs NumPy, which is an optional dependency: pip install numpy
+"""
+
+import calendar
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+INITIAL_CAPACITY = 1024
+NO_CITY = -1
+NO_BIRTHDAY = 0
+NOT_UPCOMING = 1000  # sorts after every offset of a birthday window
+
+
+class CustomerTable:
+    """Customer columns as NumPy arrays, one row per customer.
+
+    Birthdays are kept as date ordinals and as `month * 100 + day` keys,
+    cities and tags are dictionary encoded: a city is a code into
+    `city_names`, every name in `tag_names` has an array of the rows of its
+    customers (tags are free-form, a dense tag x customer matrix would grow
+    by a full row for every new tag). Filters return boolean masks over the
+    rows, so they can be combined with `&` and `|` before `select` turns
+    them into customer ids.
+
+    The table follows the index protocol of BaseService (`build`, `add`,
+    `remove`, `update`, `clear`), the service keeps it in sync. Rows of
+    deleted customers are reused by the next added ones.
+    """
+
+    fields = {'birthday', 'address', 'email', 'notes'}
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        if np is None:
+            raise ImportError("The customer table needs NumPy, install it with: pip install numpy")
+
+        self.city_names: List[str] = []
+        self.tag_names: List[str] = []
+        self._city_codes: Dict[str, int] = {}
+        self._tag_codes: Dict[str, int] = {}
+
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._size = 0  # rows in use, including freed ones
+        self._allocate(capacity)
+
+        # tag code -> rows of its customers, the first _tag_sizes[code] entries are used
+        self._tag_rows: List['np.ndarray'] = []
+        self._tag_sizes: List[int] = []
+        # row -> tag codes, for the rows having any
+        self._row_tags: Dict[int, Tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def build(self, records: Iterable) -> None:
+        """Add many records, writing each column in one go"""
+        values = [self._values(record) for record in records]
+        if not values:
+            return
+
+        rows = self._take_rows(len(values))
+        ids, birthdays, birthday_keys, emails, cities, tags = zip(*values)
+        for record_id, row in zip(ids, rows.tolist()):
+            self._rows[record_id] = row
+        self._ids[rows] = ids
+        self._alive[rows] = True
+        self._birthdays[rows] = birthdays
+        self._birthday_keys[rows] = birthday_keys
+        self._has_email[rows] = emails
+        self._cities[rows] = cities
+
+        rows_by_tag: Dict[int, List[int]] = {}
+        for row, codes in zip(rows.tolist(), tags):
+            if codes:
+                self._row_tags[row] = codes
+                for code in codes:
+                    rows_by_tag.setdefault(code, []).append(row)
+        for code, tag_rows in rows_by_tag.items():
+            self._append_tag_rows(code, tag_rows)
+
+    def add(self, record) -> None:
+        self.build([record])
+
+    def remove(self, record_id: str) -> None:
+        row = self._rows.pop(record_id, None)
+        if row is None:
+            return
+        self._ids[row] = None
+        self._alive[row] = False
+        for code in self._row_tags.pop(row, ()):
+            # move the last row of the tag into the freed slot
+            tag_rows, size = self._tag_rows[code], self._tag_sizes[code]
+            position = np.flatnonzero(tag_rows[:size] == row)[0]
+            tag_rows[position] = tag_rows[size - 1]
+            self._tag_sizes[code] = size - 1
+        self._free.append(row)
+
+    def update(self, record) -> None:
+        self.remove(record.id)
+        self.add(record)
+
+    def clear(self) -> None:
+        self._rows.clear()
+        self._free.clear()
+        self._size = 0
+        self._alive[:] = False
+        self._row_tags.clear()
+        self._tag_sizes = [0] * len(self._tag_sizes)
+
+    # filters, each returns a boolean mask over the rows
+
+    def alive(self) -> 'np.ndarray':
+        return self._alive[:self._size].copy()
+
+    def with_email(self) -> 'np.ndarray':
+        return self._has_email[:self._size] & self._alive[:self._size]
+
+    def without_email(self) -> 'np.ndarray':
+        return ~self._has_email[:self._size] & self._alive[:self._size]
+
+    def in_city(self, city: str) -> 'np.ndarray':
+        code = self._city_codes.get(city)
+        if code is None:
+            return np.zeros(self._size, dtype=bool)
+        return (self._cities[:self._size] == code) & self._alive[:self._size]
+
+    def with_tag(self, tag: str) -> 'np.ndarray':
+        mask = np.zeros(self._size, dtype=bool)
+        code = self._tag_codes.get(tag)
+        if code is not None:
+            mask[self._tag_rows[code][:self._tag_sizes[code]]] = True
+        return mask
+
+    def born_between(self, start: date, end: date) -> 'np.ndarray':
+        """Customers born on start <= birthday < end"""
+        birthdays = self._birthdays[:self._size]
+        return (birthdays >= start.toordinal()) & (birthdays < end.toordinal()) & self._alive[:self._size]
+
+    def birthday_within(self, date_range: int = 7, today: Optional[date] = None) -> 'np.ndarray':
+        """Customers with a birthday in the next `date_range` days, like CustomerService.customer_birthdays"""
+        return self._birthday_offsets(date_range, today) != NOT_UPCOMING
+
+    # results
+
+    def select(self, mask: 'np.ndarray') -> List[str]:
+        """Ids of the customers in the mask, in row order"""
+        return self._ids[:self._size][mask].tolist()
+
+    def upcoming_birthdays(self, date_range: int = 7, today: Optional[date] = None) -> List[str]:
+        """Ids of customers with a birthday in the next `date_range` days, ordered by date"""
+        offsets = self._birthday_offsets(date_range, today)
+        upcoming = np.flatnonzero(offsets != NOT_UPCOMING)
+        order = np.argsort(offsets[upcoming], kind='stable')
+        return self._ids[upcoming[order]].tolist()
+
+    def count(self, mask: Optional['np.ndarray'] = None) -> int:
+        return int(np.count_nonzero(self._alive[:self._size] if mask is None else mask))
+
+    def count_by_city(self, mask: Optional['np.ndarray'] = None) -> Dict[str, int]:
+        cities = self._cities[:self._size][self._rows_mask(mask)]
+        counts = np.bincount(cities[cities != NO_CITY], minlength=len(self.city_names))
+        return {name: int(count) for name, count in zip(self.city_names, counts) if count}
+
+    def count_by_tag(self, mask: Optional['np.ndarray'] = None) -> Dict[str, int]:
+        """Number of customers having each tag on at least one of their notes"""
+        if mask is None:
+            counts = self._tag_sizes
+        else:
+            counts = [np.count_nonzero(mask[tag_rows[:size]])
+                      for tag_rows, size in zip(self._tag_rows, self._tag_sizes)]
+        return {name: int(count) for name, count in zip(self.tag_names, counts) if count}
+
+    def count_by_birth_month(self, mask: Optional['np.ndarray'] = None) -> Dict[int, int]:
+        keys = self._birthday_keys[:self._size][self._rows_mask(mask)]
+        counts = np.bincount(keys[keys != NO_BIRTHDAY] // 100, minlength=13)
+        return {month: int(counts[month]) for month in range(1, 13) if counts[month]}
+
+    def _rows_mask(self, mask: Optional['np.ndarray']) -> 'np.ndarray':
+        return self._alive[:self._size] if mask is None else mask
+
+    def _birthday_offsets(self, date_range: int, today: Optional[date]) -> 'np.ndarray':
+        """Days until the next birthday of every row within the range, NOT_UPCOMING otherwise"""
+        today = today or datetime.today().date()
+        # offset of every month * 100 + day key inside the window
+        key_offsets = np.full(1232, NOT_UPCOMING, dtype=np.int16)
+        for offset in range(min(date_range, 365), -1, -1):
+            day = today + timedelta(days=offset)
+            key_offsets[day.month * 100 + day.day] = offset
+            if (day.month, day.day) == (2, 28) and not calendar.isleap(day.year):
+                key_offsets[229] = offset
+
+        offsets = key_offsets[self._birthday_keys[:self._size]]
+        offsets[~self._alive[:self._size]] = NOT_UPCOMING
+        return offsets
+
+    def _values(self, record) -> Tuple[str, int, int, bool, int, Tuple[int, ...]]:
+        birthday = record.birthday
+        tags = {tag for tags in record.note_tags for tag in tags}
+        return (record.id,
+                birthday.toordinal() if birthday else NO_BIRTHDAY,
+                birthday.month * 100 + birthday.day if birthday else NO_BIRTHDAY,
+                bool(record.email),
+                self._city_code(record.address),
+                tuple(self._tag_code(tag) for tag in tags))
+
+    def _city_code(self, address: Optional[str]) -> int:
+        # addresses are written as "[Address Line 1], [City], [Country]"
+        components = address.split(',') if address else []
+        if len(components) < 2 or not components[1].strip():
+            return NO_CITY
+        city = components[1].strip()
+        code = self._city_codes.get(city)
+        if code is None:
+            code = self._city_codes[city] = len(self.city_names)
+            self.city_names.append(city)
+        return code
+
+    def _tag_code(self, tag: str) -> int:
+        code = self._tag_codes.get(tag)
+        if code is None:
+            code = self._tag_codes[tag] = len(self.tag_names)
+            self.tag_names.append(tag)
+            self._tag_rows.append(np.empty(8, dtype=np.int32))
+            self._tag_sizes.append(0)
+        return code
+
+    def _append_tag_rows(self, code: int, rows: List[int]) -> None:
+        tag_rows, size = self._tag_rows[code], self._tag_sizes[code]
+        if size + len(rows) > len(tag_rows):
+            grown = np.empty(max(2 * len(tag_rows), size + len(rows)), dtype=np.int32)
+            grown[:size] = tag_rows[:size]
+            self._tag_rows[code] = tag_rows = grown
+        tag_rows[size:size + len(rows)] = rows
+        self._tag_sizes[code] = size + len(rows)
+
+    def _take_rows(self, count: int) -> 'np.ndarray':
+        """Row numbers for `count` new records, freed rows first"""
+        reused = [self._free.pop() for _ in range(min(count, len(self._free)))]
+        new = count - len(reused)
+        if self._size + new > len(self._ids):
+            self._allocate(max(2 * len(self._ids), self._size + new))
+        rows = np.array(reused + list(range(self._size, self._size + new)), dtype=np.intp)
+        self._size += new
+        return rows
+
+    def _allocate(self, capacity: int) -> None:
+        """Create or grow the columns, keeping the rows written so far"""
+        columns = {
+            '_ids': np.empty(capacity, dtype=object),
+            '_alive': np.zeros(capacity, dtype=bool),
+            '_birthdays': np.full(capacity, NO_BIRTHDAY, dtype=np.int32),
+            '_birthday_keys': np.full(capacity, NO_BIRTHDAY, dtype=np.int16),
+            '_has_email': np.zeros(capacity, dtype=bool),
+            '_cities': np.full(capacity, NO_CITY, dtype=np.int32),
+        }
+        for name, column in columns.items():
+            old = getattr(self, name, None)
+            if old is not None:
+                column[:len(old)] = old
+            setattr(self, name, column)
@@ -1,9 +1,17 @@
-from datetime import datetime
-from typing import List
+import calendar
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterable, List, Optional, Tuple, Union
 
 from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.mapped_storage import MappedStorage
+from src.modules.metrics import instrumented
 from src.modules.models.customer_model import Customer
+from src.modules.models.fields.date_field import DateField, parse_date
 from src.modules.service.base_service import BaseService
+from src.modules.service.customer_table import CustomerTable
+from src.modules.service.indexes import HashIndex, InvertedIndex, NGramIndex, StorageIndex
+from src.modules.service.locks import reading
+from src.modules.storage import Storage
 
 FILENAME = ".customers.csv"
 
@@ -11,49 +19,146 @@ FILENAME = ".customers.csv"
 class CustomerService(BaseService[CustomerDTO, Customer]):
     """Storing and managing customers"""
 
-    def __init__(self):
-        super().__init__(CustomerDTO, Customer, FILENAME)
-
-    def customer_birthdays(self, date_range: int = 7) -> List[Customer]:
-        today = datetime.today().date()
+    def __init__(self, storage: Optional[Storage[CustomerDTO]] = None):
+        super().__init__(CustomerDTO, Customer, FILENAME, storage)
+        self._table: Optional[CustomerTable] = None
+
+    def _create_indexes(self) -> None:
+        # keys come from the stored values, building the indexes doesn't hydrate the fields
+        self._name_index = self._add_hash_index(
+            lambda customer: [_name_key(customer.raw('name'))], ['name'], 'find_ids_by_name')
+        self._phone_index = self._add_hash_index(lambda customer: customer.phones, ['phones'], 'find_ids_by_phone')
+        self._email_index = self._add_hash_index(lambda customer: [customer.email], ['email'], 'find_ids_by_email')
+        self._birthday_index = self._add_index(HashIndex(lambda customer: [_birthday(customer)], ['birthday']))
+        self._calendar_index = self._add_index(HashIndex(lambda customer: [_calendar_key(customer)], ['birthday']))
+        if hasattr(self.storage, 'find_ids_by_tag'):
+            self._tag_index = self._add_index(StorageIndex(
+                self.storage.find_ids_by_tag, lambda customer: [tag for tags in customer.note_tags for tag in tags],
+                ['notes']))
+        else:
+            self._tag_index = self._add_index(InvertedIndex(
+                lambda customer: [(tag, i) for i, tags in enumerate(customer.note_tags) for tag in tags], ['notes']))
+        # the trigram indexes take most of the startup time and memory, they are
+        # built by the first search that needs them, see _ngram_index
+        self._contact_ngram_index: Optional[NGramIndex] = None
+        self._note_ngram_index: Optional[NGramIndex] = None
+
+    def table(self) -> CustomerTable:
+        """Columnar view of the customers for reports, built on first use and kept in sync (needs NumPy)"""
+        if self._table is None:
+            with self.lock.writing():
+                if self._table is None:
+                    self._table = self._add_index(CustomerTable())
+        return self._table
+
+    def _ngram_index(self, attribute: str, texts: Callable[[Customer], Iterable[str]],
+                     fields: List[str]) -> Optional[NGramIndex]:
+        """The trigram index kept in `attribute`, built on first use, None in mapped mode"""
+        if isinstance(self.storage, MappedStorage):
+            # the trigrams of every record would outgrow the hydration cache
+            # of a larger than memory book, search scans the records there
+            return None
+        return self._lazy_index(attribute, lambda: NGramIndex(texts, fields))
+
+    @instrumented
+    @reading
+    def customer_birthdays(self, date_range: int = 7, today: Optional[date] = None) -> List[Customer]:
+        """Customers with a birthday in the next `date_range` days, ordered by date.
+
+        29 February birthdays are celebrated on 28 February in non-leap years.
+        """
+        today = today or datetime.today().date()
         upcoming_birthdays: List[Customer] = []
+        seen = set()
 
-        for record in self:
-            if record.birthday is None:
-                continue
-
-            birthday = record.birthday
-            upcoming_birthday = birthday.replace(year=today.year)
-
-            # birthday has passed this year
-            if today > upcoming_birthday:
-                upcoming_birthday = birthday.replace(year=today.year + 1)
-
-            days_delta = (upcoming_birthday - today).days
+        for offset in range(min(date_range, 365) + 1):
+            day = today + timedelta(days=offset)
+            keys = [(day.month, day.day)]
+            if (day.month, day.day) == (2, 28) and not calendar.isleap(day.year):
+                keys.append((2, 29))
 
-            # birthday is not in the next x days
-            if 0 <= days_delta <= date_range:
-                upcoming_birthdays.append(record)
+            for key in keys:
+                if key in seen:
+                    continue
+                seen.add(key)
+                upcoming_birthdays.extend(self._find_indexed(self._calendar_index, key))
 
         return upcoming_birthdays
 
+    @instrumented
+    @reading
     def find_by_name(self, name: str) -> List[Customer]:
-        return [customer for customer in self if customer.name.value.lower() == name.lower()]
+        return self._find_indexed(self._name_index, _name_key(name))
 
+    @instrumented
+    @reading
     def find_by_phone(self, phone: str) -> List[Customer]:
-        return [customer for customer in self if customer.has_phone(phone)]
+        return self._find_indexed(self._phone_index, phone)
 
+    @instrumented
+    @reading
     def find_by_email(self, email: str) -> List[Customer]:
-        return [customer for customer in self if customer.email.value == email]
+        return self._find_indexed(self._email_index, email)
 
-    def find_by_birthday(self, birthday: str) -> List[Customer]:
-        return [customer for customer in self if customer.birthday.value == birthday]
+    @instrumented
+    @reading
+    def find_by_birthday(self, birthday: Union[str, date]) -> List[Customer]:
+        if isinstance(birthday, str):
+            birthday = DateField(birthday).value
+        return self._find_indexed(self._birthday_index, birthday)
 
+    @instrumented
+    @reading
     def find_by_note(self, note: str) -> List[Customer]:
-        return [customer for customer in self if customer.has_note(note)]
-
+        index = self._ngram_index('_note_ngram_index', lambda customer: customer.note_texts, ['notes'])
+        return [customer for customer in self._find_candidates(index, note)
+                if customer.has_note(note)]
+
+    @instrumented
+    @reading
+    def search(self, query: str) -> List[Customer]:
+        """Find customers whose name, phones or email contain the query, ignoring case"""
+        query = query.lower()
+        index = self._ngram_index('_contact_ngram_index', _contact_texts, ['name', 'phones', 'email'])
+        return [customer for customer in self._find_candidates(index, query)
+                if any(text and query in text.lower() for text in _contact_texts(customer))]
+
+    @instrumented
+    @reading
     def find_by_tag(self, tag: str) -> List[Customer]:
-        return [customer for customer in self if any(tag in note.tags for note in customer.notes)]
-
+        return self._find_indexed(self._tag_index, tag)
+
+    @instrumented
+    @reading
+    def find_notes_by_tag(self, tag: str) -> List[Tuple[Customer, int]]:
+        """Find (customer, note index) pairs for every note carrying the tag"""
+        if isinstance(self._tag_index, InvertedIndex):
+            return [(self.find(customer_id), note_index)
+                    for customer_id, note_indexes in self._tag_index.find_postings(tag)
+                    for note_index in note_indexes]
+        return [(customer, note_index) for customer in self.find_by_tag(tag)
+                for note_index, tags in enumerate(customer.note_tags) if tag in tags]
+
+    @instrumented
+    @reading
     def sort_by_tags(self) -> List[Customer]:
-        return sorted(self, key=lambda customer: sorted([tag for note in customer.notes for tag in note.tags]))
+        return sorted(self, key=lambda customer: sorted([tag for tags in customer.note_tags for tag in tags]))
+
+
+def _contact_texts(customer: Customer) -> List[str]:
+    return [customer.raw('name'), *customer.phones, customer.email]
+
+
+def _name_key(name: Optional[str]) -> Optional[str]:
+    return name.casefold() if name else None
+
+
+def _birthday(customer: Customer) -> Optional[date]:
+    birthday = customer.raw('birthday')
+    # parse_date remembers the dates it has seen, so no DateField is built per customer
+    return parse_date(birthday) if birthday else None
+
+
+def _calendar_key(customer: Customer) -> Optional[Tuple[int, int]]:
+    birthday = _birthday(customer)
+    return (birthday.month, birthday.day) if birthday else None
@@ -0,0 +1,269 @@
+"""Secondary indexes over service records"""
+
+import bisect
+import heapq
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+
+class HashIndex:
+    """Maps keys derived from a record to the ids of matching records.
+
+    `key_func` returns every key a record should be found by, `fields` lists
+    the model fields the keys depend on, so the index is only rebuilt for a
+    record when one of them changes.
+    """
+
+    def __init__(self, key_func: Callable[[object], Iterable[Hashable]], fields: Iterable[str]):
+        self.key_func = key_func
+        self.fields: Set[str] = set(fields)
+        # dicts instead of sets to keep insertion order of the results
+        self._buckets: Dict[Hashable, Dict[str, object]] = {}
+        # tuples, most records have a single key and a set of one costs four times more
+        self._keys: Dict[str, Tuple[Hashable, ...]] = {}
+
+    def add(self, record) -> None:
+        record_id = record.id
+        keys = tuple({key for key in self.key_func(record) if key is not None})
+        self._keys[record_id] = keys
+        for key in keys:
+            self._buckets.setdefault(key, {})[record_id] = None
+
+    def build(self, records: Iterable) -> None:
+        for record in records:
+            self.add(record)
+
+    def remove(self, record_id: str) -> None:
+        for key in self._keys.pop(record_id, ()):
+            bucket = self._buckets[key]
+            bucket.pop(record_id, None)
+            if not bucket:
+                del self._buckets[key]
+
+    def update(self, record) -> None:
+        self.remove(record.id)
+        self.add(record)
+
+    def find(self, key: Hashable) -> List[str]:
+        return list(self._buckets.get(key, ()))
+
+    def keys(self) -> List[Hashable]:
+        return list(self._buckets)
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._keys.clear()
+
+
+class InvertedIndex(HashIndex):
+    """Hash index that also keeps per-record postings for every key.
+
+    `key_func` returns `(key, posting)` pairs, e.g. a tag and the position of
+    the note it is attached to.
+    """
+
+    def add(self, record) -> None:
+        postings: Dict[Hashable, List] = {}
+        for key, posting in self.key_func(record):
+            postings.setdefault(key, []).append(posting)
+
+        record_id = record.id
+        self._keys[record_id] = tuple(postings)
+        for key, values in postings.items():
+            self._buckets.setdefault(key, {})[record_id] = values
+
+    def find_postings(self, key: Hashable) -> List[Tuple[str, List]]:
+        return list(self._buckets.get(key, {}).items())
+
+
+class NGramIndex(HashIndex):
+    """Substring search index over the lower-cased n-grams of record texts.
+
+    `text_func` returns the texts of a record to search in. Lookups only
+    narrow the records down to candidates, the caller still has to check
+    that the query really is a substring of one of the texts.
+    """
+
+    def __init__(self, text_func: Callable[[object], Iterable[str]], fields: Iterable[str], n: int = 3):
+        self.n = n
+        self.text_func = text_func
+        super().__init__(self._record_ngrams, fields)
+
+    def ngrams(self, text: str) -> Set[str]:
+        text = text.lower()
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+    def candidates(self, query: str) -> Optional[List[str]]:
+        """Ids of records that contain every n-gram of the query.
+
+        Returns None when the query is shorter than n and can't be narrowed.
+        """
+        if len(query) < self.n:
+            return None
+
+        buckets = [self._buckets.get(gram) for gram in self.ngrams(query)]
+        if not all(buckets):
+            return []
+
+        buckets.sort(key=len)
+        smallest, rest = buckets[0], buckets[1:]
+        return [record_id for record_id in smallest if all(record_id in bucket for bucket in rest)]
+
+    def _record_ngrams(self, record) -> Set[str]:
+        grams: Set[str] = set()
+        for text in self.text_func(record):
+            if text:
+                grams |= self.ngrams(text)
+        return grams
+
+
+class SortedIndex:
+    """Keeps record ids ordered by a single comparable key for range queries"""
+
+    def __init__(self, key_func: Callable[[object], Optional[Hashable]], fields: Iterable[str]):
+        self.key_func = key_func
+        self.fields: Set[str] = set(fields)
+        self._entries: List[Tuple[Hashable, str]] = []
+        self._keys: Dict[str, Hashable] = {}
+
+    def add(self, record) -> None:
+        key = self.key_func(record)
+        if key is None:
+            return
+        self._keys[record.id] = key
+        bisect.insort(self._entries, (key, record.id))
+
+    def build(self, records: Iterable) -> None:
+        """Add many records at once, sorting a single time instead of inserting one by one"""
+        for record in records:
+            key = self.key_func(record)
+            if key is not None:
+                self._keys[record.id] = key
+                self._entries.append((key, record.id))
+        self._entries.sort()
+
+    def remove(self, record_id: str) -> None:
+        key = self._keys.pop(record_id, None)
+        if key is None:
+            return
+        position = bisect.bisect_left(self._entries, (key, record_id))
+        del self._entries[position]
+
+    def update(self, record) -> None:
+        self.remove(record.id)
+        self.add(record)
+
+    def find(self, key: Hashable) -> List[str]:
+        position = bisect.bisect_left(self._entries, (key,))
+        found = []
+        while position < len(self._entries) and self._entries[position][0] == key:
+            found.append(self._entries[position][1])
+            position += 1
+        return found
+
+    def range(self, start: Hashable, end: Hashable) -> List[str]:
+        """Ids of records with start <= key < end, in key order"""
+        return [record_id for _, record_id in self.entries(start, end)]
+
+    def first(self, start: Hashable, count: int) -> List[str]:
+        """Ids of the first `count` records with key >= start"""
+        return [record_id for _, record_id in self.first_entries(start, count)]
+
+    def entries(self, start: Hashable, end: Hashable) -> List[Tuple[Hashable, str]]:
+        """(key, id) pairs with start <= key < end, in key order"""
+        low = bisect.bisect_left(self._entries, (start,))
+        high = bisect.bisect_left(self._entries, (end,))
+        return self._entries[low:high]
+
+    def first_entries(self, start: Hashable, count: int) -> List[Tuple[Hashable, str]]:
+        low = bisect.bisect_left(self._entries, (start,))
+        return self._entries[low:low + count]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys.clear()
+
+
+class StorageIndex:
+    """Index answered by a storage query, e.g. an SQL index, instead of memory.
+
+    The storage only knows the saved records. The index keeps the keys of the
+    records changed since the last save in a small in-memory index, drops
+    their stored rows from the query results and merges their new keys in.
+    The service calls `saved` once the changes are persisted.
+    """
+
+    def __init__(self, query: Callable[[Hashable], List[str]],
+                 key_func: Callable[[object], Iterable[Hashable]], fields: Iterable[str]):
+        self.query = query
+        self.fields: Set[str] = set(fields)
+        self._changes = self._changes_index(key_func)
+        # ids whose stored keys may be outdated
+        self._stale: Set[str] = set()
+
+    def _changes_index(self, key_func: Callable) -> HashIndex:
+        return HashIndex(key_func, self.fields)
+
+    def add(self, record) -> None:
+        self._stale.add(record.id)
+        self._changes.update(record)
+
+    def build(self, records: Iterable) -> None:
+        for record in records:
+            self.add(record)
+
+    def remove(self, record_id: str) -> None:
+        self._stale.add(record_id)
+        self._changes.remove(record_id)
+
+    def update(self, record) -> None:
+        self.add(record)
+
+    def find(self, key: Hashable) -> List[str]:
+        if key is None:
+            return []
+        return [record_id for record_id in self.query(key) if record_id not in self._stale] + self._changes.find(key)
+
+    def saved(self) -> None:
+        self._stale.clear()
+        self._changes.clear()
+
+    def clear(self) -> None:
+        self.saved()
+
+
+class StorageSortedIndex(StorageIndex):
+    """Sorted index answered by storage queries, see StorageIndex.
+
+    `query` finds the ids of one key ordered by id, `range_query` and
+    `first_query` return (key, id) pairs in key order like SortedIndex.
+    """
+
+    def __init__(self, query: Callable[[Hashable], List[str]],
+                 range_query: Callable[[Hashable, Hashable], List[Tuple[Hashable, str]]],
+                 first_query: Callable[[Hashable, int], List[Tuple[Hashable, str]]],
+                 key_func: Callable[[object], Optional[Hashable]], fields: Iterable[str]):
+        super().__init__(query, key_func, fields)
+        self.range_query = range_query
+        self.first_query = first_query
+
+    def _changes_index(self, key_func: Callable) -> SortedIndex:
+        return SortedIndex(key_func, self.fields)
+
+    def find(self, key: Hashable) -> List[str]:
+        if key is None:
+            return []
+        return sorted([record_id for record_id in self.query(key) if record_id not in self._stale]
+                      + self._changes.find(key))
+
+    def range(self, start: Hashable, end: Hashable) -> List[str]:
+        """Ids of records with start <= key < end, in key order"""
+        stored = [entry for entry in self.range_query(start, end) if entry[1] not in self._stale]
+        return [record_id for _, record_id in heapq.merge(stored, self._changes.entries(start, end))]
+
+    def first(self, start: Hashable, count: int) -> List[str]:
+        """Ids of the first `count` records with key >= start"""
+        # stale rows are dropped, so ask for enough to still have `count` left
+        stored = [entry for entry in self.first_query(start, count + len(self._stale))
+                  if entry[1] not in self._stale]
+        merged = heapq.merge(stored, self._changes.first_entries(start, count))
+        return [record_id for _, record_id in list(merged)[:count]]
@@ -0,0 +1,127 @@
+"""Readers-writer lock guarding a service shared between threads"""
+
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+
+class ReadWriteLock:
+    """Many readers or one writer.
+
+    Both sides are reentrant: a service method may call another one, and a
+    thread holding the write lock may also read. A read lock can't be
+    upgraded, that would deadlock two readers upgrading at once. Waiting
+    writers go first, so a stream of reads can't starve them.
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._condition = threading.Condition(self._mutex)
+        self._readers = 0  # threads holding the read lock
+        self._writer: Optional[int] = None  # ident of the thread holding the write lock
+        self._write_depth = 0
+        self._waiting_writers = 0
+        # thread ident -> read lock depth, each thread only touches its own key
+        self._read_depths: Dict[int, int] = {}
+
+    # every query takes the read lock, hence the plain mutex and loops below
+    # instead of the slower Condition context manager and wait_for
+
+    def acquire_read(self) -> None:
+        thread = threading.get_ident()
+        if self._writer == thread:
+            return
+        depth = self._read_depths.get(thread, 0)
+        if not depth:
+            with self._mutex:
+                while self._writer is not None or self._waiting_writers:
+                    self._condition.wait()
+                self._readers += 1
+        self._read_depths[thread] = depth + 1
+
+    def release_read(self) -> None:
+        thread = threading.get_ident()
+        if self._writer == thread:
+            return
+        depth = self._read_depths.pop(thread) - 1
+        if depth:
+            self._read_depths[thread] = depth
+            return
+        with self._mutex:
+            self._readers -= 1
+            if not self._readers and self._waiting_writers:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        thread = threading.get_ident()
+        if self._writer == thread:
+            self._write_depth += 1
+            return
+        if thread in self._read_depths:
+            raise RuntimeError("A read lock can't be upgraded to a write lock")
+        with self._mutex:
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = thread
+            self._write_depth = 1
+
+    def release_write(self) -> None:
+        if self._writer != threading.get_ident():
+            raise RuntimeError("The write lock is not held by this thread")
+        self._write_depth -= 1
+        if self._write_depth:
+            return
+        with self._mutex:
+            self._writer = None
+            self._condition.notify_all()
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+def reading(method: Callable) -> Callable:
+    """Run a service method under the read lock of the service"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        lock = self.lock
+        lock.acquire_read()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            lock.release_read()
+
+    return wrapper
+
+
+def writing(method: Callable) -> Callable:
+    """Run a service method under the write lock of the service"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        lock = self.lock
+        lock.acquire_write()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            lock.release_write()
+
+    return wrapper
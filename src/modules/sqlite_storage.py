@@ -0,0 +1,293 @@
+"""Module for storing customers and bookings in a SQLite database"""
+
+
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.modules.dto.booking_dto import BookingDTO
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.models.fields.datetime_field import DatetimeField, parse_datetimes
+from src.modules.metrics import instrumented
+from src.modules.storage import Storage, D
+
+FILENAME = ".chefs_book.db"
+
+# sortable representation of booking dates, DatetimeField.FORMAT is day-first
+SQL_DATETIME_FORMAT = "%Y-%m-%d %H:%M"
+
+
+class SqliteStorage(Storage[D], ABC):
+    """Base class for storages backed by a SQLite database.
+
+    Subclasses describe their tables in SCHEMA and map DTOs to rows. Writes of
+    one save are batched in a single transaction, the database runs in WAL
+    mode so readers are not blocked by a writer. The `find_*` queries are
+    used by the services in place of their in-memory indexes. A service may
+    run them from several threads, the one connection is used by one thread
+    at a time.
+    """
+
+    SCHEMA: List[str] = []
+    TABLES: List[str] = []
+
+    def __init__(self, dto_cls, filename: str = FILENAME):
+        super().__init__(dto_cls, filename)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The shared connection, hold `_lock` while using it"""
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.filename, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("PRAGMA foreign_keys=ON")
+            with self._connection:
+                for statement in self.SCHEMA:
+                    self._connection.execute(statement)
+        return self._connection
+
+    @instrumented
+    def save(self, dtos: List[D]) -> None:
+        """Replace the stored records with the given DTOs."""
+        with self._lock, self.connection as connection:
+            for table in reversed(self.TABLES):
+                connection.execute(f"DELETE FROM {table}")
+            self._insert(connection, dtos)
+        self._count_io('written', len(dtos))
+
+    @instrumented
+    def save_changes(self, upserts: List[D], deleted_ids: List[str], snapshot: Callable[[], List[D]]) -> None:
+        """Write only the changed records, in one transaction."""
+        with self._lock, self.connection as connection:
+            self._delete(connection, list(deleted_ids))
+            # an updated record keeps its row, and so its place in the load order,
+            # only its child rows are written again
+            self._delete_children(connection, [dto.id for dto in upserts])
+            self._insert(connection, upserts)
+        self._count_io('written', len(upserts) + len(deleted_ids))
+
+    def iter_load(self) -> Iterator[D]:
+        if not os.path.exists(self.filename):
+            return
+        # read everything before yielding, the lock can't be held across yields
+        with self._lock:
+            dtos = list(self._select(self.connection))
+        self._count_io('read', len(dtos))
+        yield from dtos
+
+    def clear(self) -> None:
+        """Delete the stored records, other tables of the database are kept."""
+        if not os.path.exists(self.filename):
+            return
+        with self._lock, self.connection as connection:
+            for table in reversed(self.TABLES):
+                connection.execute(f"DELETE FROM {table}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    @abstractmethod
+    def _insert(self, connection: sqlite3.Connection, dtos: List[D]) -> None:
+        """Insert or update the rows of the DTOs in every table, in the given order"""
+
+    def _delete(self, connection: sqlite3.Connection, record_ids: List[str]) -> None:
+        # child rows go away through ON DELETE CASCADE
+        connection.executemany(f"DELETE FROM {self.TABLES[0]} WHERE id = ?", [(record_id,) for record_id in record_ids])
+
+    def _delete_children(self, connection: sqlite3.Connection, record_ids: List[str]) -> None:
+        # tables after the first one reference their record by customer_id
+        rows = [(record_id,) for record_id in record_ids]
+        for table in reversed(self.TABLES[1:]):
+            connection.executemany(f"DELETE FROM {table} WHERE customer_id = ?", rows)
+
+    @abstractmethod
+    def _select(self, connection: sqlite3.Connection) -> Iterator[D]:
+        """DTOs of every stored record, in insertion order"""
+
+    def _ids(self, query: str, *params) -> List[str]:
+        return [row[0] for row in self._rows(query, *params)]
+
+    def _rows(self, query: str, *params) -> List[tuple]:
+        with self._lock:
+            return self.connection.execute(query, params).fetchall()
+
+
+class SqliteCustomerStorage(SqliteStorage[CustomerDTO]):
+    """Customers with their phones, notes and note tags in separate indexed tables"""
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS customers (
+            id TEXT PRIMARY KEY,
+            name TEXT,
+            name_folded TEXT,
+            birthday TEXT,
+            address TEXT,
+            email TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS phones (
+            customer_id TEXT NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            phone TEXT NOT NULL,
+            PRIMARY KEY (customer_id, position)
+        )""",
+        """CREATE TABLE IF NOT EXISTS notes (
+            customer_id TEXT NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            PRIMARY KEY (customer_id, position)
+        )""",
+        """CREATE TABLE IF NOT EXISTS note_tags (
+            customer_id TEXT NOT NULL,
+            note_position INTEGER NOT NULL,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (customer_id, note_position, tag),
+            FOREIGN KEY (customer_id, note_position) REFERENCES notes(customer_id, position) ON DELETE CASCADE
+        )""",
+        "CREATE INDEX IF NOT EXISTS customers_name_folded ON customers(name_folded)",
+        "CREATE INDEX IF NOT EXISTS customers_email ON customers(email)",
+        "CREATE INDEX IF NOT EXISTS phones_phone ON phones(phone)",
+        "CREATE INDEX IF NOT EXISTS note_tags_tag ON note_tags(tag)",
+    ]
+    TABLES = ['customers', 'phones', 'notes', 'note_tags']
+
+    def __init__(self, filename: str = FILENAME):
+        super().__init__(CustomerDTO, filename)
+
+    def find_ids_by_name(self, name: str) -> List[str]:
+        return self._ids("SELECT id FROM customers WHERE name_folded = ?", name.casefold())
+
+    def find_ids_by_email(self, email: str) -> List[str]:
+        return self._ids("SELECT id FROM customers WHERE email = ?", email)
+
+    def find_ids_by_phone(self, phone: str) -> List[str]:
+        return self._ids("SELECT DISTINCT customer_id FROM phones WHERE phone = ?", phone)
+
+    def find_ids_by_tag(self, tag: str) -> List[str]:
+        return self._ids("SELECT DISTINCT customer_id FROM note_tags WHERE tag = ?", tag)
+
+    def _insert(self, connection: sqlite3.Connection, dtos: List[CustomerDTO]) -> None:
+        connection.executemany(
+            "INSERT INTO customers (id, name, name_folded, birthday, address, email) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET name = excluded.name, name_folded = excluded.name_folded, "
+            "birthday = excluded.birthday, address = excluded.address, email = excluded.email",
+            [(dto.id, dto.name, dto.name.casefold() if dto.name else None, dto.birthday, dto.address, dto.email)
+             for dto in dtos])
+        connection.executemany(
+            "INSERT INTO phones (customer_id, position, phone) VALUES (?, ?, ?)",
+            [(dto.id, position, phone) for dto in dtos for position, phone in enumerate(dto.phones)])
+        connection.executemany(
+            "INSERT INTO notes (customer_id, position, text) VALUES (?, ?, ?)",
+            [(dto.id, position, note) for dto in dtos for position, note in enumerate(dto.notes)])
+        connection.executemany(
+            "INSERT OR IGNORE INTO note_tags (customer_id, note_position, tag) VALUES (?, ?, ?)",
+            [(dto.id, position, tag) for dto in dtos
+             for position, tags in enumerate(dto.note_tags[:len(dto.notes)]) for tag in tags])
+
+    def _select(self, connection: sqlite3.Connection) -> Iterator[CustomerDTO]:
+        phones = self._group(connection, "SELECT customer_id, phone FROM phones ORDER BY customer_id, position")
+        notes = self._group(connection, "SELECT customer_id, text FROM notes ORDER BY customer_id, position")
+        tags: Dict[tuple, List[str]] = {}
+        for customer_id, position, tag in connection.execute(
+                "SELECT customer_id, note_position, tag FROM note_tags ORDER BY rowid"):
+            tags.setdefault((customer_id, position), []).append(tag)
+
+        for customer_id, name, birthday, address, email in connection.execute(
+                "SELECT id, name, birthday, address, email FROM customers ORDER BY rowid"):
+            customer_notes = notes.get(customer_id, [])
+            yield CustomerDTO.model_construct(
+                id=customer_id,
+                name=name,
+                birthday=birthday,
+                address=address,
+                email=email,
+                phones=phones.get(customer_id, []),
+                notes=customer_notes,
+                note_tags=[tags.get((customer_id, position), []) for position in range(len(customer_notes))],
+            )
+
+    @staticmethod
+    def _group(connection: sqlite3.Connection, query: str) -> Dict[str, List[str]]:
+        grouped: Dict[str, List[str]] = {}
+        for customer_id, value in connection.execute(query):
+            grouped.setdefault(customer_id, []).append(value)
+        return grouped
+
+
+class SqliteBookingStorage(SqliteStorage[BookingDTO]):
+    """Bookings indexed by customer and by a sortable start datetime"""
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS bookings (
+            id TEXT PRIMARY KEY,
+            customer_id TEXT,
+            starts_at TEXT,
+            covers INTEGER,
+            duration INTEGER
+        )""",
+        "CREATE INDEX IF NOT EXISTS bookings_customer_id ON bookings(customer_id)",
+        "CREATE INDEX IF NOT EXISTS bookings_starts_at ON bookings(starts_at)",
+    ]
+    TABLES = ['bookings']
+
+    def __init__(self, filename: str = FILENAME):
+        super().__init__(BookingDTO, filename)
+
+    def find_ids_by_customer_id(self, customer_id: str) -> List[str]:
+        return self._ids("SELECT id FROM bookings WHERE customer_id = ? ORDER BY starts_at", customer_id)
+
+    def find_ids_by_date(self, starts_at: datetime) -> List[str]:
+        return self._ids("SELECT id FROM bookings WHERE starts_at = ? ORDER BY id",
+                         starts_at.strftime(SQL_DATETIME_FORMAT))
+
+    def find_ids_between(self, start: datetime, end: datetime) -> List[str]:
+        """Ids of bookings with start <= date < end, ordered by date"""
+        return [booking_id for _, booking_id in self.find_dates_between(start, end)]
+
+    def find_dates_between(self, start: datetime, end: datetime) -> List[Tuple[datetime, str]]:
+        """(start, id) of bookings with start <= date < end, ordered by date"""
+        return self._dates("SELECT starts_at, id FROM bookings WHERE starts_at >= ? AND starts_at < ? "
+                           "ORDER BY starts_at, id",
+                           start.strftime(SQL_DATETIME_FORMAT), end.strftime(SQL_DATETIME_FORMAT))
+
+    def find_dates_from(self, start: datetime, count: int) -> List[Tuple[datetime, str]]:
+        """(start, id) of the first `count` bookings with date >= start"""
+        return self._dates("SELECT starts_at, id FROM bookings WHERE starts_at >= ? ORDER BY starts_at, id LIMIT ?",
+                           start.strftime(SQL_DATETIME_FORMAT), count)
+
+    def _dates(self, query: str, *params) -> List[Tuple[datetime, str]]:
+        return [(datetime.fromisoformat(starts_at), booking_id) for starts_at, booking_id in self._rows(query, *params)]
+
+    def _insert(self, connection: sqlite3.Connection, dtos: List[BookingDTO]) -> None:
+        starts_at = parse_datetimes(dto.date for dto in dtos)
+        connection.executemany(
+            "INSERT INTO bookings (id, customer_id, starts_at, covers, duration) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET customer_id = excluded.customer_id, starts_at = excluded.starts_at, "
+            "covers = excluded.covers, duration = excluded.duration",
+            [(dto.id, dto.customer_id, start.strftime(SQL_DATETIME_FORMAT) if start else None, dto.covers, dto.duration)
+             for dto, start in zip(dtos, starts_at)])
+
+    def _select(self, connection: sqlite3.Connection) -> Iterator[BookingDTO]:
+        for booking_id, customer_id, starts_at, covers, duration in connection.execute(
+                "SELECT id, customer_id, starts_at, covers, duration FROM bookings ORDER BY rowid"):
+            yield BookingDTO.model_construct(
+                id=booking_id,
+                customer_id=customer_id,
+                date=self._from_sql_datetime(starts_at),
+                covers=covers,
+                duration=duration,
+            )
+
+    @staticmethod
+    def _from_sql_datetime(value: Optional[str]) -> Optional[str]:
+        if not value:
+            return None
+        return datetime.strptime(value, SQL_DATETIME_FORMAT).strftime(DatetimeField.FORMAT)
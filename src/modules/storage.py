@@ -1,18 +1,36 @@
 """"Module for storing contacts and notes in a file"""
 
 
-import os
 import csv
-from typing import List, Type, TypeVar, Generic
+import gc
+import io
+import locale
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple, Type, TypeVar, Generic
+
+from src.modules.metrics import instrumented, metrics
 
 D = TypeVar('D')
 
+PARALLEL_MIN_SIZE = 8 * 1024 * 1024  # bytes, smaller files load faster in one process
+CHUNKS_PER_WORKER = 4  # more chunks than workers evens out their load
+BLOCK_SIZE = 1024 * 1024  # bytes read at a time while looking for row boundaries
+
 
 class Storage(Generic[D]):
-    def __init__(self, dto_cls: Type[D], filename: str):
+    def __init__(self, dto_cls: Type[D], filename: str, trusted: bool = True, workers: int = 1):
         self.dto_cls = dto_cls
         self.filename = filename
+        # files we wrote ourselves are loaded without validating every row,
+        # pass trusted=False to read a file from somewhere else
+        self.trusted = trusted
+        # processes parsing a large file, e.g. os.cpu_count()
+        self.workers = workers
 
+    @instrumented
     def save(self, dtos: List[D]) -> None:
         """Save a list of DTOs to a CSV file."""
         if not dtos:
@@ -23,23 +41,71 @@ class Storage(Generic[D]):
             writer.writeheader()
             for dto in dtos:
                 writer.writerow(dto.to_dict())
+            self._count_io('written', len(dtos), file.tell())
+
+    @instrumented
+    def save_changes(self, upserts: List[D], deleted_ids: List[str], snapshot: Callable[[], List[D]]) -> None:
+        """Persist added/updated DTOs and deleted ids.
+
+        A CSV file can't be patched in place, so the full `snapshot` is written.
+        """
+        dtos = snapshot()
+        if dtos:
+            self.save(dtos)
+        else:
+            self.clear()
 
+    @instrumented
     def load(self) -> List[D]:
         """Load a list of DTOs from a CSV file."""
-        dtos = []
+        with paused_gc():
+            return list(self.iter_load())
+
+    def iter_load(self) -> Iterator[D]:
+        """Yield DTOs from a CSV file one at a time, without keeping them all in memory."""
         if not os.path.exists(self.filename):
-            return dtos
+            return
+        if self._loads_in_parallel():
+            yield from self.iter_load_parallel()
+            return
+        rows = 0
         try:
             with open(self.filename, mode='r', newline='') as file:
-                reader = csv.DictReader(file, fieldnames=self._get_fieldnames())
+                fieldnames = self._get_fieldnames()
+                reader = csv.reader(file)
                 next(reader, None)  # Skip the header
                 for row in reader:
-                    dto = self.dto_cls()
-                    dtos.append(dto.from_dict(row))
+                    rows += 1
+                    yield self._from_row(dict(zip(fieldnames, row)))
+                self._count_io('read', rows, file.tell())
         except IOError as e:
             print(f"Error reading file {self.filename}: {str(e)}")
-        return dtos
 
+    def iter_load_parallel(self) -> Iterator[D]:
+        """Yield DTOs from a CSV file parsed by `workers` processes.
+
+        The file is split into byte ranges starting at row boundaries, every
+        worker parses its ranges into DTO values and the DTOs are built here,
+        in file order, while the later ranges are still being parsed.
+        """
+        fieldnames = self._get_fieldnames()
+        with open(self.filename, mode='rb') as file:
+            file.readline()  # Skip the header
+            size = os.fstat(file.fileno()).st_size
+            offsets = split_rows(file, file.tell(), size, self.workers * CHUNKS_PER_WORKER)
+
+        rows = 0
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(_parse_range, self.dto_cls, self.filename, fieldnames, start, end, self.trusted)
+                       for start, end in zip(offsets, offsets[1:])]
+            for future in futures:
+                chunk = future.result()
+                rows += len(chunk)
+                for values in chunk:
+                    yield self.dto_cls.from_trusted(values)
+        self._count_io('read', rows, size)
+
+    @instrumented
     def clear(self) -> None:
         """Delete the file."""
         try:
@@ -47,7 +113,93 @@ class Storage(Generic[D]):
         except FileNotFoundError:
             pass
 
+    def _count_io(self, direction: str, rows: int, size: Optional[int] = None) -> None:
+        """Count rows and bytes read or written, when metrics are on"""
+        if metrics.enabled:
+            prefix = f"{type(self).__name__}.{self.dto_cls.__name__}"
+            metrics.count(f"{prefix}.rows_{direction}", rows)
+            if size is not None:
+                metrics.count(f"{prefix}.bytes_{direction}", size)
+
+    def _from_row(self, row: dict) -> D:
+        if self.trusted:
+            return self.dto_cls.from_trusted_dict(row)
+        return self.dto_cls.from_dict(row)
+
+    def _loads_in_parallel(self) -> bool:
+        # a worker forked while another thread holds a lock could deadlock,
+        # background jobs such as a journal compaction load sequentially
+        return (self.workers > 1 and threading.current_thread() is threading.main_thread()
+                and os.path.getsize(self.filename) >= PARALLEL_MIN_SIZE)
+
     def _get_fieldnames(self) -> List[str]:
         """Get the fieldnames for the CSV. This assumes all DTOs have the same fields."""
         dummy_dto = self.dto_cls()
         return dummy_dto.get_fields()
+
+
+@contextmanager
+def paused_gc():
+    """Pause the cyclic garbage collector while building many objects at once.
+
+    A bulk load only allocates, the collector would keep rescanning the
+    growing heap without finding anything to free.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def split_rows(file, start: int, end: int, parts: int) -> List[int]:
+    """Offsets cutting bytes [start, end) of a CSV file into about `parts` ranges of whole rows.
+
+    The first and last offsets are `start` and `end`. A range starts after a
+    newline outside quotes: quoted values may hold newlines, and since quotes
+    inside values are doubled, a newline is outside quotes when the number of
+    quotes before it is even.
+    """
+    targets = iter([start + (end - start) * i // parts for i in range(1, parts)])
+    target = next(targets, None)
+    offsets = [start]
+    position, quoted = start, False
+    file.seek(start)
+    while target is not None:
+        block = file.read(min(BLOCK_SIZE, end - position))
+        if not block:
+            break
+        index = 0
+        while target is not None and position + len(block) > target:
+            search_from = max(index, target - position)
+            newline = block.find(b'\n', search_from)
+            if newline < 0:
+                break
+            quoted ^= block.count(b'"', index, newline) & 1
+            index = newline + 1
+            if quoted:
+                # inside a quoted value, the row ends at a later newline
+                target = position + index
+                continue
+            offsets.append(position + index)
+            while target is not None and target < position + index:
+                target = next(targets, None)
+        quoted ^= block.count(b'"', index) & 1
+        position += len(block)
+    if offsets[-1] != end:
+        offsets.append(end)
+    return offsets
+
+
+def _parse_range(dto_cls, filename: str, fieldnames: List[str], start: int, end: int,
+                 trusted: bool) -> List[dict]:
+    """Parse the rows in bytes [start, end) of a CSV file into DTO values, run by a worker process"""
+    with open(filename, mode='rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode(locale.getpreferredencoding(False))
+    rows = csv.reader(io.StringIO(text, newline=''))
+    if trusted:
+        return [dto_cls.decode(dict(zip(fieldnames, row))) for row in rows]
+    return [dto_cls.from_dict(dict(zip(fieldnames, row))).__dict__ for row in rows]
@@ -0,0 +1,279 @@
+"""Non-interactive mode: run commands from a script and stream JSON-lines results.
+
+One command per line, arguments are split like a shell does, so values with
+spaces are quoted. Blank lines and `#` comments are skipped:
+
+    add "John Doe" phone=0123456789 birthday=01.02.1990 email=john@example.com
+    add-note "John Doe" "Likes the window table" regular vip
+    add-tag "John Doe" 0 wine
+    upcoming-birthday 7
+
+Changes are kept in memory and saved once at the end of the script, or every
+`save_every` changing commands. Every command writes one JSON object:
+`{"line": 3, "command": "add-tag", "ok": true, "result": ...}`, or `"ok": false`
+with an `"error"` message, and the script goes on with the next line.
+"""
+
+
+import json
+import shlex
+from typing import Callable, Dict, Iterable, List, TextIO, Tuple
+
+from src.modules.error_handler import ChefBookError, DuplicateRecordError, InvalidInputError, RecordNotFoundError
+from src.modules.metrics import metrics
+from src.modules.models.customer_model import Customer
+from src.modules.service.bookings_service import BookingsService
+from src.modules.service.customers_service import CustomerService
+from src.modules.ui.commands import Command
+
+# commands that change records and count towards `save_every`
+CHANGING_COMMANDS = {Command.ADD, Command.EDIT, Command.DELETE, Command.ADD_PHONE, Command.ADD_NOTE,
+                     Command.ADD_TAG, Command.REMOVE_TAG, Command.RESET}
+CUSTOMER_FIELDS = ('name', 'birthday', 'address', 'email')
+
+
+class CommandRunner:
+    """Runs command lines such as `add-tag "John Doe" 0 vip` against the services"""
+
+    def __init__(self, customer_service: CustomerService, bookings_service: BookingsService):
+        self.customer_service = customer_service
+        self.bookings_service = bookings_service
+        self.handlers: Dict[Command, Callable[[List[str]], object]] = {
+            Command.HELLO: lambda args: "Hello! How can I assist you today?",
+            Command.ADD: self.add_customer,
+            Command.EDIT: self.edit_customer,
+            Command.DELETE: self.delete_customer,
+            Command.SHOW: self.show_customer,
+            Command.SHOW_ALL: self.show_all_customers,
+            Command.FIND: self.find_customers,
+            Command.UPCOMING_BIRTHDAY: self.upcoming_birthday,
+            Command.ADD_PHONE: self.add_phone,
+            Command.ADD_NOTE: self.add_note,
+            Command.ADD_TAG: self.add_tag,
+            Command.REMOVE_TAG: self.remove_tag,
+            Command.FIND_TAG: self.find_tag,
+            Command.SORT_TAG: self.sort_tag,
+            Command.RESET: self.reset,
+            Command.STATS: lambda args: metrics.snapshot(),
+        }
+
+    def command(self, word: str) -> Command:
+        # no fuzzy matching here: a typo in a script must fail, not run something else
+        try:
+            command = Command(word.lower())
+        except ValueError:
+            raise InvalidInputError(f"Unknown command '{word}'.")
+        if command not in self.handlers:
+            raise InvalidInputError(f"Command '{word}' is only available in the interactive CLI.")
+        return command
+
+    def execute(self, command: Command, args: List[str]) -> object:
+        """Run a command, returning a JSON serializable result or raising ChefBookError/ValueError"""
+        return self.handlers[command](args)
+
+    def save(self) -> None:
+        self.customer_service.save()
+        self.bookings_service.save()
+
+    def add_customer(self, args: List[str]) -> dict:
+        name, options = _split_options(args, "add <name> [phone=...] [birthday=...] [address=...] [email=...]")
+        if self.customer_service.find_by_name(name):
+            raise DuplicateRecordError(f"Customer with name '{name}' already exists.")
+        customer = Customer()
+        customer.name = name
+        for key, value in options:
+            if key == 'phone':
+                customer.add_phone(value)
+            elif key in CUSTOMER_FIELDS[1:]:
+                setattr(customer, key, value)
+            else:
+                raise InvalidInputError(f"Unknown field '{key}'.")
+        self.customer_service.add(customer)
+        return _customer_result(customer)
+
+    def edit_customer(self, args: List[str]) -> dict:
+        name, options = _split_options(args, "edit <name> [name=...] [birthday=...] [address=...] [email=...]")
+        customer = self._find_customer(name)
+        # check every field on a scratch customer first, so a bad one leaves the record untouched
+        scratch = Customer()
+        for key, value in options:
+            if key not in CUSTOMER_FIELDS:
+                raise InvalidInputError(f"Unknown field '{key}'.")
+            if key == 'name' and not value:
+                raise InvalidInputError("Name cannot be empty.")
+            # an empty value deletes the field
+            setattr(scratch, key, value or None)
+        for key, value in options:
+            setattr(customer, key, value or None)
+        return _customer_result(customer)
+
+    def delete_customer(self, args: List[str]) -> dict:
+        name, = _arguments(args, 1, "delete <name>")
+        customer = self._find_customer(name)
+        self.customer_service.delete(customer.id)
+        return {'id': customer.id}
+
+    def show_customer(self, args: List[str]) -> dict:
+        name, = _arguments(args, 1, "show <name>")
+        return _customer_result(self._find_customer(name))
+
+    def show_all_customers(self, args: List[str]) -> List[dict]:
+        return [_customer_result(customer) for customer in self.customer_service]
+
+    def find_customers(self, args: List[str]) -> List[dict]:
+        query, = _arguments(args, 1, "find <query>")
+        return [_customer_result(customer) for customer in self.customer_service.search(query)]
+
+    def upcoming_birthday(self, args: List[str]) -> List[dict]:
+        days, = _arguments(args, 1, "upcoming-birthday <days>")
+        return [_customer_result(customer) for customer in self.customer_service.customer_birthdays(_number(days))]
+
+    def add_phone(self, args: List[str]) -> dict:
+        name, phone = _arguments(args, 2, "add-phone <name> <phone>")
+        customer = self._find_customer(name)
+        customer.add_phone(phone)
+        return _customer_result(customer)
+
+    def add_note(self, args: List[str]) -> dict:
+        if len(args) < 2:
+            raise InvalidInputError("Usage: add-note <name> <note> [tag...]")
+        customer = self._find_customer(args[0])
+        customer.add_note(args[1], args[2:])
+        return _customer_result(customer)
+
+    def add_tag(self, args: List[str]) -> dict:
+        name, index, tag = _arguments(args, 3, "add-tag <name> <note index> <tag>")
+        customer = self._find_customer(name)
+        customer.add_tag_to_note(self._note_index(customer, index), tag)
+        return _customer_result(customer)
+
+    def remove_tag(self, args: List[str]) -> dict:
+        name, index, tag = _arguments(args, 3, "remove-tag <name> <note index> <tag>")
+        customer = self._find_customer(name)
+        index = self._note_index(customer, index)
+        if tag not in customer.note_tags[index]:
+            raise RecordNotFoundError(f"Tag '{tag}' not found in note {index}.")
+        customer.remove_tag_from_note(index, tag)
+        return _customer_result(customer)
+
+    def find_tag(self, args: List[str]) -> List[dict]:
+        tag, = _arguments(args, 1, "find-tag <tag>")
+        return [{'id': customer.id, 'name': customer.name.value, 'note': index}
+                for customer, index in self.customer_service.find_notes_by_tag(tag)]
+
+    def sort_tag(self, args: List[str]) -> List[dict]:
+        return [_customer_result(customer) for customer in self.customer_service.sort_by_tags()]
+
+    def reset(self, args: List[str]) -> None:
+        self.customer_service.clear()
+        self.bookings_service.clear()
+
+    def _find_customer(self, name: str) -> Customer:
+        customers = self.customer_service.find_by_name(name)
+        if not customers:
+            raise RecordNotFoundError(f"Customer '{name}' not found.")
+        return customers[0]
+
+    def _note_index(self, customer: Customer, index: str) -> int:
+        index = _number(index)
+        if index >= len(customer.note_texts):
+            raise InvalidInputError(f"Invalid note index {index}.")
+        return index
+
+
+class BatchRunner(CommandRunner):
+    """Runs a script, writing one JSON line per command"""
+
+    def __init__(self, customer_service: CustomerService, bookings_service: BookingsService,
+                 output: TextIO, save_every: int = 0):
+        super().__init__(customer_service, bookings_service)
+        self.output = output
+        self.save_every = save_every
+        self.changes = 0  # changing commands since the last save
+
+    def run(self, lines: Iterable[str]) -> Dict[str, int]:
+        """Run every line of a script, save the remaining changes and return a summary"""
+        summary = {'commands': 0, 'errors': 0, 'saves': 0}
+        for number, line in enumerate(lines, start=1):
+            try:
+                words = shlex.split(line, comments=True)
+            except ValueError as e:
+                summary['commands'] += 1
+                summary['errors'] += 1
+                self._write({'line': number, 'command': None, 'ok': False, 'error': str(e)})
+                continue
+            if not words:
+                continue
+
+            summary['commands'] += 1
+            if words[0].lower() in (Command.EXIT.value, Command.CLOSE.value):
+                break
+            ok, saved = self.run_command(number, words)
+            summary['errors'] += not ok
+            summary['saves'] += saved
+
+        if self.save():
+            summary['saves'] += 1
+        self._write({'summary': summary})
+        return summary
+
+    def run_command(self, number: int, words: List[str]) -> Tuple[bool, bool]:
+        """Run one command, returns whether it succeeded and whether the changes were saved"""
+        try:
+            command = self.command(words[0])
+            result = self.execute(command, words[1:])
+        except (ChefBookError, ValueError) as e:
+            self._write({'line': number, 'command': words[0], 'ok': False, 'error': str(e)})
+            return False, False
+
+        self._write({'line': number, 'command': words[0], 'ok': True, 'result': result})
+        if command not in CHANGING_COMMANDS:
+            return True, False
+        self.changes += 1
+        return True, bool(self.save_every) and self.changes >= self.save_every and self.save()
+
+    def save(self) -> bool:
+        """Persist the pending changes, returns whether there were any"""
+        # the services know what changed, a failed command may have changed records too
+        if not (self.customer_service.is_dirty or self.bookings_service.is_dirty):
+            self.changes = 0
+            return False
+        super().save()
+        self.changes = 0
+        return True
+
+    def _write(self, record: dict) -> None:
+        self.output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.output.flush()
+
+
+def _arguments(args: List[str], count: int, usage: str) -> List[str]:
+    if len(args) != count:
+        raise InvalidInputError(f"Usage: {usage}")
+    return args
+
+
+def _split_options(args: List[str], usage: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """Split `<name> key=value...` arguments"""
+    if not args or any('=' not in arg for arg in args[1:]):
+        raise InvalidInputError(f"Usage: {usage}")
+    return args[0], [tuple(arg.split('=', 1)) for arg in args[1:]]
+
+
+def _number(value: str) -> int:
+    if not value.isdigit():
+        raise InvalidInputError(f"'{value}' is not a valid number.")
+    return int(value)
+
+
+def _customer_result(customer: Customer) -> dict:
+    birthday = customer.birthday
+    return {
+        'id': customer.id,
+        'name': customer.name.value,
+        'phones': customer.phones,
+        'birthday': birthday.strftime('%d.%m.%Y') if birthday else None,
+        'address': customer.address,
+        'email': customer.email,
+        'notes': [{'text': text, 'tags': tags} for text, tags in zip(customer.note_texts, customer.note_tags)],
+    }
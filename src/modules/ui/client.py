@@ -0,0 +1,99 @@
+"""Thin CLI client of a running book server, see src.modules.server"""
+
+
+import json
+import socket
+from typing import List
+
+from src.modules.metrics import format_snapshot
+from src.modules.server import SOCKET
+from src.modules.ui.commands import Command
+
+
+class RemoteCLI:
+    """Sends typed command lines to the server and prints the answers, no data is loaded here"""
+
+    def __init__(self, path: str = SOCKET):
+        self.path = path
+
+    def run(self) -> None:
+        try:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.connect(self.path)
+        except OSError as e:
+            print(f"Error: can't connect to the server on {self.path}: {e}")
+            return
+
+        print("Welcome to Chef's Book! Connected to the shared book, type 'help' for the commands.")
+        with connection, connection.makefile('rwb') as stream:
+            try:
+                while True:
+                    line = input("Enter a command: ").strip()
+                    if not line:
+                        print("Empty input. Please enter a command.")
+                        continue
+                    if line.lower() in (Command.EXIT.value, Command.CLOSE.value):
+                        break
+                    if line.lower() == Command.HELP.value:
+                        self.help()
+                        continue
+
+                    stream.write(line.encode('utf-8') + b'\n')
+                    stream.flush()
+                    answer = stream.readline()
+                    if not answer:
+                        print("Error: the server closed the connection.")
+                        break
+                    print('\n'.join(format_response(line.split()[0].lower(), json.loads(answer))))
+            except (KeyboardInterrupt, EOFError):
+                pass
+        print("Goodbye!")
+
+    def help(self):
+        print("""
+        Commands take their arguments on the same line, quote values with spaces:
+        - add <name> [phone=...] [birthday=...] [address=...] [email=...]
+        - edit <name> [name=...] [birthday=...] [address=...] [email=...] (an empty value deletes the field)
+        - delete <name>
+        - show <name>
+        - show-all
+        - find <query>
+        - upcoming-birthday <days>
+        - add-phone <name> <phone>
+        - add-note <name> <note> [tag...]
+        - add-tag <name> <note index> <tag>
+        - remove-tag <name> <note index> <tag>
+        - find-tag <tag>
+        - sort-tag
+        - reset
+        - stats
+        - exit or close: Exit the program
+        """)
+
+
+def format_response(command: str, response: dict) -> List[str]:
+    """Human readable lines of a server response"""
+    if not response['ok']:
+        return [f"Error: {response['error']}"]
+    result = response['result']
+    if command == Command.STATS.value:
+        return format_snapshot(result) or ["No operations recorded yet."]
+    if command == Command.FIND_TAG.value:
+        return [f"{match['name']}: note {match['note']}" for match in result] or ["No customers found."]
+    if isinstance(result, list):
+        return [line for customer in result for line in _format_customer(customer)] or ["No customers found."]
+    if isinstance(result, dict) and 'phones' in result:
+        return _format_customer(result)
+    if isinstance(result, dict):
+        return [f"{key}: {value}" for key, value in result.items()]
+    return ["Done." if result is None else str(result)]
+
+
+def _format_customer(customer: dict) -> List[str]:
+    lines = [f"{customer['name']}: {', '.join(customer['phones']) if customer['phones'] else 'No phone'}"]
+    for key in ('birthday', 'address', 'email'):
+        if customer[key]:
+            lines.append(f"  {key.capitalize()}: {customer[key]}")
+    for i, note in enumerate(customer['notes']):
+        lines.append(f"  Note {i}: {note['text']} (Tags: {', '.join(note['tags'])})")
+    return lines
@@ -24,6 +24,7 @@ class Command(Enum):
     SORT_TAG = "sort-tag"
     UPCOMING_BIRTHDAY = "upcoming-birthday"
     RESET = "reset"
+    STATS = "stats"
 
 
 def get_closest_command(user_input: str) -> Tuple[Optional[Command], List[str]]:
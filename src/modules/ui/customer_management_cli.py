@@ -1,14 +1,25 @@
+import os
 from typing import List, Optional
+from src.modules.dto.booking_dto import BookingDTO
+from src.modules.dto.customer_dto import CustomerDTO
 from src.modules.error_handler import handle_error, InvalidInputError, RecordNotFoundError
+from src.modules.journal_storage import JournalStorage
+from src.modules.metrics import format_snapshot, metrics
 from src.modules.models.customer_model import Customer
+from src.modules.service import bookings_service, customers_service
 from src.modules.service.customers_service import CustomerService
 from src.modules.service.bookings_service import BookingsService
 from src.modules.ui.commands import get_closest_command, Command
 
 class CustomerManagementCLI:
-    def __init__(self):
-        self.customer_service = CustomerService()
-        self.bookings_service = BookingsService()
+    def __init__(self, customers: Optional[CustomerService] = None, bookings: Optional[BookingsService] = None):
+        # an interactive session is slow enough to always collect metrics
+        metrics.enable()
+        workers = os.cpu_count() or 1
+        self.customer_service = customers or CustomerService(
+            JournalStorage(CustomerDTO, customers_service.FILENAME, workers=workers))
+        self.bookings_service = bookings or BookingsService(
+            JournalStorage(BookingDTO, bookings_service.FILENAME, workers=workers))
 
     @handle_error
     def run(self):
@@ -56,6 +67,8 @@ class CustomerManagementCLI:
                     self.sort_tag()
                 elif command == Command.RESET:
                     self.reset()
+                elif command == Command.STATS:
+                    self.stats()
                 else:
                     print(f"Unknown command")
         except KeyboardInterrupt:
@@ -72,14 +85,14 @@ class CustomerManagementCLI:
                 return value
             print(error_message)
 
-    def _get_customer_name(self) -> Optional[str]:
+    def _get_customer(self) -> Optional[Customer]:
         while True:
             name = self._get_input("Enter customer name (or 'n' to cancel): ")
             if name is None:
                 return None
-            customer = self.customer_service.find_by_name(name)
-            if customer:
-                return name
+            customers = self.customer_service.find_by_name(name)
+            if customers:
+                return customers[0]
             print(f"Customer '{name}' not found. Please try again.")
 
     def add_customer(self):
@@ -126,10 +139,10 @@ class CustomerManagementCLI:
         print(f"Customer {name} added successfully.")
 
     def edit_customer(self):
-        name = self._get_customer_name()
-        if name is None:
+        customer = self._get_customer()
+        if customer is None:
             return
-        customer = self.customer_service.find_by_name(name)[0]
+        name = customer.name
         
         print(f"Editing customer: {name}")
         
@@ -179,7 +192,7 @@ class CustomerManagementCLI:
                                                 lambda x: x.isdigit() and len(x) == 10,
                                                 "Invalid phone number. Please enter a 10-digit number.")
                     if new_phone:
-                        customer.phones[index] = new_phone
+                        customer.edit_phone(customer.phones[index], new_phone)
                         print(f"Phone number updated to: {new_phone}")
                         changed = True
             elif action == 'd':
@@ -187,7 +200,8 @@ class CustomerManagementCLI:
                                         "Invalid index.")
                 if index is not None:
                     index = int(index)
-                    deleted_phone = customer.phones.pop(index)
+                    deleted_phone = customer.phones[index]
+                    customer.remove_phone(deleted_phone)
                     print(f"Phone number deleted: {deleted_phone}")
                     changed = True
         return changed
@@ -249,7 +263,7 @@ class CustomerManagementCLI:
                     index = int(index)
                     new_note = self._get_input(f"Enter new note (current: {customer.notes[index].value}): ")
                     if new_note:
-                        customer.notes[index].value = new_note
+                        customer.edit_note(index, new_note, customer.notes[index].tags)
                         print("Note updated.")
                         self._edit_tags(customer, index)
                         changed = True
@@ -258,7 +272,8 @@ class CustomerManagementCLI:
                                         "Invalid index.")
                 if index is not None:
                     index = int(index)
-                    deleted_note = customer.notes.pop(index)
+                    deleted_note = customer.notes[index]
+                    customer.remove_note(index + 1)
                     print(f"Note deleted: {deleted_note.value}")
                     changed = True
         return changed
@@ -287,18 +302,18 @@ class CustomerManagementCLI:
         return changed
 
     def delete_customer(self):
-        name = self._get_customer_name()
-        if name is None:
+        customer = self._get_customer()
+        if customer is None:
             return
-        customer = self.customer_service.find_by_name(name)[0]
+        name = customer.name
         self.customer_service.delete(customer.id)
         print(f"Customer {name} deleted successfully.")
 
     def show_customer(self):
-        name = self._get_customer_name()
-        if name is None:
+        customer = self._get_customer()
+        if customer is None:
             return
-        customer = self.customer_service.find_by_name(name)[0]
+        name = customer.name
         print(f"Customer details for {customer.name}:")
         print("Phone numbers:")
         for i, phone in enumerate(customer.phones):
@@ -311,7 +326,7 @@ class CustomerManagementCLI:
             print(f"{i}: {note.value} (Tags: {', '.join(note.tags)})")
 
     def show_all_customers(self):
-        customers = self.customer_service.data
+        customers = list(self.customer_service)
         if not customers:
             print("No customers found.")
         else:
@@ -322,14 +337,8 @@ class CustomerManagementCLI:
         query = self._get_input("Enter search query: ")
         if query is None:
             return
-        results = []
-        query = query.lower()  # Convert query to lowercase once
-        for customer in self.customer_service.data:
-            if (query in str(customer.name).lower() or
-                any(query in str(phone).lower() for phone in customer.phones) or
-                (customer.email and query in str(customer.email).lower())):
-                results.append(customer)
-        
+        results = self.customer_service.search(query)
+
         if not results:
             print("No matching customers found.")
         else:
@@ -351,10 +360,10 @@ class CustomerManagementCLI:
             print(f"No upcoming birthdays in the next {days} days.")
 
     def add_phone(self):
-        name = self._get_customer_name()
-        if name is None:
+        customer = self._get_customer()
+        if customer is None:
             return
-        customer = self.customer_service.find_by_name(name)[0]
+        name = customer.name
         phone = self._get_input("Enter new phone number: ", lambda x: x.isdigit() and len(x) == 10, 
                                 "Invalid phone number. Please enter a 10-digit number.")
         if phone:
@@ -363,10 +372,10 @@ class CustomerManagementCLI:
             print(f"Phone number {phone} added to customer {name}.")
 
     def add_note(self):
-        name = self._get_customer_name()
-        if name is None:
+        customer = self._get_customer()
+        if customer is None:
             return
-        customer = self.customer_service.find_by_name(name)[0]
+        name = customer.name
         while True:
             note = self._get_input("Enter a note (or 'n' to finish): ")
             if note is None:
@@ -389,10 +398,10 @@ class CustomerManagementCLI:
         self.customer_service.save()
 
     def add_tag(self):
-        name = self._get_customer_name()
-        if name is None:
+        customer = self._get_customer()
+        if customer is None:
             return
-        customer = self.customer_service.find_by_name(name)[0]
+        name = customer.name
         self._show_notes(customer)
         while True:
             note_index = self._get_input("Enter the index of the note to add a tag (or 'n' to finish): ", 
@@ -410,10 +419,10 @@ class CustomerManagementCLI:
         self.customer_service.save()
 
     def remove_tag(self):
-        name = self._get_customer_name()
-        if name is None:
+        customer = self._get_customer()
+        if customer is None:
             return
-        customer = self.customer_service.find_by_name(name)[0]
+        name = customer.name
         while True:
             self._show_notes(customer)
             note_index = self._get_input("Enter the index of the note to remove a tag (or 'n' to finish): ", 
@@ -439,14 +448,16 @@ class CustomerManagementCLI:
             tag = self._get_input("Enter a tag to search for (or 'n' to cancel): ")
             if tag is None:
                 break
-            results = self.customer_service.find_by_tag(tag)
+            results = self.customer_service.find_notes_by_tag(tag)
             if results:
                 print(f"Customers with tag '{tag}':")
-                for customer in results:
-                    print(f"{customer.name}:")
-                    for i, note in enumerate(customer.notes):
-                        if tag in note.tags:
-                            print(f"  Note {i}: {note.value} (Tags: {', '.join(note.tags)})")
+                current_customer = None
+                for customer, i in results:
+                    if customer is not current_customer:
+                        print(f"{customer.name}:")
+                        current_customer = customer
+                    note = customer.notes[i]
+                    print(f"  Note {i}: {note.value} (Tags: {', '.join(note.tags)})")
             else:
                 print(f"No customers found with tag '{tag}'.")
 
@@ -477,6 +488,13 @@ class CustomerManagementCLI:
         self.bookings_service.clear()
         print("All data has been reset.")
 
+    def stats(self):
+        lines = format_snapshot(metrics.snapshot())
+        if not lines:
+            print("No operations recorded yet.")
+            return
+        print("\n".join(lines))
+
     def shutdown(self):
         self.customer_service.save()
         self.bookings_service.save()
@@ -500,5 +518,6 @@ class CustomerManagementCLI:
         - find-tag: Find all customers with notes containing the specified tag
         - sort-tag: Show all customers sorted by their tags
         - reset: Reset all saved data
+        - stats: Show call counts, latencies and storage I/O of this session
         - exit or close: Exit the program
         """)
@@ -0,0 +1,119 @@
+import io
+import json
+import os
+import unittest
+
+from src.modules.dto.booking_dto import BookingDTO
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.journal_storage import JournalStorage
+from src.modules.service.bookings_service import BookingsService
+from src.modules.service.customers_service import CustomerService
+from src.modules.ui.batch import BatchRunner
+
+SCRIPT = """
+# a comment
+add "John Doe" phone=0123456789 birthday=01.02.1990 email=john@example.com
+add-note "John Doe" "Likes the window table" regular
+add-tag "John Doe" 0 vip
+add "Jane Roe"
+edit "Jane Roe" address="Main Street 1, Kyiv, Ukraine"
+find-tag vip
+show "Nobody Here"
+"""
+
+
+class TestBatchRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.customers_file = "test_batch_customers.csv"
+        self.bookings_file = "test_batch_bookings.csv"
+        self.output = io.StringIO()
+
+    def tearDown(self):
+        for filename in (self.customers_file, self.bookings_file):
+            for path in (filename, f"{filename}.journal"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _runner(self, save_every=0):
+        return BatchRunner(CustomerService(JournalStorage(CustomerDTO, self.customers_file)),
+                           BookingsService(JournalStorage(BookingDTO, self.bookings_file)),
+                           self.output, save_every=save_every)
+
+    def _results(self):
+        return [json.loads(line) for line in self.output.getvalue().splitlines()]
+
+    def test_run_script(self):
+        summary = self._runner().run(SCRIPT.splitlines())
+
+        results = self._results()
+        self.assertEqual(summary, {'commands': 7, 'errors': 1, 'saves': 1})
+        self.assertEqual(results[-1], {'summary': summary})
+        self.assertEqual([result['line'] for result in results[:-1]], [3, 4, 5, 6, 7, 8, 9])
+        self.assertEqual(results[0]['result']['birthday'], "01.02.1990")
+        self.assertEqual(results[2]['result']['notes'], [{'text': "Likes the window table",
+                                                          'tags': ["regular", "vip"]}])
+        self.assertEqual(results[4]['result']['address'], "Main Street 1, Kyiv, Ukraine")
+        self.assertEqual([match['name'] for match in results[5]['result']], ["John Doe"])
+        self.assertFalse(results[6]['ok'])
+        self.assertEqual(results[6]['error'], "Customer 'Nobody Here' not found.")
+
+        reloaded = CustomerService(JournalStorage(CustomerDTO, self.customers_file))
+        self.assertEqual(len(reloaded), 2)
+        self.assertEqual(reloaded.find_by_tag("vip")[0].name, "John Doe")
+
+    def test_saves_once_at_the_end(self):
+        runner = self._runner()
+        runner.run(['add "John Doe"', 'add-phone "John Doe" 0123456789', 'add-phone "John Doe" 0987654321'])
+
+        with open(f"{self.customers_file}.journal") as file:
+            self.assertEqual(len(file.readlines()), 1)
+
+    def test_save_every(self):
+        summary = self._runner(save_every=2).run([f'add "Customer {i}"' for i in range(5)])
+
+        self.assertEqual(summary['saves'], 3)
+        with open(f"{self.customers_file}.journal") as file:
+            self.assertEqual(len(file.readlines()), 5)
+
+    def test_invalid_commands(self):
+        summary = self._runner().run(['ad "John Doe"', 'add "Jo"', 'add "John Doe" phone=123', 'upcoming-birthday x',
+                                      'add "John Doe" colour=blue', 'add "unclosed'])
+
+        self.assertEqual(summary, {'commands': 6, 'errors': 6, 'saves': 0})
+        self.assertEqual(self._results()[0]['error'], "Unknown command 'ad'.")
+        self.assertFalse(os.path.exists(f"{self.customers_file}.journal"))
+
+    def test_edit_clears_field(self):
+        self._runner().run(['add "John Doe" email=john@example.com', 'edit "John Doe" email='])
+
+        self.assertIsNone(self._results()[1]['result']['email'])
+
+    def test_failed_edit_changes_nothing(self):
+        self._runner().run(['add "John Doe" email=john@example.com',
+                            'edit "John Doe" address="Main Street 1, Kyiv, Ukraine" email=not-an-email'])
+
+        self.assertFalse(self._results()[1]['ok'])
+        reloaded = CustomerService(JournalStorage(CustomerDTO, self.customers_file))
+        customer = reloaded.find_by_name("John Doe")[0]
+        self.assertIsNone(customer.address)
+        self.assertEqual(customer.email, "john@example.com")
+
+    def test_save_follows_the_services(self):
+        runner = self._runner()
+        runner.run(['add "John Doe"'])
+        runner.customer_service.find_by_name("John Doe")[0].address = "Main Street 1, Kyiv, Ukraine"
+
+        self.assertTrue(runner.save())
+        self.assertFalse(runner.save())
+        reloaded = CustomerService(JournalStorage(CustomerDTO, self.customers_file))
+        self.assertEqual(reloaded.find_by_name("John Doe")[0].address, "Main Street 1, Kyiv, Ukraine")
+
+    def test_exit_stops_the_script(self):
+        summary = self._runner().run(['add "John Doe"', 'exit', 'add "Jane Roe"'])
+
+        self.assertEqual(summary, {'commands': 2, 'errors': 0, 'saves': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
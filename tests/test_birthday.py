@@ -1,7 +1,8 @@
 import unittest
 from datetime import datetime
 
-from src.modules.models.fields.date_field import DateField
+from src.modules.models.fields.date_field import DateField, parse_date, parse_dates
+from src.modules.models.fields.datetime_field import DatetimeField, parse_datetime, parse_datetimes
 
 
 class TestBirthday(unittest.TestCase):
@@ -14,3 +15,20 @@ class TestBirthday(unittest.TestCase):
             DateField("tomorrow")
         with self.assertRaises(ValueError):
             DateField("01-01-2000")
+        with self.assertRaises(ValueError):
+            DateField("31.02.2000")
+        with self.assertRaises(ValueError):
+            DateField("01.0a.2000")
+
+    def test_parse_matches_strptime(self):
+        for value in ["29.02.2024", "1.1.2000", "31.12.1999"]:
+            self.assertEqual(parse_date(value), datetime.strptime(value, DateField.FORMAT).date())
+        for value in ["29.02.2024 18:30", "1.1.2000 9:05", "31.12.1999 23:59"]:
+            self.assertEqual(parse_datetime(value), datetime.strptime(value, DatetimeField.FORMAT))
+        with self.assertRaises(ValueError):
+            DatetimeField("01.01.2024 24:00")
+
+    def test_batch_parse(self):
+        self.assertEqual(parse_dates(["01.01.2000", None, "01.01.2000"]),
+                         [datetime(2000, 1, 1).date(), None, datetime(2000, 1, 1).date()])
+        self.assertEqual(parse_datetimes(["", "02.01.2000 12:00"]), [None, datetime(2000, 1, 2, 12, 0)])
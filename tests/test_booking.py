@@ -31,6 +31,17 @@ class TestBooking(unittest.TestCase):
         self.assertEqual(dto.customer_id, "test_customer")
         self.assertEqual(dto.date, "01.01.2024 00:00")
 
+    def test_fields_hydrated_on_first_read(self):
+        self.assertEqual(self.booking.date, "01.01.2024 00:00")
+        self.assertFalse(self.booking._is_loaded('_date'))
+
+        self.assertEqual(self.booking.starts_at.year, 2024)
+        self.assertTrue(self.booking._is_loaded('_date'))
+
+    def test_empty_id_is_stable(self):
+        booking = Booking()
+        self.assertEqual(booking.id, booking.id)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from datetime import date, datetime
+
+from src.modules.dto.booking_dto import BookingDTO
+from src.modules.models.booking_model import Booking
+from src.modules.service.bookings_service import BookingsService
+
+
+class TestBookings(unittest.TestCase):
+
+    def setUp(self):
+        self.bookings = BookingsService()
+
+        self.lunch = Booking(BookingDTO(customer_id="customer1", date="01.01.2024 13:00"))
+        self.dinner = Booking(BookingDTO(customer_id="customer2", date="01.01.2024 19:30"))
+        self.next_day = Booking(BookingDTO(customer_id="customer1", date="02.01.2024 19:30"))
+
+        for booking in (self.next_day, self.dinner, self.lunch):
+            self.bookings.add(booking)
+
+    def tearDown(self):
+        self.bookings.clear()
+
+    def test_find_by_customer_id(self):
+        self.assertEqual(self.bookings.find_by_customer_id("customer1"), [self.next_day, self.lunch])
+
+    def test_find_by_date(self):
+        self.assertEqual(self.bookings.find_by_date("01.01.2024 19:30"), [self.dinner])
+        self.assertEqual(self.bookings.find_by_date(datetime(2024, 1, 1, 13)), [self.lunch])
+        self.assertEqual(self.bookings.find_by_date("01.01.2024 20:00"), [])
+
+    def test_find_between(self):
+        found = self.bookings.find_between(datetime(2024, 1, 1, 12), datetime(2024, 1, 2, 19, 30))
+        self.assertEqual(found, [self.lunch, self.dinner])
+
+    def test_find_on_day(self):
+        self.assertEqual(self.bookings.find_on_day(date(2024, 1, 1)), [self.lunch, self.dinner])
+        self.assertEqual(self.bookings.find_on_day(date(2024, 1, 3)), [])
+
+    def test_next_bookings(self):
+        self.assertEqual(self.bookings.next_bookings(2, now=datetime(2024, 1, 1, 14)), [self.dinner, self.next_day])
+
+    def test_indexes_are_built_without_hydrating_fields(self):
+        for booking in (self.lunch, self.dinner, self.next_day):
+            self.assertFalse(booking._is_loaded('_date'))
+            self.assertFalse(booking._is_loaded('_duration'))
+
+    def test_index_follows_date_changes(self):
+        self.lunch.date = "03.01.2024 12:00"
+        self.assertEqual(self.bookings.find_on_day(date(2024, 1, 1)), [self.dinner])
+        self.assertEqual(self.bookings.find_on_day(date(2024, 1, 3)), [self.lunch])
+
+        self.bookings.delete(self.lunch.id)
+        self.assertEqual(self.bookings.find_on_day(date(2024, 1, 3)), [])
+
+
+class TestAvailability(unittest.TestCase):
+
+    def setUp(self):
+        self.bookings = BookingsService(capacity=10)
+        self.bookings.add_many([
+            Booking(BookingDTO(customer_id="customer1", date="01.01.2024 18:00", covers=4)),
+            Booking(BookingDTO(customer_id="customer2", date="01.01.2024 19:00", covers=4, duration=60)),
+            Booking(BookingDTO(customer_id="customer3", date="01.01.2024 21:00", covers=6)),
+        ])
+
+    def tearDown(self):
+        self.bookings.clear()
+
+    def test_find_overlapping(self):
+        overlapping = self.bookings.find_overlapping(datetime(2024, 1, 1, 19, 30))
+        self.assertEqual([booking.customer_id for booking in overlapping], ["customer1", "customer2", "customer3"])
+
+        first = self.bookings.find_by_customer_id("customer1")[0]
+        overlapping = self.bookings.find_overlapping_booking(first)
+        self.assertEqual([booking.customer_id for booking in overlapping], ["customer2"])
+
+    def test_is_available(self):
+        self.assertTrue(self.bookings.is_available(datetime(2024, 1, 1, 18, 0), 2))
+        self.assertFalse(self.bookings.is_available(datetime(2024, 1, 1, 18, 0), 3))
+        # customer2 leaves at 20:00, customer1 at 20:00, customer3 arrives at 21:00
+        self.assertTrue(self.bookings.is_available(datetime(2024, 1, 1, 20, 0), 4))
+        self.assertFalse(self.bookings.is_available(datetime(2024, 1, 1, 20, 0), 5))
+
+    def test_free_slots(self):
+        slots = self.bookings.free_slots(6, start=datetime(2024, 1, 1, 16, 0), days=1)
+        self.assertEqual(slots, [datetime(2024, 1, 1, 16, 0), datetime(2024, 1, 1, 16, 30), datetime(2024, 1, 1, 17, 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -56,6 +56,22 @@ class TestCustomerModel(unittest.TestCase):
         with self.assertRaises(ValueError):
             record.email = "test"
 
+    def test_clear_optional_fields(self):
+        record = Customer(CustomerDTO(name="John Doe", birthday="01.01.2000", address="Some Street, Some Town",
+                                      email="test.test@test.com"))
+        record.birthday = None
+        record.address = None
+        record.email = None
+        self.assertIsNone(record.birthday)
+        self.assertIsNone(record.address)
+        self.assertIsNone(record.email)
+
+    def test_name_is_required(self):
+        record = Customer(CustomerDTO(name="John Doe"))
+        with self.assertRaises(ValueError):
+            record.name = None
+        self.assertEqual(record.name, "John Doe")
+
     def test_to_dto(self):
         record = Customer()
         record.name = TEST_NAME
@@ -91,6 +107,29 @@ class TestCustomerModel(unittest.TestCase):
         self.assertEqual(record.address, "Some Street, Some Town, Somewhere")
         self.assertEqual(record.email, "test@test.com")
 
+    def test_fields_hydrated_on_first_read(self):
+        dto = CustomerDTO(id='test', name=TEST_NAME, phones=[TEST_PHONE], birthday="01.01.2000",
+                          notes=['Likes tea'], note_tags=[['drinks']])
+        record = Customer(dto)
+
+        self.assertEqual(record.id, 'test')
+        self.assertEqual(record.phones, [TEST_PHONE])
+        self.assertEqual(record.note_tags, [['drinks']])
+        self.assertFalse(record._is_loaded('_phones'))
+        self.assertFalse(record._is_loaded('_notes'))
+        self.assertFalse(record._is_loaded('_birthday'))
+
+        self.assertEqual(str(record.birthday.year), '2000')
+        self.assertTrue(record._is_loaded('_birthday'))
+        self.assertEqual(record.notes[0].tags, ['drinks'])
+        self.assertTrue(record._is_loaded('_notes'))
+
+    def test_dto_of_unread_record(self):
+        dto = CustomerDTO(id='test', name=TEST_NAME, phones=[TEST_PHONE], birthday="01.01.2000",
+                          notes=['Likes tea'], note_tags=[['drinks']])
+
+        self.assertEqual(Customer(dto).dto(), dto)
+
 
 if __name__ == '__main__':
     unittest.main()
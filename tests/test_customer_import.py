@@ -0,0 +1,120 @@
+import json
+import os
+import unittest
+
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.models.customer_model import Customer
+from src.modules.service.customer_import import import_customers, read_chunks, validate_row
+from src.modules.service.customers_service import CustomerService
+from src.modules.storage import Storage
+
+CSV = """name,phones,birthday,address,email,notes,note_tags
+John Doe,0123456789;0987654321,1.2.1990,"Main Street 1, Kyiv, Ukraine",john@example.com,Likes the window table,"vip,wine"
+Jo,12345,31.02.1990,,not-an-email,,
+Jane Roe,,,,,,
+Existing Customer,,,,,,
+Jane Roe,0123456789,,,,,
+"""
+
+
+class TestCustomerImport(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = "test_customer_import.csv"
+        self.import_filename = "test_customer_import_source.csv"
+        self.customers = CustomerService(Storage(CustomerDTO, self.filename))
+        self.customers.add(Customer(CustomerDTO(name="Existing Customer")))
+        self.customers.save()
+
+    def tearDown(self):
+        for filename in (self.filename, self.import_filename, "test_customer_import_source.jsonl"):
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def _write(self, text, filename=None):
+        with open(filename or self.import_filename, mode='w', encoding='utf-8') as file:
+            file.write(text)
+
+    def test_import_csv(self):
+        self._write(CSV)
+
+        result = import_customers(self.customers, self.import_filename, workers=0)
+
+        self.assertEqual([customer.name for customer in result.accepted], ["John Doe", "Jane Roe"])
+        self.assertEqual([row.line for row in result.rejected], [3, 5, 6])
+        self.assertEqual(len(result.rejected[0].errors), 4)
+        self.assertEqual(result.rejected[1].errors, ["Customer with name 'Existing Customer' already exists."])
+
+        john = self.customers.find_by_phone("0987654321")[0]
+        self.assertEqual(john.dto().birthday, "01.02.1990")
+        self.assertEqual(john.note_tags, [["vip", "wine"]])
+        reloaded = CustomerService(Storage(CustomerDTO, self.filename))
+        self.assertEqual(len(reloaded), 3)
+
+    def test_import_jsonl(self):
+        filename = "test_customer_import_source.jsonl"
+        self._write('\n'.join([
+            json.dumps({'name': "John Doe", 'phones': ["0123456789"], 'notes': ["Likes the window table"],
+                        'note_tags': [["vip"]]}),
+            '{"name": ',
+            json.dumps({'name': "Jane Roe", 'phones': 123}),
+        ]) + '\n', filename)
+
+        result = import_customers(self.customers, filename, workers=0)
+
+        self.assertEqual([customer.name for customer in result.accepted], ["John Doe"])
+        self.assertEqual(result.accepted[0].note_tags, [["vip"]])
+        self.assertEqual([row.line for row in result.rejected], [2, 3])
+        self.assertTrue(result.rejected[0].errors[0].startswith("Invalid JSON"))
+
+    def test_import_in_process_pool(self):
+        rows = [f"Customer {i},{i:010d},01.01.2000,,,," for i in range(50)] + ["Bo,,,,,,"]
+        self._write("name,phones,birthday,address,email,notes,note_tags\n" + '\n'.join(rows) + '\n')
+
+        result = import_customers(self.customers, self.import_filename, chunk_size=7, workers=2)
+
+        self.assertEqual([customer.name for customer in result.accepted], [f"Customer {i}" for i in range(50)])
+        self.assertEqual([row.line for row in result.rejected], [52])
+        self.assertEqual(len(CustomerService(Storage(CustomerDTO, self.filename))), 51)
+
+    def test_nothing_accepted_nothing_saved(self):
+        self._write("name,phones\nJo,1\n")
+        modified = os.path.getmtime(self.filename)
+
+        result = import_customers(self.customers, self.import_filename, workers=0)
+
+        self.assertEqual(result.accepted, [])
+        self.assertEqual(os.path.getmtime(self.filename), modified)
+
+    def test_read_chunks(self):
+        self._write("name\n" + '\n'.join(f"Customer {i}" for i in range(5)) + '\n')
+
+        chunks = list(read_chunks(self.import_filename, 2))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(chunks[2], [(6, {'name': "Customer 4"})])
+
+    def test_validate_row(self):
+        values, errors = validate_row({'name': "John Doe", 'email': "john@example.com"})
+        self.assertEqual(errors, [])
+        self.assertEqual(values['email'], "john@example.com")
+
+        values, errors = validate_row({'phones': "0123456789"})
+        self.assertIsNone(values)
+        self.assertEqual(errors, ["The name is missing."])
+
+    def test_separators_in_json_lists(self):
+        values, errors = validate_row({'name': "John Doe", 'notes': ["Likes the window", "Wine pairing"],
+                                       'note_tags': [["vip", "window seat"], "wine,red"]})
+        self.assertEqual(errors, [])
+        self.assertEqual(values['notes'], ["Likes the window", "Wine pairing"])
+        self.assertEqual(values['note_tags'], [["vip", "window seat"], ["wine", "red"]])
+
+        values, errors = validate_row({'name': "John Doe", 'notes': ["likes; wine"], 'note_tags': [["red,white"]]})
+        self.assertIsNone(values)
+        self.assertEqual(errors, ["The note 'likes; wine' can't contain ';'.",
+                                  "The tag 'red,white' can't contain ',' or ';'."])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import unittest
+from datetime import date
+
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.models.customer_model import Customer
+from src.modules.service.customer_table import np
+from src.modules.service.customers_service import CustomerService
+from src.modules.storage import Storage
+
+
+def make_customer(customer_id, birthday=None, address=None, email=None, notes=(), note_tags=()):
+    return Customer(CustomerDTO(id=customer_id, name=f"Customer {customer_id}", birthday=birthday,
+                                address=address, email=email, notes=list(notes), note_tags=list(note_tags)))
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestCustomerTable(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = "test_customer_table.csv"
+        self.customers = CustomerService(Storage(CustomerDTO, self.filename))
+        self.customers.add_many([
+            make_customer("1", "10.03.1990", "Khreshchatyk 1, Kyiv, Ukraine", "one@example.com",
+                          ["Likes wine", "Window seat"], [["wine"], ["window", "quiet"]]),
+            make_customer("2", "12.03.1985", "Franka 5, Lviv, Ukraine", None, ["Vegan menu"], [["vegan"]]),
+            make_customer("3", "29.02.2000", "Soborna 3, Kyiv, Ukraine", "three@example.com",
+                          ["Red wine only"], [["wine"]]),
+            make_customer("4"),
+        ])
+        self.table = self.customers.table()
+
+    def tearDown(self):
+        self.customers.clear()
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def test_filters(self):
+        self.assertEqual(self.table.select(self.table.without_email()), ["2", "4"])
+        self.assertEqual(self.table.select(self.table.in_city("Kyiv")), ["1", "3"])
+        self.assertEqual(self.table.select(self.table.with_tag("wine") & self.table.in_city("Kyiv")), ["1", "3"])
+        self.assertEqual(self.table.select(self.table.with_tag("unknown")), [])
+        self.assertEqual(self.table.select(self.table.born_between(date(1985, 1, 1), date(1995, 1, 1))), ["1", "2"])
+
+    def test_aggregates(self):
+        self.assertEqual(self.table.count(), 4)
+        self.assertEqual(self.table.count_by_city(), {"Kyiv": 2, "Lviv": 1})
+        self.assertEqual(self.table.count_by_tag(), {"wine": 2, "window": 1, "quiet": 1, "vegan": 1})
+        self.assertEqual(self.table.count_by_tag(self.table.in_city("Lviv")), {"vegan": 1})
+        self.assertEqual(self.table.count_by_birth_month(), {2: 1, 3: 2})
+
+    def test_upcoming_birthdays(self):
+        self.assertEqual(self.table.upcoming_birthdays(14, today=date(2023, 2, 27)), ["3", "1", "2"])
+        self.assertEqual(self.table.upcoming_birthdays(14, today=date(2023, 2, 27)),
+                         [customer.id for customer in self.customers.customer_birthdays(14, today=date(2023, 2, 27))])
+        self.assertEqual(self.table.select(self.table.birthday_within(1, today=date(2024, 3, 11))), ["2"])
+
+    def test_kept_in_sync(self):
+        self.customers.delete("1")
+        customer = self.customers.find("2")
+        customer.email = "two@example.com"
+        customer.add_note("Brings a dog", ["terrace"])
+        self.customers.add(make_customer("5", address="Sadova 2, Odesa, Ukraine"))
+
+        self.assertEqual(self.table.count(), 4)
+        self.assertEqual(sorted(self.table.select(self.table.without_email())), ["4", "5"])
+        self.assertEqual(self.table.count_by_tag(), {"wine": 1, "vegan": 1, "terrace": 1})
+        self.assertEqual(self.table.count_by_city(), {"Kyiv": 1, "Lviv": 1, "Odesa": 1})
+
+    def test_grows(self):
+        self.customers.add_many(make_customer(str(number), notes=["Note"], note_tags=[[f"tag{number}"]])
+                                for number in range(10, 2100))
+
+        self.assertEqual(self.table.count(), 2094)
+        self.assertEqual(self.table.select(self.table.with_tag("tag2099")), ["2099"])
+        self.assertEqual(self.table.count_by_tag()["wine"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,14 @@
+import os
 import unittest
+from datetime import date
 
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.error_handler import DuplicateRecordError
+from src.modules.journal_storage import JournalStorage
 from src.modules.service.customers_service import CustomerService
 from src.modules.models.customer_model import Customer
+from src.modules.sqlite_storage import SqliteCustomerStorage
+from src.modules.storage import Storage
 
 
 class TestCustomers(unittest.TestCase):
@@ -38,6 +45,267 @@ class TestCustomers(unittest.TestCase):
         self.assertIsNone(self.customers.find(self.customer2.id))
         self.assertEqual(len(self.customers), 1)
 
+    def test_delete_keeps_index_consistent(self):
+        customer3 = Customer()
+        customer3.name = "Test3"
+        self.customers.add(customer3)
+
+        self.customers.delete(self.customer1.id)
+
+        self.assertIsNone(self.customers.find(self.customer1.id))
+        self.assertIs(self.customers.find(self.customer2.id), self.customer2)
+        self.assertIs(self.customers.find(customer3.id), customer3)
+        self.assertEqual(len(self.customers), 2)
+
+    def test_delete_keeps_insertion_order(self):
+        customer3 = Customer()
+        customer3.name = "Test3"
+        self.customers.add(customer3)
+
+        self.customers.delete(self.customer1.id)
+
+        self.assertEqual(list(self.customers), [self.customer2, customer3])
+        self.assertEqual(self.customers.search("test"), [self.customer2, customer3])
+
+    def test_delete_nonexistent_customer(self):
+        self.customers.delete("NONEXISTENT")
+        self.assertEqual(len(self.customers), 2)
+
+    def test_add_duplicate_customer(self):
+        with self.assertRaises(DuplicateRecordError):
+            self.customers.add(self.customer1)
+
+    def test_find_by_name_is_case_insensitive(self):
+        self.assertEqual(self.customers.find_by_name("test"), [self.customer1])
+        self.assertEqual(self.customers.find_by_name("TEST2"), [self.customer2])
+        self.assertEqual(self.customers.find_by_name("missing"), [])
+
+    def test_indexes_follow_setters(self):
+        self.customer1.name = "Renamed"
+        self.customer1.add_phone("0000000000")
+        self.customer1.email = "test@test.com"
+
+        self.assertEqual(self.customers.find_by_name("Test"), [])
+        self.assertEqual(self.customers.find_by_name("renamed"), [self.customer1])
+        self.assertEqual(self.customers.find_by_phone("0000000000"), [self.customer1])
+        self.assertEqual(self.customers.find_by_email("test@test.com"), [self.customer1])
+
+        self.customer1.edit_phone("0000000000", "1111111111")
+        self.assertEqual(self.customers.find_by_phone("0000000000"), [])
+        self.assertEqual(self.customers.find_by_phone("1111111111"), [self.customer1])
+
+    def test_find_by_birthday(self):
+        self.customer2.birthday = "02.02.2000"
+        self.assertEqual(self.customers.find_by_birthday("01.01.2000"), [self.customer1])
+        self.assertEqual(self.customers.find_by_birthday("02.02.2000"), [self.customer2])
+
+    def test_deleted_customer_is_not_indexed(self):
+        self.customers.delete(self.customer1.id)
+        self.assertEqual(self.customers.find_by_name("Test"), [])
+
+    def test_find_by_tag(self):
+        self.customer1.add_note("likes window seats", ["vip"])
+        self.customer1.add_note("allergic to nuts", ["allergy"])
+        self.customer2.add_note("regular guest")
+        self.customer2.add_tag_to_note(0, "vip")
+
+        self.assertEqual(self.customers.find_by_tag("vip"), [self.customer1, self.customer2])
+        self.assertEqual(self.customers.find_notes_by_tag("allergy"), [(self.customer1, 1)])
+
+    def test_tag_index_follows_note_changes(self):
+        self.customer1.add_note("likes window seats", ["vip"])
+        self.customer1.notes[0].remove_tag("vip")
+        self.assertEqual(self.customers.find_by_tag("vip"), [])
+
+        self.customer1.notes[0].add_tag("vip")
+        self.customer1.add_note("allergic to nuts", ["allergy"])
+        self.customer1.remove_note(1)
+        self.assertEqual(self.customers.find_notes_by_tag("allergy"), [(self.customer1, 0)])
+        self.assertEqual(self.customers.find_by_tag("vip"), [])
+
+        self.customers.delete(self.customer1.id)
+        self.assertEqual(self.customers.find_by_tag("allergy"), [])
+
+    def test_search(self):
+        self.customer1.add_phone("0501234567")
+        self.customer2.email = "guest@example.com"
+
+        self.assertEqual(self.customers.search("1234"), [self.customer1])
+        self.assertEqual(self.customers.search("EXAMPLE"), [self.customer2])
+        self.assertEqual(self.customers.search("tes"), [self.customer1, self.customer2])
+        self.assertEqual(self.customers.search("t2"), [self.customer2])
+        self.assertEqual(self.customers.search("nowhere"), [])
+
+        self.customer1.remove_phone("0501234567")
+        self.assertEqual(self.customers.search("1234"), [])
+
+    def test_find_by_note(self):
+        self.customer1.add_note("prefers the terrace")
+        self.assertEqual(self.customers.find_by_note("terrace"), [self.customer1])
+        self.assertEqual(self.customers.find_by_note("Terrace"), [])
+
+    def test_customer_birthdays(self):
+        self.customer2.birthday = "03.01.1990"
+        customer3 = Customer()
+        customer3.name = "Test3"
+        customer3.birthday = "30.12.1985"
+        self.customers.add(customer3)
+
+        upcoming = self.customers.customer_birthdays(7, today=date(2023, 12, 29))
+        self.assertEqual(upcoming, [customer3, self.customer1, self.customer2])
+        self.assertEqual(self.customers.customer_birthdays(1, today=date(2024, 1, 1)), [self.customer1])
+
+    def test_customer_birthdays_on_leap_day(self):
+        self.customer1.birthday = "29.02.2000"
+        self.assertEqual(self.customers.customer_birthdays(0, today=date(2023, 2, 28)), [self.customer1])
+        self.assertEqual(self.customers.customer_birthdays(0, today=date(2024, 2, 28)), [])
+        self.assertEqual(self.customers.customer_birthdays(1, today=date(2024, 2, 28)), [self.customer1])
+
+    def test_customer_birthdays_whole_year(self):
+        upcoming = self.customers.customer_birthdays(1000, today=date(2024, 6, 1))
+        self.assertEqual(upcoming, [self.customer1, self.customer2])
+
+
+class CountingStorage(Storage):
+    def __init__(self):
+        super().__init__(CustomerDTO, "test_dirty_tracking.csv")
+        self.changes = []
+
+    def save_changes(self, upserts, deleted_ids, snapshot):
+        self.changes.append(([dto.id for dto in upserts], deleted_ids))
+
+
+class TestDirtyTracking(unittest.TestCase):
+
+    def setUp(self):
+        self.storage = CountingStorage()
+        self.customers = CustomerService(self.storage)
+        self.customer = Customer()
+        self.customer.name = "Test"
+
+    def tearDown(self):
+        self.customers.clear()
+
+    def test_clean_service_skips_save(self):
+        self.customers.save()
+        self.assertFalse(self.customers.is_dirty)
+        self.assertEqual(self.storage.changes, [])
+
+    def test_only_changes_are_saved(self):
+        other = Customer()
+        other.name = "Other"
+        self.customers.add(self.customer)
+        self.customers.add(other)
+        self.customers.save()
+        self.assertEqual(sorted(self.storage.changes[0][0]), sorted([self.customer.id, other.id]))
+
+        self.customer.add_phone("0000000000")
+        self.customers.save()
+        self.assertEqual(self.storage.changes[1], ([self.customer.id], []))
+
+        self.customers.delete(other.id)
+        self.customers.save()
+        self.customers.save()
+        self.assertEqual(self.storage.changes[2:], [([], [other.id])])
+
+    def test_add_and_delete_before_save_is_a_no_op(self):
+        self.customers.add(self.customer)
+        self.customers.delete(self.customer.id)
+        self.assertFalse(self.customers.is_dirty)
+
+
+class TestCustomerServiceStartup(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = "test_customers_startup.csv"
+        Storage(CustomerDTO, self.filename).save([
+            CustomerDTO(id="1", name="John Doe", phones=["0123456789"], birthday="10.03.1990",
+                        email="john@example.com", notes=["Likes wine"], note_tags=[["wine"]]),
+        ])
+
+    def tearDown(self):
+        Storage(CustomerDTO, self.filename).clear()
+
+    def test_indexes_are_built_without_hydrating_fields(self):
+        customers = CustomerService(Storage(CustomerDTO, self.filename))
+        customer = customers.find("1")
+
+        for field in ('_name', '_birthday', '_phones', '_email', '_notes'):
+            self.assertFalse(customer._is_loaded(field), field)
+        self.assertEqual(customers.find_by_name("john doe"), [customer])
+        self.assertEqual(customers.find_by_birthday("10.03.1990"), [customer])
+        self.assertEqual(customers.customer_birthdays(1, today=date(2024, 3, 10)), [customer])
+        self.assertEqual(customers.search("doe"), [customer])
+
+        customer.birthday = "11.03.1990"
+        self.assertEqual(customers.find_by_birthday("11.03.1990"), [customer])
+
+    def test_trigram_indexes_are_built_on_first_search(self):
+        customers = CustomerService(Storage(CustomerDTO, self.filename))
+        self.assertIsNone(customers._contact_ngram_index)
+        self.assertIsNone(customers._note_ngram_index)
+
+        self.assertEqual([customer.id for customer in customers.search("doe")], ["1"])
+        self.assertIsNotNone(customers._contact_ngram_index)
+        self.assertIsNone(customers._note_ngram_index)
+
+        added = Customer(CustomerDTO(name="Jane Doe"))
+        customers.add(added)
+        self.assertEqual([customer.id for customer in customers.search("doe")], ["1", added.id])
+        self.assertEqual([customer.id for customer in customers.find_by_note("wine")], ["1"])
+
+    def test_saved_file_keeps_insertion_order(self):
+        customers = CustomerService(Storage(CustomerDTO, self.filename))
+        for name in ("Jane Roe", "Mark Poe"):
+            customers.add(Customer(CustomerDTO(name=name)))
+        customers.delete("1")
+        customers.save()
+
+        reloaded = CustomerService(Storage(CustomerDTO, self.filename))
+        self.assertEqual([customer.name.value for customer in reloaded], ["Jane Roe", "Mark Poe"])
+
+
+class TestSaveOrder(unittest.TestCase):
+    """Records reload in the order they were added, whatever the storage"""
+
+    NAMES = ["Ann Lee", "Bob Ray", "Cid Moe", "Dan Poe", "Eve Roe"]
+
+    def setUp(self):
+        self.filename = "test_customers_order"
+
+    def tearDown(self):
+        for suffix in (".csv", ".csv.journal", ".db", ".db-wal", ".db-shm"):
+            if os.path.exists(self.filename + suffix):
+                os.remove(self.filename + suffix)
+
+    def _check_order(self, storage_factory):
+        customers = CustomerService(storage_factory())
+        for name in self.NAMES:
+            customers.add(Customer(CustomerDTO(name=name)))
+        customers.save()
+        first, second = customers.find_by_name("Ann Lee")[0], customers.find_by_name("Cid Moe")[0]
+        first.add_phone("0123456789")
+        customers.delete(second.id)
+        customers.add(Customer(CustomerDTO(name="Fay Doe")))
+        customers.save()
+
+        reloaded = [customer.name.value for customer in CustomerService(storage_factory())]
+        self.assertEqual(reloaded, ["Ann Lee", "Bob Ray", "Dan Poe", "Eve Roe", "Fay Doe"])
+
+    def test_journal_storage(self):
+        self._check_order(lambda: JournalStorage(CustomerDTO, self.filename + ".csv"))
+
+    def test_sqlite_storage(self):
+        storages = []
+
+        def storage():
+            storages.append(SqliteCustomerStorage(self.filename + ".db"))
+            return storages[-1]
+
+        self._check_order(storage)
+        for opened in storages:
+            opened.close()
+
 
 if __name__ == "__main__":
     unittest.main()
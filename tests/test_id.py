@@ -8,3 +8,11 @@ class TestIDField(unittest.TestCase):
         name = IDField("2")
         self.assertEqual(name.value, "2")
         self.assertEqual(str(name), "2")
+
+    def test_generated_id(self):
+        record_id = IDField()
+        self.assertEqual(len(str(record_id)), 36)
+        self.assertEqual(str(record_id), str(record_id))
+
+    def test_no_instance_dict(self):
+        self.assertFalse(hasattr(IDField("2"), '__dict__'))
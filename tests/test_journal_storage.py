@@ -0,0 +1,99 @@
+import os
+import unittest
+
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.journal_storage import JournalStorage
+from src.modules.models.customer_model import Customer
+from src.modules.service.customers_service import CustomerService
+
+
+class TestJournalStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = "test_journal_storage.csv"
+        self.storage = JournalStorage(CustomerDTO, self.filename)
+        self.dto1 = CustomerDTO(id="1", name="First", phones=["0000000000"])
+        self.dto2 = CustomerDTO(id="2", name="Second")
+
+    def tearDown(self):
+        self.storage.clear()
+
+    def test_append_is_replayed_on_load(self):
+        self.storage.save([self.dto1, self.dto2])
+        updated = CustomerDTO(id="1", name="Renamed", phones=["0000000000"])
+        added = CustomerDTO(id="3", name="Third")
+
+        self.storage.append([updated, added], ["2"])
+
+        self.assertEqual(self.storage.load(), [updated, added])
+
+    def test_save_drops_journal(self):
+        self.storage.append([self.dto1], [])
+        self.storage.save([self.dto2])
+
+        self.assertFalse(os.path.exists(self.storage.journal_filename))
+        self.assertEqual(self.storage.load(), [self.dto2])
+
+    def test_compaction(self):
+        self.storage.compact_threshold = 1
+        self.storage.save([self.dto1])
+
+        self.storage.append([self.dto2], ["1"])
+        self.storage.wait()
+
+        self.assertFalse(os.path.exists(self.storage.journal_filename))
+        self.assertFalse(os.path.exists(self.storage.compacting_filename))
+        self.assertEqual(self.storage.load(), [self.dto2])
+
+    def test_compact_folds_a_journal_left_by_a_crash(self):
+        self.storage.append([self.dto1], [])
+        # a crash in the middle of a compaction leaves the old journal behind
+        os.replace(self.storage.journal_filename, self.storage.compacting_filename)
+
+        restarted = JournalStorage(CustomerDTO, self.filename)
+        restarted.append([self.dto2], [])
+        restarted.compact()
+
+        self.assertFalse(os.path.exists(self.storage.compacting_filename))
+        self.assertEqual(JournalStorage(CustomerDTO, self.filename).load(), [self.dto1, self.dto2])
+
+    def test_save_drops_a_journal_left_by_a_crash(self):
+        self.storage.append([self.dto1], [])
+        os.replace(self.storage.journal_filename, self.storage.compacting_filename)
+
+        self.storage.save([self.dto2])
+
+        self.assertEqual(self.storage.load(), [self.dto2])
+
+    def test_torn_last_line_is_cut_off(self):
+        self.storage.append([self.dto1], [])
+        with open(self.storage.journal_filename, mode='a') as file:
+            file.write('{"op": "upsert", "rec')  # a crash in the middle of an append
+
+        self.assertEqual(self.storage.load(), [self.dto1])
+        self.storage.append([self.dto2], [])
+        self.assertEqual(JournalStorage(CustomerDTO, self.filename).load(), [self.dto1, self.dto2])
+
+    def test_service_journals_only_changes(self):
+        customers = CustomerService(self.storage)
+        customer = Customer()
+        customer.name = "Test"
+        customers.add(customer)
+        customers.save()
+
+        customer.add_phone("0000000000")
+        customers.save()
+
+        with open(self.storage.journal_filename) as file:
+            self.assertEqual(len(file.readlines()), 2)
+
+        customers.save()
+        with open(self.storage.journal_filename) as file:
+            self.assertEqual(len(file.readlines()), 2)
+
+        loaded = CustomerService(JournalStorage(CustomerDTO, self.filename))
+        self.assertEqual(loaded.find(customer.id).phones, ["0000000000"])
+
+
+if __name__ == '__main__':
+    unittest.main()
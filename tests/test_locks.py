@@ -0,0 +1,177 @@
+import os
+import random
+import sys
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List
+
+from src.modules.dto.booking_dto import BookingDTO
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.models.booking_model import Booking
+from src.modules.models.customer_model import Customer
+from src.modules.service.bookings_service import BookingsService
+from src.modules.service.customers_service import CustomerService
+from src.modules.service.locks import ReadWriteLock
+from src.modules.storage import Storage
+
+THREADS = 8
+OPERATIONS = 400  # per thread
+
+
+class TestReadWriteLock(unittest.TestCase):
+
+    def test_readers_share_the_lock(self):
+        lock = ReadWriteLock()
+        inside = threading.Barrier(2, timeout=5)
+
+        def read():
+            with lock.reading():
+                inside.wait()  # both threads hold the read lock at once
+
+        threads = [threading.Thread(target=read) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(inside.broken)
+
+    def test_writer_excludes_readers(self):
+        lock = ReadWriteLock()
+        events = []
+        lock.acquire_write()
+        reader = threading.Thread(target=lambda: (lock.acquire_read(), events.append("read"), lock.release_read()))
+        reader.start()
+        reader.join(0.05)
+        events.append("write")
+        lock.release_write()
+        reader.join()
+
+        self.assertEqual(events, ["write", "read"])
+
+    def test_reentrant(self):
+        lock = ReadWriteLock()
+        with lock.writing():
+            with lock.writing(), lock.reading():
+                pass
+        with lock.reading(), lock.reading():
+            with self.assertRaises(RuntimeError):
+                lock.acquire_write()
+        with lock.writing():
+            pass
+
+    def test_only_the_writer_releases(self):
+        lock = ReadWriteLock()
+        with self.assertRaises(RuntimeError):
+            lock.release_write()
+
+        lock.acquire_write()
+        errors = []
+
+        def release():
+            try:
+                lock.release_write()
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        other = threading.Thread(target=release)
+        other.start()
+        other.join()
+        lock.release_write()
+        self.assertEqual(errors, ["The write lock is not held by this thread"])
+
+    def test_record_changes_wait_for_readers(self):
+        customers = CustomerService(Storage(CustomerDTO, "test_locks_customers.csv"))
+        customer = Customer(CustomerDTO(name="John Doe", email="john@example.com"))
+        customers.add(customer)
+        events = []
+        editor = threading.Thread(target=lambda: (setattr(customer, 'email', "doe@example.com"), events.append("edit")))
+
+        with customers.lock.reading():
+            editor.start()
+            editor.join(0.05)
+            # neither the field nor the index changed while the read lock is held
+            events.append(customer.email)
+            events.append(len(customers.find_by_email("john@example.com")))
+        editor.join()
+
+        self.assertEqual(events, ["john@example.com", 1, "edit"])
+        self.assertEqual(customers.find_by_email("doe@example.com"), [customer])
+
+        customers.delete(customer.id)
+        with customers.lock.reading():
+            customer.email = "jd@example.com"  # no longer guarded by the service
+
+
+class TestServiceStress(unittest.TestCase):
+    """Hammer shared services from a thread pool, then check they are still consistent"""
+
+    def setUp(self):
+        self.switch_interval = sys.getswitchinterval()
+        # switch threads as often as possible to make races likely
+        sys.setswitchinterval(1e-6)
+        self.filenames = ["test_locks_customers.csv", "test_locks_bookings.csv"]
+        self.customers = CustomerService(Storage(CustomerDTO, self.filenames[0]))
+        self.bookings = BookingsService(Storage(BookingDTO, self.filenames[1]))
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+        for filename in self.filenames:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def _work(self, worker: int) -> List[Customer]:
+        rand = random.Random(worker)
+        mine = []
+        start = datetime(2024, 6, 1, 12, 0)
+        for i in range(OPERATIONS):
+            action = rand.random()
+            if action < 0.3 or not mine:
+                customer = Customer(CustomerDTO(name=f"Customer {worker} {i}", phones=[f"{worker:02d}{i:08d}"]))
+                self.customers.add(customer)
+                self.bookings.add(Booking(BookingDTO(customer_id=customer.id, covers=2,
+                                                     date=(start + timedelta(minutes=30 * i)).strftime("%d.%m.%Y %H:%M"))))
+                mine.append(customer)
+            elif action < 0.4:
+                customer = mine.pop(rand.randrange(len(mine)))
+                self.customers.delete(customer.id)
+                for booking in self.bookings.find_by_customer_id(customer.id):
+                    self.bookings.delete(booking.id)
+            elif action < 0.5:
+                with self.customers.lock.writing():
+                    rand.choice(mine).add_note("Hammered", ["stress"])
+            elif action < 0.6:
+                self.customers.save()
+                self.bookings.save()
+            else:
+                customer = rand.choice(mine)
+                self.assertEqual(self.customers.find_by_name(customer.name.value), [customer])
+                self.assertEqual(self.customers.find_by_phone(customer.phones[0]), [customer])
+                self.customers.search(f"Customer {worker}")
+                self.customers.find_by_tag("stress")
+                snapshot = list(self.customers)
+                self.assertEqual(len({record.id for record in snapshot}), len(snapshot))
+                self.bookings.find_on_day(start.date())
+                self.bookings.is_available(start, 2)
+        return mine
+
+    def test_concurrent_reads_and_writes(self):
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            kept = [customer for customers in executor.map(self._work, range(THREADS)) for customer in customers]
+
+        self.assertEqual(sorted(record.id for record in self.customers), sorted(customer.id for customer in kept))
+        for position, customer in enumerate(self.customers.data):
+            self.assertEqual(self.customers._positions[customer.id], position)
+            self.assertEqual(self.customers.find_by_name(customer.name.value), [customer])
+        self.assertEqual(len(self.bookings), len(kept))
+        self.assertEqual({customer.id for customer in self.customers.find_by_tag("stress")},
+                         {customer.id for customer in kept if customer.note_tags})
+
+        self.customers.save()
+        self.bookings.save()
+        self.assertEqual(len(CustomerService(Storage(CustomerDTO, self.filenames[0]))), len(kept))
+
+
+if __name__ == '__main__':
+    unittest.main()
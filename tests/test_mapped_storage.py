@@ -0,0 +1,132 @@
+import os
+import unittest
+
+from src.main import _storage
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.journal_storage import JournalStorage
+from src.modules.mapped_storage import MappedStorage
+from src.modules.models.customer_model import Customer
+from src.modules.service.customers_service import CustomerService
+
+
+class TestMappedStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = "test_mapped_storage.bin"
+        self.dtos = [CustomerDTO(id=str(i), name=f"Customer {i}", phones=[f"{i:010d}"]) for i in range(20)]
+        MappedStorage(CustomerDTO, self.filename).save(self.dtos)
+
+    def tearDown(self):
+        MappedStorage(CustomerDTO, self.filename).clear()
+
+    def open_service(self) -> CustomerService:
+        return CustomerService(MappedStorage(CustomerDTO, self.filename, cache_size=3))
+
+    def test_load(self):
+        storage = MappedStorage(CustomerDTO, self.filename)
+
+        self.assertEqual(storage.load(), self.dtos)
+        self.assertEqual(storage.read("7"), self.dtos[7])
+
+    def test_cache_is_bounded(self):
+        customers = self.open_service()
+
+        self.assertEqual([customer.id for customer in customers], [dto.id for dto in self.dtos])
+        self.assertEqual(customers.find("5").name, "Customer 5")
+        self.assertEqual(customers.find_by_phone("0000000012")[0].id, "12")
+        self.assertLessEqual(len(customers.data._cache), 3)
+
+    def test_changes_survive_eviction(self):
+        customers = self.open_service()
+        customers.find("1").add_phone("1111111111")
+        for customer in customers:
+            pass
+
+        customer = Customer()
+        customer.name = "New customer"
+        customers.add(customer)
+        customers.delete("2")
+        customers.save()
+
+        reopened = self.open_service()
+        self.assertEqual(reopened.find("1").phones, ["0000000001", "1111111111"])
+        self.assertEqual(reopened.find_by_name("new customer")[0].id, customer.id)
+        self.assertIsNone(reopened.find("2"))
+        self.assertEqual(len(reopened), 20)
+
+    def test_index_file_is_used_and_tail_is_scanned(self):
+        storage = MappedStorage(CustomerDTO, self.filename)
+        storage.save_changes([CustomerDTO(id="20", name="Appended")], ["0"], lambda: [])
+
+        reopened = MappedStorage(CustomerDTO, self.filename)
+        self.assertNotIn("0", reopened.offsets)
+        self.assertEqual(reopened.read("20").name, "Appended")
+
+        reopened.compact()
+        self.assertEqual(len(MappedStorage(CustomerDTO, self.filename).load()), 20)
+
+    def test_append_leaves_the_index_file_alone(self):
+        storage = MappedStorage(CustomerDTO, self.filename)
+        with open(storage.index_filename) as file:
+            index = file.read()
+
+        storage.save_changes([CustomerDTO(id="20", name="Appended")], [], lambda: [])
+
+        with open(storage.index_filename) as file:
+            self.assertEqual(file.read(), index)
+        self.assertEqual(MappedStorage(CustomerDTO, self.filename).read("20").name, "Appended")
+
+    def test_index_of_an_older_file_is_ignored(self):
+        storage = MappedStorage(CustomerDTO, self.filename)
+        with open(storage.index_filename) as file:
+            old_index = file.read()
+        storage.save([CustomerDTO(id="x", name="A much longer name than before"), *self.dtos[:5]])
+        # a crash between the rewrite of the file and the one of its index
+        with open(storage.index_filename, mode='w') as file:
+            file.write(old_index)
+
+        reopened = MappedStorage(CustomerDTO, self.filename)
+        self.assertEqual(reopened.ids(), ["x", "0", "1", "2", "3", "4"])
+        self.assertEqual(reopened.read("4"), self.dtos[4])
+
+    def test_torn_tail_is_cut_off(self):
+        storage = MappedStorage(CustomerDTO, self.filename)
+        storage.save_changes([CustomerDTO(id="20", name="Appended")], [], lambda: [])
+        size = os.path.getsize(self.filename)
+        with open(self.filename, mode='ab') as file:
+            file.write(b'\x01\xff\x00\x00\x00{"id": "2')  # a crash in the middle of an append
+
+        reopened = MappedStorage(CustomerDTO, self.filename)
+        self.assertEqual(os.path.getsize(self.filename), size)
+        self.assertEqual(len(reopened.offsets), 21)
+
+    def test_search_without_ngram_index(self):
+        customers = self.open_service()
+
+        self.assertEqual([customer.id for customer in customers.search("omer 1")],
+                         ["1"] + [str(i) for i in range(10, 20)])
+
+
+class TestMappedMode(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = "test_mapped_mode.csv"
+        self.dtos = [CustomerDTO(id=str(i), name=f"Customer {i}") for i in range(5)]
+        JournalStorage(CustomerDTO, self.filename).save(self.dtos)
+
+    def tearDown(self):
+        JournalStorage(CustomerDTO, self.filename).clear()
+        MappedStorage(CustomerDTO, "test_mapped_mode.records").clear()
+
+    def test_first_run_copies_the_csv_book(self):
+        storage = _storage(CustomerDTO, self.filename, 'mapped')
+        self.assertIsInstance(storage, MappedStorage)
+        self.assertEqual(storage.load(), self.dtos)
+        storage.close()
+
+        JournalStorage(CustomerDTO, self.filename).save(self.dtos[:1])
+        self.assertEqual(_storage(CustomerDTO, self.filename, 'mapped').load(), self.dtos)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import time
+import unittest
+
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.metrics import OperationStats, format_snapshot, metrics
+from src.modules.models.customer_model import Customer
+from src.modules.service.customers_service import CustomerService
+from src.modules.storage import Storage
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = "test_metrics.csv"
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def test_nothing_recorded_when_disabled(self):
+        customers = CustomerService(Storage(CustomerDTO, self.filename))
+        customers.add(Customer(CustomerDTO(name="Test Name")))
+        customers.find_by_name("Test Name")
+        customers.save()
+
+        self.assertEqual(metrics.snapshot(), {'enabled': False, 'operations': {}, 'counters': {}})
+
+    def test_service_and_storage_operations(self):
+        metrics.enable()
+        customers = CustomerService(Storage(CustomerDTO, self.filename))
+        customers.add(Customer(CustomerDTO(name="Test Name")))
+        customers.add(Customer(CustomerDTO(name="Other Name")))
+        customers.find_by_name("Test Name")
+        customers.find_by_name("Other Name")
+        customers.save()
+        CustomerService(Storage(CustomerDTO, self.filename))
+
+        snapshot = metrics.snapshot()
+        operations = snapshot['operations']
+        self.assertEqual(operations['CustomerService.add']['count'], 2)
+        self.assertEqual(operations['CustomerService.find_by_name']['count'], 2)
+        self.assertEqual(operations['CustomerService.save']['count'], 1)
+        self.assertEqual(operations['CustomerService.load']['count'], 2)
+        self.assertEqual(operations['Storage.save']['count'], 1)
+        self.assertEqual(snapshot['counters']['Storage.CustomerDTO.rows_written'], 2)
+        self.assertEqual(snapshot['counters']['Storage.CustomerDTO.rows_read'], 2)
+        self.assertEqual(snapshot['counters']['Storage.CustomerDTO.bytes_read'], os.path.getsize(self.filename))
+        self.assertTrue(any(line.startswith("CustomerService.find_by_name: 2 calls") for line in format_snapshot(snapshot)))
+
+    def test_load_includes_building_the_indexes(self):
+        metrics.enable()
+
+        class SlowIndexes(CustomerService):
+            def _create_indexes(self):
+                super()._create_indexes()
+                time.sleep(0.05)
+
+        SlowIndexes(Storage(CustomerDTO, self.filename))
+
+        self.assertGreaterEqual(metrics.snapshot()['operations']['SlowIndexes.load']['total'], 0.05)
+
+    def test_histogram(self):
+        stats = OperationStats()
+        for seconds in (0.0000005, 0.002, 0.003, 20):
+            stats.observe(seconds)
+
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot['count'], 4)
+        self.assertEqual(snapshot['min'], 0.0000005)
+        self.assertEqual(snapshot['max'], 20)
+        self.assertEqual(snapshot['histogram']['1us'], 1)
+        self.assertEqual(snapshot['histogram']['10ms'], 2)
+        self.assertEqual(snapshot['histogram']['inf'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
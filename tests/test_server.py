@@ -0,0 +1,89 @@
+import asyncio
+import json
+import os
+import unittest
+
+from src.modules.dto.booking_dto import BookingDTO
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.journal_storage import JournalStorage
+from src.modules.server import LINE_LIMIT, BookServer
+from src.modules.service.bookings_service import BookingsService
+from src.modules.service.customers_service import CustomerService
+from src.modules.ui.client import format_response
+
+
+class TestBookServer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.customers_file = "test_server_customers.csv"
+        self.bookings_file = "test_server_bookings.csv"
+        self.path = "test_server.sock"
+        self.server = BookServer(self._customers(), BookingsService(JournalStorage(BookingDTO, self.bookings_file)),
+                                 self.path)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        for filename in (self.customers_file, self.bookings_file):
+            for path in (filename, f"{filename}.journal"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _customers(self):
+        return CustomerService(JournalStorage(CustomerDTO, self.customers_file))
+
+    async def _request(self, stream, line):
+        reader, writer = stream
+        writer.write(line.encode('utf-8') + b'\n')
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    async def test_request_response(self):
+        stream = await asyncio.open_unix_connection(self.path)
+
+        added = await self._request(stream, 'add "John Doe" phone=0123456789')
+        shown = await self._request(stream, 'show "John Doe"')
+        missing = await self._request(stream, 'show "Nobody Here"')
+        unknown = await self._request(stream, 'bogus')
+        stream[1].close()
+
+        self.assertTrue(added['ok'])
+        self.assertEqual(shown['result']['phones'], ["0123456789"])
+        self.assertEqual(missing, {'ok': False, 'error': "Customer 'Nobody Here' not found."})
+        self.assertEqual(unknown, {'ok': False, 'error': "Unknown command 'bogus'."})
+        self.assertEqual(format_response('show', shown), ["John Doe: 0123456789"])
+
+    async def test_writes_are_saved_and_shared_between_clients(self):
+        streams = [await asyncio.open_unix_connection(self.path) for _ in range(4)]
+
+        responses = await asyncio.gather(*[self._request(stream, f'add "Customer {i}"')
+                                           for i, stream in enumerate(streams)])
+        found = await self._request(streams[0], 'find Customer')
+        for _, writer in streams:
+            writer.close()
+
+        self.assertTrue(all(response['ok'] for response in responses))
+        self.assertEqual(len(found['result']), 4)
+        self.assertEqual(len(self._customers()), 4)
+
+    async def test_line_over_the_limit_is_an_error(self):
+        stream = await asyncio.open_unix_connection(self.path)
+
+        too_long = await self._request(stream, 'find ' + 'x' * 3 * LINE_LIMIT)
+        shown = await self._request(stream, 'show-all')
+        stream[1].close()
+
+        self.assertEqual(too_long, {'ok': False, 'error': f"Command line is longer than {LINE_LIMIT} bytes."})
+        self.assertEqual(shown, {'ok': True, 'result': []})
+
+    async def test_exit_closes_the_connection(self):
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        writer.write(b'exit\n')
+        await writer.drain()
+
+        self.assertEqual(await reader.readline(), b'')
+        writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
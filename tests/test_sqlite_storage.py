@@ -0,0 +1,141 @@
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from src.modules.dto.booking_dto import BookingDTO
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.models.booking_model import Booking
+from src.modules.models.customer_model import Customer
+from src.modules.service.bookings_service import BookingsService
+from src.modules.service.customers_service import CustomerService
+from src.modules.service.indexes import StorageIndex
+from src.modules.sqlite_storage import SqliteBookingStorage, SqliteCustomerStorage, SqliteStorage
+
+
+class TestSqliteStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = "test_sqlite_storage.db"
+        self.customers = SqliteCustomerStorage(self.filename)
+        self.bookings = SqliteBookingStorage(self.filename)
+        self.customer1 = CustomerDTO(id="1", name="First", phones=["0000000000", "1111111111"],
+                                     notes=["likes window seats", "allergic to nuts"],
+                                     note_tags=[["vip"], ["allergy", "vip"]], birthday="01.01.2000")
+        self.customer2 = CustomerDTO(id="2", name="Second", email="second@test.com")
+
+    def tearDown(self):
+        self.customers.close()
+        self.bookings.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.filename + suffix):
+                os.remove(self.filename + suffix)
+
+    def test_save_and_load(self):
+        self.customers.save([self.customer1, self.customer2])
+
+        self.assertEqual(self.customers.load(), [self.customer1, self.customer2])
+
+    def test_save_changes(self):
+        self.customers.save([self.customer1, self.customer2])
+        updated = CustomerDTO(id="2", name="Renamed", phones=["2222222222"])
+
+        self.customers.save_changes([updated], ["1"], lambda: self.fail("snapshot is not needed"))
+
+        self.assertEqual(self.customers.load(), [updated])
+        self.assertEqual(self.customers.find_ids_by_tag("vip"), [])
+
+    def test_updated_records_keep_their_place(self):
+        self.customers.save([self.customer1, self.customer2])
+        updated = CustomerDTO(id="1", name="Renamed", phones=["2222222222"], notes=["quiet table"],
+                              note_tags=[["calm"]])
+        added = CustomerDTO(id="3", name="Third")
+
+        self.customers.save_changes([updated, added], [], lambda: self.fail("snapshot is not needed"))
+
+        self.assertEqual(self.customers.load(), [updated, self.customer2, added])
+        self.assertEqual(self.customers.find_ids_by_phone("0000000000"), [])
+        self.assertEqual(self.customers.find_ids_by_tag("vip"), [])
+        self.assertEqual(self.customers.find_ids_by_tag("calm"), ["1"])
+
+    def test_indexed_queries(self):
+        self.customers.save([self.customer1, self.customer2])
+
+        self.assertEqual(self.customers.find_ids_by_tag("vip"), ["1"])
+        self.assertEqual(self.customers.find_ids_by_phone("1111111111"), ["1"])
+        self.assertEqual(self.customers.find_ids_by_name("SECOND"), ["2"])
+        self.assertEqual(self.customers.find_ids_by_email("second@test.com"), ["2"])
+
+    def test_bookings(self):
+        lunch = BookingDTO(id="1", customer_id="1", date="01.01.2024 13:00", covers=2)
+        dinner = BookingDTO(id="2", customer_id="2", date="01.01.2024 19:30", covers=4, duration=90)
+        self.bookings.save([dinner, lunch])
+
+        self.assertEqual(self.bookings.load(), [dinner, lunch])
+        self.assertEqual(self.bookings.find_ids_between(datetime(2024, 1, 1), datetime(2024, 1, 2)), ["1", "2"])
+        self.assertEqual(self.bookings.find_ids_by_customer_id("2"), ["2"])
+
+    def test_service_round_trip(self):
+        customers = CustomerService(self.customers)
+        customer = Customer()
+        customer.name = "Test"
+        customer.add_note("prefers the terrace", ["terrace"])
+        customers.add(customer)
+        customers.save()
+
+        loaded = CustomerService(SqliteCustomerStorage(self.filename))
+        self.assertEqual(loaded.find_by_tag("terrace")[0].id, customer.id)
+        self.assertEqual(loaded.find_many(loaded.storage.find_ids_by_tag("terrace"))[0].id, customer.id)
+        loaded.storage.close()
+
+    def test_service_queries_are_pushed_down(self):
+        self.customers.save([self.customer1, self.customer2])
+        customers = CustomerService(self.customers)
+        self.assertIsInstance(customers._tag_index, StorageIndex)
+        self.assertEqual([customer.id for customer in customers.find_by_tag("vip")], ["1"])
+
+        # unsaved changes are merged into the database results
+        added = Customer(CustomerDTO(id="3", name="Third", phones=["1111111111"], notes=["vip"], note_tags=[["vip"]]))
+        customers.add(added)
+        customers.find("1").remove_phone("1111111111")
+        customers.delete("2")
+        self.assertEqual([customer.id for customer in customers.find_by_tag("vip")], ["1", "3"])
+        self.assertEqual(customers.find_by_phone("1111111111"), [added])
+        self.assertEqual(customers.find_by_email("second@test.com"), [])
+        self.assertEqual(customers.find_notes_by_tag("vip"), [(customers.find("1"), 0), (customers.find("1"), 1),
+                                                            (added, 0)])
+
+        customers.save()
+        self.assertEqual(customers.find_by_phone("1111111111"), [added])
+        self.assertEqual(self.customers.find_ids_by_phone("1111111111"), ["3"])
+
+    def test_booking_date_range_is_pushed_down(self):
+        self.bookings.save([BookingDTO(id="1", customer_id="1", date="01.01.2024 13:00"),
+                            BookingDTO(id="2", customer_id="2", date="01.01.2024 19:30")])
+        bookings = BookingsService(self.bookings)
+        late = Booking(BookingDTO(id="3", customer_id="1", date="01.01.2024 21:00"))
+        bookings.add(late)
+        bookings.find("1").date = "01.01.2024 22:00"
+
+        self.assertEqual([booking.id for booking in bookings.find_on_day(datetime(2024, 1, 1).date())],
+                         ["2", "3", "1"])
+        self.assertEqual([booking.id for booking in bookings.next_bookings(2, datetime(2024, 1, 1, 12))], ["2", "3"])
+        self.assertEqual([booking.id for booking in bookings.find_by_date("01.01.2024 22:00")], ["1"])
+        self.assertEqual([booking.id for booking in bookings.find_by_customer_id("1")], ["1", "3"])
+        self.assertFalse(bookings.is_available(datetime(2024, 1, 1, 21, 30), bookings.capacity))
+
+    def test_queries_from_threads(self):
+        self.customers.save([self.customer1, self.customer2])
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            found = list(executor.map(self.customers.find_ids_by_tag, ["vip"] * 50))
+
+        self.assertEqual(found, [["1"]] * 50)
+
+    def test_base_storage_is_abstract(self):
+        with self.assertRaises(TypeError):
+            SqliteStorage(CustomerDTO, self.filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,12 @@
+import io
 import unittest
 import os
+from unittest.mock import patch
 
 from src.modules.dto.base_dto import BaseDTO
-from src.modules.storage import Storage
+from src.modules.dto.booking_dto import BookingDTO
+from src.modules.dto.customer_dto import CustomerDTO
+from src.modules.storage import Storage, split_rows
 
 
 class TestStorage(unittest.TestCase):
@@ -25,6 +29,14 @@ class TestStorage(unittest.TestCase):
 
         self.assertEqual(loaded_data, self.test_data)
 
+    def test_iter_load(self):
+        self.storage.save(self.test_data)
+
+        loaded_data = self.storage.iter_load()
+
+        self.assertEqual(next(loaded_data), self.dto1)
+        self.assertEqual(list(loaded_data), [self.dto2])
+
     def test_load_empty_file(self):
         loaded_data = self.storage.load()
 
@@ -35,6 +47,56 @@ class TestStorage(unittest.TestCase):
 
         self.assertFalse(os.path.exists(self.filename))
 
+    def test_trusted_load_matches_validated_load(self):
+        customers = [CustomerDTO(id="1", name="Test Name", phones=["0123456789", "0987654321"],
+                                 birthday="01.01.2000", notes=["Likes tea", "No nuts"], note_tags=[["drinks"], []]),
+                     CustomerDTO(id="2", name="Other Name")]
+        Storage(CustomerDTO, self.filename).save(customers)
+
+        trusted = Storage(CustomerDTO, self.filename).load()
+        validated = Storage(CustomerDTO, self.filename, trusted=False).load()
+
+        self.assertEqual(trusted, customers)
+        self.assertEqual(validated, customers)
+
+    def test_trusted_load_converts_numbers(self):
+        bookings = [BookingDTO(id="1", customer_id="2", date="01.01.2024 18:00", covers=4, duration=90)]
+        Storage(BookingDTO, self.filename).save(bookings)
+
+        self.assertEqual(Storage(BookingDTO, self.filename).load(), bookings)
+
+    def test_untrusted_load_validates_rows(self):
+        with open(self.filename, mode='w') as file:
+            file.write("id,customer_id,date,covers,duration\n1,2,01.01.2024 18:00,4,[90]\n")
+
+        with self.assertRaises(ValueError):
+            Storage(BookingDTO, self.filename, trusted=False).load()
+
+
+    @patch('src.modules.storage.PARALLEL_MIN_SIZE', 0)
+    def test_parallel_load_matches_sequential_load(self):
+        customers = [CustomerDTO(id=str(i), name=f"Customer {i}", phones=[f"{i:010d}"], birthday="01.01.2000",
+                                 notes=[f"Says \"hi\",\nthen {i}"] if i % 3 else [], note_tags=[["regular"]] if i % 3 else [])
+                     for i in range(200)]
+        Storage(CustomerDTO, self.filename).save(customers)
+
+        with patch('src.modules.storage.CHUNKS_PER_WORKER', 20):
+            parallel = Storage(CustomerDTO, self.filename, workers=2).load()
+        validated = Storage(CustomerDTO, self.filename, trusted=False, workers=2).load()
+
+        self.assertEqual(parallel, Storage(CustomerDTO, self.filename).load())
+        self.assertEqual(parallel, customers)
+        self.assertEqual(validated, customers)
+
+    def test_split_rows(self):
+        content = b'a,b\r\n"x\ny",1\r\n"""q""",2\r\nz,3\r\n'
+        file = io.BytesIO(content)
+
+        offsets = split_rows(file, 0, len(content), 8)
+
+        self.assertEqual(offsets, [0, 5, 14, 25, 30])
+        self.assertEqual(split_rows(file, 5, 5, 4), [5])
+
 
 if __name__ == '__main__':
     unittest.main()